@@ -0,0 +1,135 @@
+"""
+Admission control for the expensive generation endpoints.
+
+Each controller combines:
+    - a token bucket per user, so one client can't hammer regenerate (429)
+    - a concurrency limit for the route, so LLM calls and cohort aggregations
+      can't take over the worker and starve cheap reads
+    - a bounded wait queue in front of that limit; when it's full, or a
+      request waits longer than the timeout, it is shed right away (503)
+
+Rejections carry Retry-After. Limits are per worker process.
+
+Usage:
+    @router.post("/generate", dependencies=[Depends(admit(plan_generation))])
+"""
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Annotated
+
+from fastapi import Depends, HTTPException
+
+from .config import get_settings
+from . import metrics
+from .models import UserResponse
+from .routers.auth import get_current_user
+
+settings = get_settings()
+
+class TokenBuckets:
+    """Per-key token buckets refilled at `rate` tokens/second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict() # key -> (tokens, last update), least recently used first
+
+    def take(self, key: str) -> float:
+        """Take a token for `key`. Returns 0 if admitted, otherwise seconds until a token is available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0.0
+        else:
+            retry_after = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+class AdmissionController:
+    def __init__(self, route: str, concurrency: int, max_waiting: int, wait_timeout: float,
+                 rate_per_minute: float, burst: int):
+        self.route = route
+        self.concurrency = concurrency
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.buckets = TokenBuckets(rate_per_minute / 60, burst) if rate_per_minute > 0 else None
+        self.in_flight = 0
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(concurrency)
+
+    def _reject(self, status_code: int, reason: str, retry_after: float, detail: str):
+        metrics.admission_rejections.inc(route=self.route, reason=reason)
+        raise HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    async def acquire(self, user_id: str):
+        if self.buckets:
+            retry_after = self.buckets.take(user_id)
+            if retry_after:
+                self._reject(429, "rate_limited", retry_after, "Too many requests, please try again later")
+
+        if self._slots.locked():
+            if self.waiting >= self.max_waiting:
+                self._reject(503, "queue_full", self.wait_timeout, "Server is busy, please try again later")
+            self.waiting += 1
+            metrics.admission_queue_depth.set(self.waiting, route=self.route)
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.wait_timeout)
+            except asyncio.TimeoutError:
+                self._reject(503, "queue_timeout", self.wait_timeout, "Server is busy, please try again later")
+            finally:
+                self.waiting -= 1
+                metrics.admission_queue_depth.set(self.waiting, route=self.route)
+                metrics.admission_wait_duration.observe(time.perf_counter() - start, route=self.route)
+        else:
+            await self._slots.acquire()
+
+        self.in_flight += 1
+        metrics.admission_in_flight.set(self.in_flight, route=self.route)
+
+    def release(self):
+        self.in_flight -= 1
+        metrics.admission_in_flight.set(self.in_flight, route=self.route)
+        self._slots.release()
+
+def admit(controller: AdmissionController):
+    """Route dependency holding an admission slot for the duration of the request."""
+    async def dependency(current_user: Annotated[UserResponse, Depends(get_current_user)]):
+        if not settings.ADMISSION_ENABLED:
+            yield
+            return
+        await controller.acquire(str(current_user.id))
+        try:
+            yield
+        finally:
+            controller.release()
+    return dependency
+
+plan_generation = AdmissionController(
+    "plan_generate",
+    concurrency=settings.ADMISSION_PLAN_CONCURRENCY,
+    max_waiting=settings.ADMISSION_MAX_WAITING,
+    wait_timeout=settings.ADMISSION_WAIT_TIMEOUT_SECONDS,
+    rate_per_minute=settings.ADMISSION_PLAN_RATE_PER_MINUTE,
+    burst=settings.ADMISSION_USER_BURST,
+)
+
+benchmark_generation = AdmissionController(
+    "benchmark_generate",
+    concurrency=settings.ADMISSION_BENCHMARK_CONCURRENCY,
+    max_waiting=settings.ADMISSION_MAX_WAITING,
+    wait_timeout=settings.ADMISSION_WAIT_TIMEOUT_SECONDS,
+    rate_per_minute=settings.ADMISSION_BENCHMARK_RATE_PER_MINUTE,
+    burst=settings.ADMISSION_USER_BURST,
+)
@@ -1,9 +1,22 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     MONGODB_URI: str
     DB_NAME: str = "careeriq"
+
+    # MongoDB connection pool (None keeps the PyMongo default)
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGO_CONNECT_TIMEOUT_MS: int = 20000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    MONGO_SOCKET_TIMEOUT_MS: Optional[int] = None
+    MONGO_COMPRESSORS: str = "" # e.g. "zstd,snappy,zlib"; zstd needs `zstandard`, snappy needs `python-snappy`
+    MONGO_ANALYTICS_READ_PREFERENCE: str = "secondaryPreferred" # Read routing for market_benchmarks analytics
+
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -12,6 +25,74 @@ class Settings(BaseSettings):
     CLERK_AUDIENCE: str = "" # Optional
     GEMINI_API_KEY: str = ""
     GEMINI_MODEL: str = "gemini-2.5-flash"
+    GEMINI_API_ENDPOINT: str = "" # Override (e.g. a local stub for load tests); uses the REST transport
+    # Career plans (see app/services/ai_advisor.py): "llm" asks Gemini, "rules" serves the
+    # rule-based plan without an LLM call, "rewrite" has Gemini reword the rule-based plan
+    ADVISOR_MODE: str = "llm"
+    # llm/rewrite: answer /plan/generate with the rule-based plan at once, then replace it with Gemini's in the background
+    ADVISOR_INSTANT_PLAN: bool = False
+    ADVISOR_PROMPT_TOKEN_BUDGET: int = 200 # User prompt facts (~4 chars/token); see app/services/prompt_builder.py
+    # Record/replay of Gemini calls (see app/services/advisor_recordings.py): "" (off), "record" or "replay"
+    ADVISOR_RECORD_MODE: str = ""
+    ADVISOR_RECORD_PATH: str = "advisor_recordings.jsonl"
+    ADVISOR_REPLAY_MATCH: str = "exact" # "any": unmatched prompts replay another recording of the same instruction
+    GEMINI_TIMEOUT_SECONDS: float = 60 # Per attempt
+    GEMINI_MAX_ATTEMPTS: int = 3 # Transient errors (5xx, 429, timeouts) are retried up to this many calls in total
+    GEMINI_RETRY_BASE_SECONDS: float = 0.5 # Full-jitter exponential backoff between attempts
+    GEMINI_RETRY_MAX_SECONDS: float = 8.0
+    GEMINI_MAX_THREADS: int = 32 # Blocking SDK calls in flight, including hedges and abandoned hedge losers
+    # Circuit breaker over Gemini calls (see app/services/resilience.py); while open, plans come from the rules engine
+    GEMINI_BREAKER_WINDOW: int = 20 # Recent calls considered
+    GEMINI_BREAKER_MIN_CALLS: int = 5
+    GEMINI_BREAKER_FAILURE_RATE: float = 0.5
+    GEMINI_BREAKER_SLOW_SECONDS: float = 20.0
+    GEMINI_BREAKER_SLOW_RATE: float = 0.5
+    GEMINI_BREAKER_OPEN_SECONDS: float = 30.0
+    GEMINI_BREAKER_PROBES: int = 2 # Half-open calls that must succeed to close again
+    # Hedging: a second Gemini call once the first outlasts the recent p95, for at most this share of calls; 0 disables
+    GEMINI_HEDGE_BUDGET: float = 0.0
+    GEMINI_HEDGE_QUANTILE: float = 0.95
+    GEMINI_HEDGE_MIN_DELAY_SECONDS: float = 2.0
+
+    # Shared-memory survey dataset (see app/shared_data.py); empty disables
+    SHARED_DATASET_NAME: str = ""
+
+    # Startup warm-up (see app/warmup.py)
+    WARMUP_HOT_COHORTS: int = 20 # Most common (country, role) cohorts to pre-load; 0 disables
+    WARMUP_RETRY_SECONDS: float = 5.0
+
+    # Cohort statistics cache (see app/services/cohort_cache.py)
+    COHORT_CACHE_MAX_ENTRIES: int = 512 # 0 disables
+    COHORT_CACHE_TTL_SECONDS: float = 3600
+    DATASET_VERSION_CHECK_SECONDS: float = 30 # How stale a worker's view of the dataset version may get
+
+    # History retention for benchmark_reports and career_plans (see app/services/retention.py)
+    HISTORY_KEEP: int = 5 # Archived documents kept in full per user
+    HISTORY_COMPACT: bool = True # Older ones keep their key scores; False deletes them
+    HISTORY_TTL_DAYS: int = 365 # Expire archived documents after this many days; 0 keeps them forever
+
+    # Admission control for /plan/generate and /benchmarks/generate (see app/admission.py), per worker
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_PLAN_CONCURRENCY: int = 8
+    ADMISSION_PLAN_RATE_PER_MINUTE: float = 4 # Per user; 0 disables the per-user limit
+    ADMISSION_BENCHMARK_CONCURRENCY: int = 32
+    ADMISSION_BENCHMARK_RATE_PER_MINUTE: float = 12
+    ADMISSION_USER_BURST: int = 3
+    ADMISSION_MAX_WAITING: int = 64 # Requests queued per route before shedding with 503
+    ADMISSION_WAIT_TIMEOUT_SECONDS: float = 10.0
+
+    # Background regeneration after a profile save (see schedule_refresh in app/routers/benchmarks.py), per worker
+    PROFILE_REFRESH_ENABLED: bool = True
+    PROFILE_REFRESH_DEBOUNCE_SECONDS: float = 1.0 # Saves within this window coalesce into one run
+    PROFILE_REFRESH_PLAN: bool = False # Also regenerate the career plan (one paid advisor call per refresh)
+
+    # Admin endpoints (disabled when empty)
+    ADMIN_TOKEN: str = ""
+
+    # Request profiler
+    PROFILER_SAMPLE_RATE: float = 0.0 # Fraction of requests to profile (0 disables sampling)
+    PROFILER_INTERVAL_MS: float = 5.0
+    PROFILER_RING_SIZE: int = 50
     
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -1,14 +1,109 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring, ReadPreference, WriteConcern
 from .config import get_settings
+from . import metrics
+from .metrics import MongoCommandListener
 
 settings = get_settings()
 
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Tracks per-server connection pool utilization from PyMongo pool events."""
+
+    def __init__(self):
+        self.servers = {}
+
+    def _server(self, event):
+        address = "%s:%s" % event.address
+        if address not in self.servers:
+            self.servers[address] = {
+                "open": 0, "checked_out": 0, "waiting": 0,
+                "checkouts": 0, "checkout_failures": 0, "pool_clears": 0,
+            }
+        return self.servers[address]
+
+    def pool_created(self, event):
+        self._server(event)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._server(event)["pool_clears"] += 1
+
+    def pool_closed(self, event):
+        self.servers.pop("%s:%s" % event.address, None)
+
+    def connection_created(self, event):
+        self._server(event)["open"] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._server(event)["open"] -= 1
+
+    def connection_check_out_started(self, event):
+        self._server(event)["waiting"] += 1
+
+    def connection_check_out_failed(self, event):
+        server = self._server(event)
+        server["waiting"] -= 1
+        server["checkout_failures"] += 1
+
+    def connection_checked_out(self, event):
+        server = self._server(event)
+        server["waiting"] -= 1
+        server["checked_out"] += 1
+        server["checkouts"] += 1
+
+    def connection_checked_in(self, event):
+        self._server(event)["checked_out"] -= 1
+
+    def snapshot(self) -> dict:
+        servers = {address: dict(stats) for address, stats in list(self.servers.items())}
+        for stats in servers.values():
+            stats["utilization"] = round(stats["checked_out"] / settings.MONGO_MAX_POOL_SIZE, 3) if settings.MONGO_MAX_POOL_SIZE else None
+        return {
+            "max_pool_size": settings.MONGO_MAX_POOL_SIZE,
+            "min_pool_size": settings.MONGO_MIN_POOL_SIZE,
+            "servers": servers,
+        }
+
+def _client_options() -> dict:
+    """Pool, timeout and compression options from Settings (unset values keep PyMongo defaults)."""
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS,
+    }
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    return {k: v for k, v in options.items() if v is not None}
+
 class Database:
     client: AsyncIOMotorClient = None
+    pool_stats: PoolStatsListener = PoolStatsListener()
 
     def connect(self):
         """Establish connection to MongoDB"""
-        self.client = AsyncIOMotorClient(settings.MONGODB_URI)
+        self.pool_stats = PoolStatsListener()
+        self.client = AsyncIOMotorClient(
+            settings.MONGODB_URI,
+            event_listeners=[MongoCommandListener(), self.pool_stats],
+            **_client_options()
+        )
         print("Connected to MongoDB")
 
     def disconnect(self):
@@ -16,12 +111,47 @@ class Database:
         if self.client:
             self.client.close()
             print("Disconnected from MongoDB")
-    
+
     def get_db(self):
-        """Get database instance"""
-        return self.client[settings.DB_NAME]
+        """
+        Default handle: primary reads, w=1 writes. Used for derived data
+        (benchmark reports, career plans) that can always be regenerated.
+        """
+        return self.client.get_database(settings.DB_NAME, write_concern=WriteConcern(w=1))
+
+    def get_durable_db(self):
+        """Handle with majority writes, for user-authored data (accounts, profiles)."""
+        return self.client.get_database(settings.DB_NAME, write_concern=WriteConcern(w="majority"))
+
+    def get_analytics_db(self):
+        """
+        Read-only handle for survey analytics (market_benchmarks), routed to
+        secondaries so heavy aggregations don't compete with user writes.
+        """
+        return self.client.get_database(
+            settings.DB_NAME,
+            read_preference=READ_PREFERENCES[settings.MONGO_ANALYTICS_READ_PREFERENCE]
+        )
 
 db = Database()
 
+def _pool_gauge_samples():
+    samples = {}
+    for address, stats in db.pool_stats.snapshot()["servers"].items():
+        for state in ("open", "checked_out", "waiting"):
+            samples[(address, state)] = stats[state]
+    return samples
+
+metrics.registry.register(metrics.CallbackGauge(
+    "mongodb_pool_connections", "MongoDB connection pool connections by server and state.",
+    ("server", "state"), _pool_gauge_samples,
+))
+
 async def get_database():
-    return db.get_db()
\ No newline at end of file
+    return db.get_db()
+
+async def get_durable_database():
+    return db.get_durable_db()
+
+async def get_analytics_database():
+    return db.get_analytics_db()
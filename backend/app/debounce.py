@@ -0,0 +1,77 @@
+"""
+Debounced background calls.
+
+schedule() (re)arms a per-key timer: only the latest call scheduled for a key
+runs, `delay` seconds after the last schedule() for it, so a burst of saves
+costs one run. Runs for the same key never overlap; one scheduled while the
+previous is still running starts after it. flush() runs a pending call right
+away and waits for it, for readers that need its result now; pending() tells
+readers that would rather not wait whether a run is coming.
+
+Failures are logged and counted, never raised to the caller. Timers are per
+worker process and are lost on restart.
+"""
+import asyncio
+
+from . import metrics
+
+class Debouncer:
+    def __init__(self, operation: str, delay: float):
+        self.operation = operation
+        self.delay = delay
+        self._timers = {} # key -> asyncio.TimerHandle
+        self._calls = {} # key -> latest coroutine function waiting for its timer
+        self._running = {} # key -> asyncio.Task
+
+    def schedule(self, key, fn):
+        """Run `fn()` (a coroutine function) for `key` once `delay` passes without another schedule()."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+            metrics.debounced_calls.inc(operation=self.operation, result="coalesced")
+        else:
+            metrics.debounced_calls.inc(operation=self.operation, result="scheduled")
+        self._calls[key] = fn
+        self._timers[key] = asyncio.get_running_loop().call_later(self.delay, self._start, key)
+
+    async def flush(self, key) -> bool:
+        """Start the pending call for `key` now and wait for it. False if nothing was pending or running."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+            self._start(key)
+        task = self._running.get(key)
+        if task is None:
+            return False
+        # Shielded so a reader that disconnects doesn't cancel the run
+        await asyncio.shield(task)
+        return True
+
+    def pending(self, key) -> bool:
+        """Whether a call for `key` is scheduled or running."""
+        return key in self._timers or key in self._running
+
+    def _start(self, key):
+        self._timers.pop(key, None)
+        fn = self._calls.pop(key, None)
+        if fn is None:
+            return
+        task = asyncio.ensure_future(self._run(fn, self._running.get(key)))
+        self._running[key] = task
+
+        def release(done):
+            # A later run for the key may have replaced this one already
+            if self._running.get(key) is done:
+                del self._running[key]
+
+        task.add_done_callback(release)
+
+    async def _run(self, fn, previous):
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            await fn()
+            metrics.debounced_calls.inc(operation=self.operation, result="completed")
+        except Exception as e:
+            metrics.debounced_calls.inc(operation=self.operation, result="failed")
+            print(f"Background {self.operation} failed: {e!r}")
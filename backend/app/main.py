@@ -1,8 +1,11 @@
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .database import db
-from .routers import auth, profile, benchmarks, plan, dashboard
+from . import metrics, profiler, warmup
+from .routers import auth, profile, benchmarks, plan, dashboard, market, meta, admin
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -11,8 +14,11 @@ async def lifespan(app: FastAPI):
         db.connect()
     except Exception as e:
         print(f"Failed to connect to database: {e}")
+    # Warm up in the background: /healthz answers right away, /readyz once this finishes
+    warm_up = asyncio.create_task(warmup.warm_up())
     yield
     # Shutdown
+    warm_up.cancel()
     db.disconnect()
 
 app = FastAPI(lifespan=lifespan)
@@ -33,23 +39,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(profiler.ProfilerMiddleware)
+app.add_middleware(metrics.PrometheusMiddleware)
+
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(profile.router, prefix="/api/v1")
 app.include_router(benchmarks.router, prefix="/api/v1")
 app.include_router(plan.router, prefix="/api/v1")
 app.include_router(dashboard.router, prefix="/api/v1")
+app.include_router(market.router, prefix="/api/v1")
+app.include_router(meta.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
 
 @app.get("/healthz")
 async def health_check():
+    # Liveness only: the process is up and serving. Dependencies are checked by /readyz.
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readiness_check():
+    if not warmup.state["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming_up", "steps": warmup.state["steps"]})
     try:
-        if db.client:
-            # Ping the database to verify connection
-            await db.client.admin.command('ping')
-            return {"status": "ok", "db": "connected"}
-        else:
-            return {"status": "ok", "db": "disconnected (client not initialized)"}
+        # Ping the database to verify connection
+        await db.client.admin.command('ping')
     except Exception as e:
-        return {"status": "ok", "db": "disconnected", "error": str(e)}
+        return JSONResponse(status_code=503, content={"status": "unavailable", "db": "disconnected", "error": str(e)})
+    return {"status": "ready", "db": "connected", "pool": db.pool_stats.snapshot(), "steps": warmup.state["steps"]}
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 @app.get("/")
 async def root():
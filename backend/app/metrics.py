@@ -0,0 +1,332 @@
+"""
+Minimal Prometheus-compatible metrics registry.
+
+The text exposition format is rendered directly so /metrics can be scraped
+(or simply curl'd locally) without prometheus_client or a running Prometheus.
+"""
+import math
+import threading
+import time
+
+from pymongo import monitoring
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labelnames, values, extra=None) -> str:
+    pairs = [f'{k}="{_escape(v)}"' for k, v in zip(labelnames, values)]
+    if extra:
+        pairs.extend(f'{k}="{_escape(v)}"' for k, v in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, key, None, value
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for name, key, extra, value in self.samples():
+            lines.append(f"{name}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}")
+        return "\n".join(lines)
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+class CallbackGauge(_Metric):
+    """Gauge whose samples are computed at scrape time by `callback`,
+    which returns a {label_values_tuple: value} dict."""
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labelnames, callback):
+        super().__init__(name, documentation, labelnames)
+        self._callback = callback
+
+    def samples(self):
+        for key, value in self._callback().items():
+            yield self.name, tuple(key), None, value
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._values.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", key, (("le", _format_value(float(bound))),), cumulative
+            yield f"{self.name}_sum", key, None, total
+            yield f"{self.name}_count", key, None, count
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        return self.register(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        return self.register(Gauge(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        return self.register(Histogram(*args, **kwargs))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+registry = Registry()
+
+# HTTP
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress", "HTTP requests currently being served.",
+    ("method",),
+)
+
+# MongoDB
+mongo_command_duration = registry.histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency by collection and operation.",
+    ("collection", "command", "status"),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+# Gemini / AI advisor
+gemini_request_duration = registry.histogram(
+    "gemini_request_duration_seconds", "Gemini generate_content latency.",
+    ("outcome",),
+    buckets=(0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0),
+)
+gemini_requests = registry.counter(
+    "gemini_requests_total", "Gemini calls by outcome (success, error).", ("outcome",),
+)
+gemini_tokens = registry.counter(
+    "gemini_tokens_total", "Gemini tokens consumed.", ("type",),
+)
+advisor_prompt_tokens = registry.histogram(
+    "advisor_prompt_tokens", "Estimated prompt tokens per plan request, system instruction included.", ("mode",),
+    buckets=(100, 200, 300, 400, 600, 800, 1200, 1600, 3200),
+)
+advisor_prompt_trims = registry.counter(
+    "advisor_prompt_trims_total", "Prompt facts shortened or dropped to fit the token budget.", ("fact",),
+)
+gemini_retries = registry.counter(
+    "gemini_retries_total", "Gemini calls retried after a transient error, by error type.", ("reason",),
+)
+advisor_plan_repairs = registry.counter(
+    "advisor_plan_repairs_total",
+    "LLM plans used after repair (truncated_json, missing_fields, dropped_recommendations).", ("kind",),
+)
+advisor_fallback_plans = registry.counter(
+    "advisor_fallback_plans_total", "Career plans served from the rule-based engine because Gemini was unusable.", ("reason",),
+)
+circuit_breaker_state = registry.gauge(
+    "circuit_breaker_state", "Circuit breaker state (0 closed, 1 open, 2 half-open).", ("name",),
+)
+circuit_breaker_transitions = registry.counter(
+    "circuit_breaker_transitions_total", "Circuit breaker state changes by new state.", ("name", "state"),
+)
+hedged_requests = registry.counter(
+    "hedged_requests_total", "Backup requests sent after a slow first attempt (launched), and those that finished first (won).",
+    ("operation", "result"),
+)
+
+# Admission control
+admission_in_flight = registry.gauge(
+    "admission_in_flight", "Admitted requests currently running per guarded route.", ("route",),
+)
+admission_queue_depth = registry.gauge(
+    "admission_queue_depth", "Requests waiting for an admission slot per guarded route.", ("route",),
+)
+admission_wait_duration = registry.histogram(
+    "admission_wait_seconds", "Time spent queued for an admission slot.", ("route",),
+)
+admission_rejections = registry.counter(
+    "admission_rejections_total", "Requests shed by admission control (rate_limited, queue_full, queue_timeout).",
+    ("route", "reason"),
+)
+
+# Single-flight coalescing
+singleflight_calls = registry.counter(
+    "singleflight_calls_total", "Coalesced calls by role (leader computes, shared joins an in-flight call).",
+    ("operation", "result"),
+)
+
+# Benchmark reports read after a survey re-ingestion (benchmarks /latest)
+benchmark_revalidations = registry.counter(
+    "benchmark_revalidations_total",
+    "Reports from an older dataset version checked on read (unchanged cohort: restamped; recomputed; failed: kept).",
+    ("result",),
+)
+
+# Debounced background work (app/debounce.py)
+debounced_calls = registry.counter(
+    "debounced_calls_total", "Debounced background calls (scheduled, coalesced into a pending one, completed, failed).",
+    ("operation", "result"),
+)
+
+# In-process caches
+cache_requests = registry.counter(
+    "cache_requests_total", "In-process cache lookups by result (hit, miss).", ("cache", "result"),
+)
+
+def _cache_hit_ratios():
+    totals = {}
+    for (cache, result), value in list(cache_requests._values.items()):
+        hits, lookups = totals.get(cache, (0, 0))
+        totals[cache] = (hits + (value if result == "hit" else 0), lookups + value)
+    return {(cache,): hits / lookups for cache, (hits, lookups) in totals.items() if lookups}
+
+registry.register(CallbackGauge(
+    "cache_hit_ratio", "Hit ratio of in-process caches since process start.", ("cache",), _cache_hit_ratios,
+))
+
+def record_cache(cache: str, hit: bool):
+    cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+def render() -> str:
+    return registry.render()
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Times every command issued by the Motor client, keyed by collection."""
+
+    def __init__(self):
+        self._pending = {}
+
+    def _key(self, event):
+        return (event.connection_id, event.request_id)
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = ""
+        self._pending[self._key(event)] = (collection, event.command_name)
+
+    def _finish(self, event, status):
+        collection, command = self._pending.pop(self._key(event), ("", event.command_name))
+        mongo_command_duration.observe(
+            event.duration_micros / 1_000_000, collection=collection, command=command, status=status
+        )
+
+    def succeeded(self, event):
+        self._finish(event, "succeeded")
+
+    def failed(self, event):
+        self._finish(event, "failed")
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware recording latency per route template (the matched
+    route's path within its router, e.g. /plan/recommendations/{rec_id}), so
+    path parameters don't explode label cardinality, and in-flight requests
+    per method.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _route_template(scope) -> str:
+        # Routing stores the matched route in the scope we passed down, so it's readable once the app returns
+        route = scope.get("route")
+        return getattr(route, "path_format", None) or "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        # The route is only known once routing has run, so in-flight requests are per method
+        http_requests_in_progress.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_duration.observe(
+                time.perf_counter() - start, method=method, route=self._route_template(scope),
+                status=status_holder["status"]
+            )
+            http_requests_in_progress.dec(method=method)
@@ -102,7 +102,9 @@ class ProfileResponse(ProfileBase):
 class SurveyBenchmark(BaseModel):
     country: str
     years_experience: float
-    dev_role: str
+    dev_role: str # Raw DevType answer, may list several roles
+    dev_roles: List[str] = [] # Normalized roles parsed from dev_role
+    exp_bucket: int = 0 # Index into survey_schema.EXP_BUCKETS
     salary: float
     languages: List[str]
     databases: List[str]
@@ -165,6 +167,9 @@ class BenchmarkReportInDB(BenchmarkReportBase):
     user_id: str
     generated_at: datetime = Field(default_factory=datetime.utcnow)
     is_current: bool = True
+    dataset_version: int = 0 # Survey dataset version (dataset_metadata) the report was computed from
+    cohort_key: Optional[str] = None # Resolved cohort (services.cohorts.cohort_key)
+    cohort_fingerprint: Optional[str] = None # Hash of that cohort's statistics at the time
 
     model_config = {
         "populate_by_name": True,
@@ -181,14 +186,17 @@ class BenchmarkReportResponse(BenchmarkReportBase):
     }
 # Career Plan Models
 
+RECOMMENDATION_CATEGORIES = ["compensation", "skills", "strategic"]
+PRIORITY_LEVELS = ["high", "medium", "low"]
+
 class Recommendation(BaseModel):
     id: str = Field(default_factory=lambda: str(ObjectId()))
-    category: str = "strategic" # "compensation", "skills", "strategic"
+    category: str = "strategic" # One of RECOMMENDATION_CATEGORIES
     title: str
     description: str
     expected_impact: str = "Medium impact on career growth"
     data_source: str = "Industry Trends 2024"
-    priority_level: str = "medium" # "high", "medium", "low"
+    priority_level: str = "medium" # One of PRIORITY_LEVELS
     status: str = "active" # "active", "completed", "dismissed"
     user_notes: Optional[str] = None
     created_date: datetime = Field(default_factory=datetime.utcnow)
@@ -226,6 +234,7 @@ class CareerPlanResponse(CareerPlanBase):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
     generated_at: datetime
     overall_completion_percentage: int = 0
+    stale: bool = False # Being regenerated after a profile save
     
     model_config = {
         "populate_by_name": True,
@@ -0,0 +1,165 @@
+"""
+Opt-in per-request sampling profiler.
+
+A sampled request gets a background thread that snapshots the interpreter's
+stacks every few milliseconds via sys._current_frames(). Stacks are stored in
+the "folded" format (frame;frame;frame count) understood by flamegraph.pl,
+speedscope and inferno, in a bounded in-memory ring buffer.
+
+The event loop thread is always sampled, so time spent idle in the selector
+shows up as loop waiting (awaiting Mongo/HTTP I/O), while busy executor threads
+(e.g. PyMongo work dispatched by Motor) are sampled under their own thread name.
+"""
+import asyncio
+import collections
+import itertools
+import random
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime
+
+from .config import get_settings
+
+settings = get_settings()
+
+PROFILE_HEADER = b"x-profile-request"
+
+# Leaf frames of threads that are parked waiting for work; sampling them
+# would only add noise to the flamegraph.
+_IDLE_LEAVES = {
+    ("thread.py", "_worker"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+}
+
+_profiles = collections.deque(maxlen=settings.PROFILER_RING_SIZE)
+_ids = itertools.count(1)
+_active_lock = threading.Lock()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename.rsplit("/", 1)[-1]
+    return f"{code.co_name} ({filename}:{frame.f_lineno})"
+
+
+def _is_idle(frame) -> bool:
+    filename = frame.f_code.co_filename.rsplit("/", 1)[-1]
+    return (filename, frame.f_code.co_name) in _IDLE_LEAVES
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._loop_thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Signal the sampler to stop; it exits within one interval. Returns immediately."""
+        self._stop.set()
+
+    def join(self):
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                is_loop = thread_id == self._loop_thread_id
+                if not is_loop and _is_idle(frame):
+                    continue
+
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                root = "event-loop" if is_loop else names.get(thread_id, f"thread-{thread_id}")
+                stack.append(root)
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+def list_profiles():
+    return [{k: v for k, v in p.items() if k != "folded"} for p in reversed(_profiles)]
+
+
+def get_profile(profile_id: int):
+    for p in _profiles:
+        if p["id"] == profile_id:
+            return p
+    return None
+
+
+class ProfilerMiddleware:
+    """
+    Profiles PROFILER_SAMPLE_RATE of requests, plus any request sending
+    `X-Profile-Request: <ADMIN_TOKEN>`. Only one request is profiled at a
+    time, which keeps overhead bounded under load.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _wants_profile(self, scope) -> bool:
+        if settings.ADMIN_TOKEN:
+            for name, value in scope.get("headers", []):
+                if name == PROFILE_HEADER:
+                    return secrets.compare_digest(value.decode("latin-1"), settings.ADMIN_TOKEN)
+        return settings.PROFILER_SAMPLE_RATE > 0 and random.random() < settings.PROFILER_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not _active_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        profiler = SamplingProfiler(settings.PROFILER_INTERVAL_MS / 1000)
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = round((time.perf_counter() - start) * 1000, 2)
+            profiler.stop()
+            try:
+                # Joining can take up to an interval; wait for it off the event loop
+                await asyncio.to_thread(profiler.join)
+            finally:
+                _active_lock.release()
+            _profiles.append({
+                "id": next(_ids),
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_holder["status"],
+                "started_at": started_at,
+                "duration_ms": duration_ms,
+                "samples": profiler.samples,
+                "folded": profiler.folded(),
+            })
@@ -0,0 +1,56 @@
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from ..config import get_settings
+from ..database import get_database, get_analytics_database
+from .. import profiler
+from ..services import cohort_cache
+
+settings = get_settings()
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+async def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+async def list_request_profiles():
+    """
+    Most recent profiled requests, newest first.
+    """
+    return profiler.list_profiles()
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+async def get_request_profile(profile_id: int):
+    """
+    Folded stacks for one profiled request; pipe into flamegraph.pl or load in speedscope.
+    """
+    profile = profiler.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found (it may have been evicted)")
+    return profile["folded"]
+
+@router.get("/stale-reports", dependencies=[Depends(require_admin)])
+async def count_stale_reports(db = Depends(get_database), analytics_db = Depends(get_analytics_database)):
+    """
+    How many current benchmark reports predate the survey dataset version, by
+    the version they were computed from. They are brought up to date lazily by
+    /benchmarks/latest, or in bulk by scripts/recompute_benchmarks.py --stale-only.
+    """
+    version = await cohort_cache.dataset_version(analytics_db)
+    pipeline = [
+        {"$match": cohort_cache.stale_report_query(version)},
+        {"$group": {"_id": "$dataset_version", "count": {"$sum": 1}}},
+        {"$sort": {"_id": 1}},
+    ]
+    by_version = await db.benchmark_reports.aggregate(pipeline).to_list(length=None)
+    return {
+        "dataset_version": version,
+        "stale_reports": sum(group["count"] for group in by_version),
+        "by_version": {str(group["_id"] or 0): group["count"] for group in by_version},
+    }
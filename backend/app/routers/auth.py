@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
 
-from ..database import get_database
+from ..database import get_database, get_durable_database
 from ..models import UserResponse, UserInDB
 from ..security import verify_clerk_token
 
@@ -27,7 +27,8 @@ async def get_token_payload(credentials: Annotated[HTTPAuthorizationCredentials,
 
 async def get_current_user(
     payload: Annotated[dict, Depends(get_token_payload)],
-    db = Depends(get_database)
+    db = Depends(get_database),
+    durable_db = Depends(get_durable_database) # Only for JIT provisioning writes
 ):
     clerk_id = payload.get("sub")
     if not clerk_id:
@@ -52,8 +53,8 @@ async def get_current_user(
             name=payload.get("name", "User"),
             provider="clerk"
         )
-        result = await db.users.insert_one(new_user.model_dump(by_alias=True, exclude=["id"]))
-        user = await db.users.find_one({"_id": result.inserted_id})
+        result = await durable_db.users.insert_one(new_user.model_dump(by_alias=True, exclude=["id"]))
+        user = await durable_db.users.find_one({"_id": result.inserted_id})
         
     return UserResponse(**user)
 
@@ -61,7 +62,7 @@ async def get_current_user(
 async def sync_user(
     user_data: UserSyncRequest,
     payload: Annotated[dict, Depends(get_token_payload)],
-    db = Depends(get_database)
+    db = Depends(get_durable_database)
 ):
     clerk_id = payload.get("sub")
     if not clerk_id:
@@ -1,18 +1,39 @@
 from typing import Annotated, List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from datetime import datetime
+from bisect import bisect_left
+import asyncio
 import random
 import math
 
-from ..database import get_database
+from ..config import get_settings
+from ..database import get_database, get_analytics_database
 from ..models import (
     BenchmarkReportResponse, BenchmarkReportInDB, UserResponse, 
     MarketDataInDB, MarketData, SkillRelevance, BenchmarkInsights
 )
+from ..services.cohorts import (
+    MIN_COHORT_SIZE, SKILL_FACETS, cohort_fingerprint, cohort_key, cohort_tiers, tier_query
+)
+from ..services.survey_schema import exp_bucket_index
+from ..services import cohort_cache, market_cube, retention
+from .. import metrics
+from ..admission import admit, benchmark_generation
+from ..singleflight import SingleFlight
+from ..debounce import Debouncer
 from .auth import get_current_user
+from .market import get_market_cube
+
+settings = get_settings()
 
 router = APIRouter(prefix="/benchmarks", tags=["benchmarks"])
 
+_benchmark_flights = SingleFlight("benchmark_generate") # keyed by user_id
+_cohort_flights = SingleFlight("cohort_stats") # keyed like the cache entry: (version, collection, match query)
+# Background regeneration after profile saves, keyed by user_id
+_benchmark_refresh = Debouncer("benchmark_refresh", settings.PROFILE_REFRESH_DEBOUNCE_SECONDS)
+_plan_refresh = Debouncer("plan_refresh", 0)
+
 @router.post("/seed-market-data")
 async def seed_market_data(db = Depends(get_database)):
     """
@@ -21,55 +42,75 @@ async def seed_market_data(db = Depends(get_database)):
     """
     return {"message": "Use backend/scripts/ingest_survey.py to load real data."}
 
-async def get_cohort_stats(db, country: str, dev_role: str, years_exp: float):
+async def get_cohort_stats(db, country: str, dev_role: str, years_exp: float, version: Optional[int] = None):
     """
     Fetch cohort data with fallback logic if sample size is too small.
+    Resolved against the shared-memory dataset when the published one is of
+    the current dataset version (or `version`, for callers stamping a report
+    with it), otherwise against MongoDB; either way the stats are cached in
+    the versioned cohort cache.
+    Returns (stats, cohort_name, cohort_key), all None when there is no data.
     """
     collection = db.market_benchmarks
-    
-    # Define constraints
-    exp_min = max(0, years_exp - 2)
-    exp_max = years_exp + 2
-    
-    # 1. Try strict match
-    match_query = {
-        "country": country,
-        "dev_role": dev_role,
-        "years_experience": {"$gte": exp_min, "$lte": exp_max},
-        "salary": {"$gt": 0} # Ensure valid salary
-    }
-    
-    count = await collection.count_documents(match_query)
-    cohort_name = f"{dev_role} in {country} ({exp_min}-{exp_max} yoe)"
-    
-    # 2. Relax constraints if count is low
-    if count < 10:
-        # Try wider experience range
-        exp_min = max(0, years_exp - 5)
-        exp_max = years_exp + 5
-        match_query["years_experience"] = {"$gte": exp_min, "$lte": exp_max}
-        count = await collection.count_documents(match_query)
-        cohort_name = f"{dev_role} in {country} (Extended Exp)"
-        
-    if count < 10:
-        # Remove country constraint (Global comparison for role)
-        del match_query["country"]
-        count = await collection.count_documents(match_query)
-        cohort_name = f"{dev_role} (Global, {exp_min}-{exp_max} yoe)"
-        
-    if count < 10:
-         # Fallback to just country (General tech in country)
-        match_query = {
-            "country": country,
-            "years_experience": {"$gte": exp_min, "$lte": exp_max},
-            "salary": {"$gt": 0}
-        }
-        count = await collection.count_documents(match_query)
-        cohort_name = f"Developers in {country}"
+    if version is None:
+        version = await cohort_cache.dataset_version(db)
+
+    survey = None
+    if settings.SHARED_DATASET_NAME:
+        from .. import shared_data # numpy-backed; only loaded when the shared dataset is enabled
+
+        survey = shared_data.current()
+    if survey is not None and survey.dataset_version == version:
+        slices, count, cohort_name, key = survey.resolve(country, dev_role, years_exp)
+        if count == 0:
+            return None, None, None
+        # Same entry as the MongoDB path: both hold this version's data
+        stats_key = ("stats", version, collection.full_name, key)
+        stats = cohort_cache.cache.get(stats_key, "cohort_stats")
+        if stats is None:
+            stats = await _cohort_flights.do(stats_key, lambda: asyncio.to_thread(survey.cohort_stats, slices))
+            cohort_cache.cache.set(stats_key, stats)
+        return stats, cohort_name, key
+
+    # Tiers only depend on the experience bucket, so profiles in the same bucket share resolutions
+    resolve_key = ("resolve", collection.full_name, version, country, dev_role, exp_bucket_index(years_exp))
+    resolved = cohort_cache.cache.get(resolve_key, "cohort_resolution")
+    if resolved is None:
+        resolved = await resolve_cohort(collection, country, dev_role, years_exp)
+        cohort_cache.cache.set(resolve_key, resolved)
+    match_query, count, cohort_name = resolved
 
     if count == 0:
-        return None, None
+        return None, None, None
+
+    # Users whose profiles resolve to the same cohort share one cached entry and one aggregation
+    key = cohort_key(match_query)
+    stats_key = ("stats", version, collection.full_name, key)
+    stats = cohort_cache.cache.get(stats_key, "cohort_stats")
+    if stats is None:
+        # Versioned too, so a caller at a newer version never joins (and caches) an older version's flight
+        stats = await _cohort_flights.do(stats_key, lambda: fetch_cohort_stats(collection, match_query))
+        cohort_cache.cache.set(stats_key, stats)
+    return stats, cohort_name, key
 
+async def resolve_cohort(collection, country: str, dev_role: str, years_exp: float):
+    """
+    Pick the narrowest cohort with at least MIN_COHORT_SIZE members,
+    falling back to the broadest tier otherwise.
+    Returns (match_query, count, cohort_name).
+    """
+    for filters, cohort_name in cohort_tiers(country, dev_role, years_exp):
+        match_query = tier_query(filters)
+        count = await collection.count_documents(match_query)
+        if count >= MIN_COHORT_SIZE:
+            break
+
+    return match_query, count, cohort_name
+
+async def fetch_cohort_stats(collection, match_query: dict) -> dict:
+    """
+    Salary list and top skills for a resolved cohort, in one $facet round trip.
+    """
     # Fetch Data
     # We need:
     # - Salary list (for percentile)
@@ -82,67 +123,97 @@ async def get_cohort_stats(db, country: str, dev_role: str, years_exp: float):
                 {"$project": {"salary": 1}},
                 {"$sort": {"salary": 1}}
             ],
-            "top_languages": [
-                {"$unwind": "$languages"},
-                {"$group": {"_id": "$languages", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-                {"$limit": 10}
-            ],
-            "top_databases": [
-                {"$unwind": "$databases"},
-                {"$group": {"_id": "$databases", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-                {"$limit": 5}
-            ],
-            "top_frameworks": [
-                {"$unwind": "$frameworks"},
-                {"$group": {"_id": "$frameworks", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-                {"$limit": 5}
-            ]
+            **{
+                facet: [
+                    {"$unwind": f"${field}"},
+                    {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}},
+                    {"$limit": limit}
+                ]
+                for facet, (field, limit) in SKILL_FACETS.items()
+            }
         }}
     ]
     
     results = await collection.aggregate(pipeline).to_list(length=1)
-    stats = results[0]
-    
-    return stats, cohort_name
+    return results[0]
 
-@router.post("/generate", response_model=BenchmarkReportResponse)
-async def generate_benchmark(
-    current_user: Annotated[UserResponse, Depends(get_current_user)],
-    db = Depends(get_database)
-):
-    user_id = str(current_user.id)
+def calculate_salary_percentile(sorted_salaries: List[float], user_salary: float) -> int:
+    """
+    Share of the cohort earning strictly less than the user, 0-100.
+    Expects salaries in ascending order (the cohort pipeline sorts them).
+    """
+    if not sorted_salaries:
+        return 0
+    below_count = bisect_left(sorted_salaries, user_salary)
+    return int((below_count / len(sorted_salaries)) * 100)
+
+def aggregate_market_skills(stats: dict, limit: int = 15) -> set:
+    """
+    Combine the per-category top lists into the cohort's most frequent skills (lowercased).
+    """
+    market_skills_counts = {}
     
-    # 1. Fetch User Profile
-    profile = await db.profiles.find_one({"user_id": user_id})
-    if not profile:
-        raise HTTPException(status_code=400, detail="Profile required to generate benchmark")
+    for cat in ['top_languages', 'top_databases', 'top_frameworks']:
+        for item in stats.get(cat, []):
+            # Only count if significant (e.g. appearing in > 10% of profiles or top list)
+            market_skills_counts[item['_id']] = item['count']
+
+    sorted_market_skills = sorted(market_skills_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
+    return set([s[0].lower() for s in sorted_market_skills])
+
+def score_skill_match(user_tech_skills: set, market_tech_skills: set):
+    """
+    Returns (matching, missing, score) where score is the share of market skills the user has.
+    """
+    matching_tech = user_tech_skills.intersection(market_tech_skills)
+    missing_tech = list(market_tech_skills - user_tech_skills)
     
+    # Simple score: how many of the top skills do you have?
+    # Weighted by their frequency could be better, but simple ratio is fine for MVP
+    tech_score = int((len(matching_tech) / len(market_tech_skills)) * 100) if market_tech_skills else 0
+    return matching_tech, missing_tech, tech_score
+
+def profile_cohort_inputs(profile: dict):
+    """(dev_role, country, years_experience) used to resolve a profile's cohort."""
     user_role = profile.get("dev_role", profile.get("current_title", "Developer"))
     user_country = profile.get("country", "United States")
     user_exp = profile.get("years_experience", 2)
+    return user_role, user_country, user_exp
+
+def build_benchmark_report(
+    user_id: str,
+    profile: dict,
+    stats: dict,
+    cohort_name: str,
+    percentile: Optional[int] = None,
+    market_tech_skills: Optional[set] = None,
+    cohort_size: Optional[int] = None,
+    dataset_version: int = 0,
+    cohort: Optional[str] = None,
+    fingerprint: Optional[str] = None
+) -> BenchmarkReportInDB:
+    """
+    Score a profile against its cohort's statistics. No I/O, so it can also run in
+    bulk (scripts/recompute_benchmarks.py), where the percentile and the cohort's
+    size, market skills and fingerprint are computed once per cohort and passed in.
+    The report is stamped with the dataset version and cohort key it was computed from.
+    """
+    user_exp = profile.get("years_experience", 2)
     user_salary = profile.get("salary_package", 0)
     user_tech_skills = set([s.lower() for s in profile.get("technical_skills", [])])
-    
-    # 2. Get Cohort Statistics
-    stats, cohort_name = await get_cohort_stats(db, user_country, user_role, user_exp)
-    
-    if not stats:
-        # Absolute Fallback if no data exists at all
-        raise HTTPException(status_code=404, detail="Not enough market data to generate a benchmark.")
 
     # 3. Calculate Logic
     
     # Salary Analysis
-    salaries = [doc['salary'] for doc in stats['salaries']]
-    cohort_size = len(salaries)
+    if cohort_size is None:
+        cohort_size = len(stats['salaries'])
     
     # Calculate Percentile
     # Find how many people earn less than user
-    below_count = sum(1 for s in salaries if s < user_salary)
-    percentile = int((below_count / cohort_size) * 100) if cohort_size > 0 else 0
+    if percentile is None:
+        salaries = [doc['salary'] for doc in stats['salaries']]
+        percentile = calculate_salary_percentile(salaries, user_salary)
     
     # Determine Quartile
     quartile = 1
@@ -161,26 +232,10 @@ async def generate_benchmark(
         insights_comp += " Your compensation is significantly below the market average."
     
     # Skills Analysis
-    # Combine top skills from all categories
-    market_skills_counts = {}
-    
-    for cat in ['top_languages', 'top_databases', 'top_frameworks']:
-        for item in stats.get(cat, []):
-            skill = item['_id']
-            # Only count if significant (e.g. appearing in > 10% of profiles or top list)
-            market_skills_counts[skill] = item['count']
-
-    # Get top 15 overall most frequent skills in cohort
-    sorted_market_skills = sorted(market_skills_counts.items(), key=lambda x: x[1], reverse=True)[:15]
-    market_tech_skills = set([s[0].lower() for s in sorted_market_skills])
-    
-    # Match
-    matching_tech = user_tech_skills.intersection(market_tech_skills)
-    missing_tech = list(market_tech_skills - user_tech_skills)
-    
-    # Simple score: how many of the top 15 skills do you have?
-    # Weighted by their frequency could be better, but simple ratio is fine for MVP
-    tech_score = int((len(matching_tech) / len(market_tech_skills)) * 100) if market_tech_skills else 0
+    # Top 15 overall most frequent skills in cohort, across all categories
+    if market_tech_skills is None:
+        market_tech_skills = aggregate_market_skills(stats)
+    matching_tech, missing_tech, tech_score = score_skill_match(user_tech_skills, market_tech_skills)
     
     # Soft skills (Placeholder as survey data doesn't have soft skills usually)
     soft_score = 70 # Default to reasonable score
@@ -210,7 +265,7 @@ async def generate_benchmark(
     )
 
     # 4. Create Report
-    report = BenchmarkReportInDB(
+    return BenchmarkReportInDB(
         user_id=user_id,
         compensation_quartile=percentile,
         skill_match_score=overall_skill_score,
@@ -224,17 +279,78 @@ async def generate_benchmark(
         data_sources_used=["Stack Overflow Survey 2024", "Market Benchmarks"],
         insights=insights,
         generated_at=datetime.utcnow(),
-        is_current=True
+        is_current=True,
+        dataset_version=dataset_version,
+        cohort_key=cohort,
+        cohort_fingerprint=fingerprint or cohort_fingerprint(stats)
+    )
+
+@router.post("/generate", response_model=BenchmarkReportResponse,
+              dependencies=[Depends(admit(benchmark_generation))])
+async def generate_benchmark(
+    current_user: Annotated[UserResponse, Depends(get_current_user)],
+    db = Depends(get_database),
+    analytics_db = Depends(get_analytics_database)
+):
+    user_id = str(current_user.id)
+    # A double submit (or /plan/generate regenerating at the same time) joins the running generation
+    return await _benchmark_flights.do(user_id, lambda: _generate_benchmark(user_id, db, analytics_db))
+
+def schedule_refresh(current_user: UserResponse, db, analytics_db):
+    """
+    Regenerate the user's benchmark in the background after a profile save, so
+    the report is ready before the user opens it, then (with PROFILE_REFRESH_PLAN)
+    their career plan. Rapid saves coalesce into one run on the latest profile.
+    """
+    user_id = str(current_user.id)
+    _benchmark_refresh.schedule(user_id, lambda: _refresh_benchmark(current_user, db, analytics_db))
+
+async def wait_for_refresh(user_id: str) -> bool:
+    """Run the user's pending benchmark refresh now and wait for it. False if nothing was pending or running."""
+    return await _benchmark_refresh.flush(user_id)
+
+def plan_refresh_pending(user_id: str) -> bool:
+    """Whether a background refresh will replace the user's career plan (PROFILE_REFRESH_PLAN)."""
+    return settings.PROFILE_REFRESH_PLAN and (
+        _benchmark_refresh.pending(user_id) or _plan_refresh.pending(user_id)
     )
+
+async def _refresh_benchmark(current_user: UserResponse, db, analytics_db):
+    await generate_benchmark(current_user, db, analytics_db)
+    if settings.PROFILE_REFRESH_PLAN:
+        from .plan import generate_career_plan # plan imports this module
+
+        # Separate step, so readers of the benchmark don't wait for the advisor
+        _plan_refresh.schedule(str(current_user.id), lambda: generate_career_plan(current_user, db, analytics_db))
+
+async def _generate_benchmark(user_id: str, db, analytics_db) -> BenchmarkReportResponse:
+    # 1. Fetch User Profile
+    profile = await db.profiles.find_one({"user_id": user_id})
+    if not profile:
+        raise HTTPException(status_code=400, detail="Profile required to generate benchmark")
+    
+    user_role, user_country, user_exp = profile_cohort_inputs(profile)
+    
+    # 2. Get Cohort Statistics
+    version = await cohort_cache.dataset_version(analytics_db)
+    stats, cohort_name, cohort = await get_cohort_stats(analytics_db, user_country, user_role, user_exp, version)
+    
+    if not stats:
+        # Absolute Fallback if no data exists at all
+        raise HTTPException(status_code=404, detail="Not enough market data to generate a benchmark.")
+
+    # 3-4. Score and build the report
+    report = build_benchmark_report(user_id, profile, stats, cohort_name, dataset_version=version, cohort=cohort)
     
     # 5. Archive old reports
     await db.benchmark_reports.update_many(
         {"user_id": user_id, "is_current": True},
-        {"$set": {"is_current": False}}
+        {"$set": {"is_current": False, "archived_at": datetime.utcnow()}}
     )
     
     # 6. Save new report
     new_report = await db.benchmark_reports.insert_one(report.model_dump(by_alias=True, exclude={"id"}))
+    await retention.prune_after_write(db, "benchmark_reports", user_id)
     
     # 7. Return
     created_report = await db.benchmark_reports.find_one({"_id": new_report.inserted_id})
@@ -247,14 +363,109 @@ async def generate_benchmark(
 @router.get("/latest", response_model=BenchmarkReportResponse)
 async def get_latest_benchmark(
     current_user: Annotated[UserResponse, Depends(get_current_user)],
-    db = Depends(get_database)
+    db = Depends(get_database),
+    analytics_db = Depends(get_analytics_database)
 ):
-    report = await db.benchmark_reports.find_one({
-        "user_id": str(current_user.id),
-        "is_current": True
-    })
-    
+    """
+    The user's current report. One computed from an older survey dataset version
+    is checked on read: kept (and restamped) when its cohort's statistics didn't
+    change, otherwise recomputed.
+    """
+    user_id = str(current_user.id)
+    report = await db.benchmark_reports.find_one({"user_id": user_id, "is_current": True})
+
+    # Right after a profile save the background refresh may not have finished; wait for it
+    if not report and await wait_for_refresh(user_id):
+        report = await db.benchmark_reports.find_one({"user_id": user_id, "is_current": True})
+
     if not report:
         raise HTTPException(status_code=404, detail="No active benchmark report found")
-        
-    return BenchmarkReportResponse(**report)
\ No newline at end of file
+
+    version = await cohort_cache.dataset_version(analytics_db)
+    if report.get("dataset_version", 0) < version:
+        return await _revalidate(current_user, report, version, db, analytics_db)
+    return BenchmarkReportResponse(**report)
+
+async def _revalidate(current_user: UserResponse, report: dict, version: int, db, analytics_db) -> BenchmarkReportResponse:
+    """Bring a report from an older dataset version up to `version`, recomputing only if its cohort changed."""
+    profile = await db.profiles.find_one({"user_id": report["user_id"]})
+    if not profile:
+        return BenchmarkReportResponse(**report)
+
+    user_role, user_country, user_exp = profile_cohort_inputs(profile)
+    stats, _, cohort = await get_cohort_stats(analytics_db, user_country, user_role, user_exp, version)
+    if stats and cohort == report.get("cohort_key") and cohort_fingerprint(stats) == report.get("cohort_fingerprint"):
+        await db.benchmark_reports.update_one({"_id": report["_id"]}, {"$set": {"dataset_version": version}})
+        metrics.benchmark_revalidations.inc(result="unchanged")
+        return BenchmarkReportResponse(**report)
+
+    try:
+        refreshed = await generate_benchmark(current_user, db, analytics_db)
+    except HTTPException:
+        # No market data for the profile any more; the stale report beats none
+        metrics.benchmark_revalidations.inc(result="failed")
+        return BenchmarkReportResponse(**report)
+    metrics.benchmark_revalidations.inc(result="recomputed")
+    return refreshed
+
+DISTRIBUTION_QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+def _compact_histogram(counts: list) -> dict:
+    """Histogram over market_cube.HIST_EDGES with empty leading/trailing bins dropped."""
+    nonzero = [i for i, c in enumerate(counts) if c]
+    if not nonzero:
+        return {"bin_edges": [], "counts": []}
+    first, last = nonzero[0], nonzero[-1]
+    edges = market_cube.HIST_EDGES + [None] # The last bin is open-ended
+    return {"bin_edges": edges[first:last + 2], "counts": counts[first:last + 1]}
+
+async def _live_distribution(analytics_db, country: str, dev_role: str, years_exp: float):
+    """Distribution from the cohort statistics, for when the market cube hasn't been built."""
+    stats, cohort_name, _ = await get_cohort_stats(analytics_db, country, dev_role, years_exp)
+    if not stats:
+        return None, None
+    salaries = [doc["salary"] for doc in stats["salaries"]]
+    counts = [0] * market_cube.HIST_BINS
+    for salary in salaries:
+        counts[market_cube.hist_index(salary)] += 1
+    quantiles = [salaries[int(q * (len(salaries) - 1))] for q in DISTRIBUTION_QUANTILES] # Sorted by the pipeline
+    return {"count": len(salaries), "counts": counts, "quantiles": quantiles}, cohort_name
+
+@router.get("/distribution")
+async def get_salary_distribution(
+    current_user: Annotated[UserResponse, Depends(get_current_user)],
+    db = Depends(get_database),
+    analytics_db = Depends(get_analytics_database)
+):
+    """
+    Salary histogram and quantile markers for the user's cohort, resolved with
+    the same fallback tiers as /generate. Served from the precomputed market cube.
+    """
+    profile = await db.profiles.find_one({"user_id": str(current_user.id)})
+    if not profile:
+        raise HTTPException(status_code=400, detail="Profile required to show the salary distribution")
+    user_role, user_country, user_exp = profile_cohort_inputs(profile)
+
+    _, cube = await get_market_cube(analytics_db)
+    if cube is not None:
+        for filters, cohort_name in cohort_tiers(user_country, user_role, user_exp):
+            selected = cube.cohort_mask(filters)
+            if cube.count[selected].sum() >= MIN_COHORT_SIZE:
+                break
+        distribution = cube.distribution(selected, DISTRIBUTION_QUANTILES)
+        source = "cube"
+    else:
+        distribution, cohort_name = await _live_distribution(analytics_db, user_country, user_role, user_exp)
+        source = "live"
+
+    if not distribution or not distribution["count"]:
+        raise HTTPException(status_code=404, detail="Not enough market data to show a salary distribution.")
+
+    return {
+        "cohort": cohort_name,
+        "count": distribution["count"],
+        **_compact_histogram(distribution["counts"]),
+        "quantiles": {f"p{round(q * 100)}": v for q, v in zip(DISTRIBUTION_QUANTILES, distribution["quantiles"])},
+        "user_salary": profile.get("salary_package", 0),
+        "source": source,
+    }
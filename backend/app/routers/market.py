@@ -0,0 +1,81 @@
+import asyncio
+from typing import Annotated, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ..database import get_analytics_database
+from ..models import UserResponse
+from ..services import cohort_cache, market_cube
+from ..services.cohorts import MIN_COHORT_SIZE
+from ..singleflight import SingleFlight
+from .auth import get_current_user
+
+router = APIRouter(prefix="/market", tags=["market"])
+
+_loaded = {} # db name -> (dataset version, MarketCube or None)
+_load_flights = SingleFlight("market_cube_load")
+
+async def _load_cube(db):
+    meta = await db.dataset_metadata.find_one({"_id": market_cube.META_ID})
+    if not meta or meta.get("hist_edges") != market_cube.HIST_EDGES:
+        # Not built, or built by an older version with a different cell layout
+        return None
+    cells = await db[market_cube.CUBE_COLLECTION].find({}, {"_id": 0}).to_list(length=None)
+    # Building the column arrays is CPU-bound; keep it off the event loop
+    return await asyncio.to_thread(market_cube.MarketCube, cells, meta)
+
+async def get_market_cube(db):
+    """
+    (dataset version, MarketCube) for the current survey, loaded once per worker
+    and reloaded when the dataset version changes. The cube is None until built.
+    """
+    version = await cohort_cache.dataset_version(db)
+    loaded = _loaded.get(db.name)
+    if loaded and loaded[0] == version:
+        return loaded
+    cube = await _load_flights.do((db.name, version), lambda: _load_cube(db))
+    _loaded[db.name] = (version, cube)
+    return version, cube
+
+def _parse_quantiles(value: str) -> List[float]:
+    try:
+        quantiles = [float(q) for q in value.split(",") if q.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="quantiles must be comma-separated numbers")
+    if not quantiles or any(q < 0 or q > 1 for q in quantiles):
+        raise HTTPException(status_code=400, detail="quantiles must be between 0 and 1")
+    return quantiles
+
+@router.get("/explore")
+async def explore_market(
+    current_user: Annotated[UserResponse, Depends(get_current_user)],
+    country: Annotated[List[str], Query()] = [],
+    dev_role: Annotated[List[str], Query()] = [],
+    exp_bucket: Annotated[List[str], Query()] = [],
+    group_by: Annotated[List[str], Query()] = [],
+    quantiles: str = "0.1,0.25,0.5,0.75,0.9",
+    top_skills: int = Query(10, ge=0, le=50),
+    min_count: int = Query(MIN_COHORT_SIZE, ge=1),
+    limit: int = Query(100, ge=1, le=1000),
+    analytics_db = Depends(get_analytics_database)
+):
+    """
+    Salary quantiles and skill prevalence for the survey, filtered by country,
+    dev_role and exp_bucket (each repeatable) and grouped by any of them. A
+    dev_role filter matches every DevType answer listing that role.
+    Served from the precomputed market cube; groups smaller than min_count are omitted.
+    """
+    unknown = [dim for dim in group_by if dim not in market_cube.DIMENSIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"group_by must be among {market_cube.DIMENSIONS}")
+    parsed_quantiles = _parse_quantiles(quantiles)
+
+    version, cube = await get_market_cube(analytics_db)
+    if cube is None:
+        raise HTTPException(status_code=503, detail="Market cube not built yet; run scripts/build_market_cube.py")
+
+    groups = cube.rollup(
+        {"country": country, "dev_role": dev_role, "exp_bucket": exp_bucket},
+        list(dict.fromkeys(group_by)), parsed_quantiles, top_skills, min_count, limit,
+    )
+    return {"dataset_version": version, "group_by": group_by, "groups": groups}
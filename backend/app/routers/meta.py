@@ -0,0 +1,76 @@
+import hashlib
+import json
+from typing import Annotated, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+
+from ..database import get_analytics_database
+from ..services import cohort_cache, survey_options
+from ..singleflight import SingleFlight
+
+router = APIRouter(prefix="/meta", tags=["meta"])
+
+_loaded = {} # db name -> (dataset version, {kind: [(lowercased words, option)]} or None)
+_load_flights = SingleFlight("survey_options_load")
+
+def _search_index(options: dict) -> dict:
+    return {
+        kind: [([word for word in option["value"].lower().replace(",", " ").split()], option) for option in values]
+        for kind, values in options.items()
+    }
+
+async def _load_options(db):
+    meta = await db.dataset_metadata.find_one({"_id": survey_options.META_ID})
+    return _search_index(meta["options"]) if meta else None
+
+async def get_survey_options(db):
+    """(dataset version, search index) for the current survey, reloaded when the dataset version changes."""
+    version = await cohort_cache.dataset_version(db)
+    loaded = _loaded.get(db.name)
+    if loaded and loaded[0] == version:
+        return loaded
+    index = await _load_flights.do((db.name, version), lambda: _load_options(db))
+    _loaded[db.name] = (version, index)
+    return version, index
+
+def _matches(words: list, option: dict, prefix: str) -> bool:
+    """Prefix of the whole value or of any word in it, case-insensitive ("states" finds "United States of America")."""
+    return option["value"].lower().startswith(prefix) or any(word.startswith(prefix) for word in words)
+
+@router.get("/options")
+async def get_options(
+    request: Request,
+    response: Response,
+    kind: Annotated[List[str], Query()] = [],
+    prefix: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    analytics_db = Depends(get_analytics_database)
+):
+    """
+    Survey options for the profile form (countries, dev_roles, languages,
+    databases, platforms, frameworks), most common first, with respondent counts.
+    `kind` (repeatable) selects lists, `prefix` filters them server-side and
+    `limit` caps each. Public and cacheable: responses carry an ETag tied to the
+    dataset version, and a matching If-None-Match gets 304.
+    """
+    unknown = [k for k in kind if k not in survey_options.OPTION_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"kind must be among {list(survey_options.OPTION_FIELDS)}")
+
+    version, index = await get_survey_options(analytics_db)
+    if index is None:
+        raise HTTPException(status_code=503, detail="Survey options not built yet; run scripts/build_market_cube.py")
+
+    query = json.dumps([version, sorted(set(kind)), prefix, limit])
+    etag = f'"{hashlib.sha1(query.encode()).hexdigest()[:16]}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=300"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    needle = (prefix or "").strip().lower()
+    options = {}
+    for name in kind or survey_options.OPTION_FIELDS:
+        values = [option for words, option in index[name] if not needle or _matches(words, option, needle)]
+        options[name] = values[:limit] if limit else values
+    return {"dataset_version": version, "options": options}
@@ -3,24 +3,41 @@ from fastapi import APIRouter, Depends, HTTPException
 from datetime import datetime
 from bson import ObjectId
 
-from ..database import get_database
+from ..database import get_database, get_analytics_database
 from ..models import (
     CareerPlanResponse, CareerPlanInDB, UserResponse, 
-    Recommendation, RecommendationUpdate
+    Recommendation, RecommendationUpdate, RECOMMENDATION_CATEGORIES, PRIORITY_LEVELS
 )
-from ..services import ai_advisor
+from ..config import get_settings
+from ..services import ai_advisor, plan_rules, retention
+from ..admission import admit, plan_generation
+from ..debounce import Debouncer
+from ..singleflight import SingleFlight
 from .auth import get_current_user
-from .benchmarks import generate_benchmark
+from .benchmarks import generate_benchmark, plan_refresh_pending
+
+settings = get_settings()
 
 router = APIRouter(prefix="/plan", tags=["plan"])
 
-@router.post("/generate", response_model=CareerPlanResponse, response_model_by_alias=False)
+_plan_flights = SingleFlight("plan_generate") # keyed by user_id
+# ADVISOR_INSTANT_PLAN: replaces the rule-based plan just served with the advisor's, keyed by user_id
+_plan_upgrades = Debouncer("plan_upgrade", 0)
+
+@router.post("/generate", response_model=CareerPlanResponse, response_model_by_alias=False,
+              dependencies=[Depends(admit(plan_generation))])
 async def generate_career_plan(
     current_user: Annotated[UserResponse, Depends(get_current_user)],
-    db = Depends(get_database)
+    db = Depends(get_database),
+    analytics_db = Depends(get_analytics_database)
 ):
     user_id = str(current_user.id)
-    
+    # Concurrent requests for the same user share one generation (and one LLM call)
+    return await _plan_flights.do(user_id, lambda: _generate_career_plan(current_user, db, analytics_db))
+
+async def _generate_career_plan(current_user: UserResponse, db, analytics_db) -> CareerPlanResponse:
+    user_id = str(current_user.id)
+
     # 1. Fetch Profile
     profile = await db.profiles.find_one({"user_id": user_id})
     if not profile:
@@ -40,7 +57,7 @@ async def generate_career_plan(
         else:
             # Generate new one if missing
             # calling the router function directly, passing dependencies manually
-            res = await generate_benchmark(current_user, db)
+            res = await generate_benchmark(current_user, db, analytics_db)
             # Convert response model to dict
             benchmark_data = res.model_dump(by_alias=True)
             
@@ -51,33 +68,20 @@ async def generate_career_plan(
 
     # 3. Call AI Advisor
     # Profile is already a dict-like from Mongo
-    ai_plan = await ai_advisor.generate_career_advice(profile, benchmark_data)
+    instant = settings.ADVISOR_INSTANT_PLAN and settings.ADVISOR_MODE != "rules"
+    if instant:
+        # The advisor's plan replaces this one when it arrives (see _upgrade_plan)
+        ai_plan = plan_rules.build_plan(profile, benchmark_data)
+    else:
+        ai_plan = await ai_advisor.generate_career_advice(profile, benchmark_data)
     
     # 4. Process Recommendations
-    recommendations = []
-    for rec in ai_plan.get("recommendations", []):
-         # Validate category and priority
-        category = rec.get("category", "strategic").lower()
-        if category not in ["compensation", "skills", "strategic"]:
-            category = "strategic"
-            
-        priority = rec.get("priority_level", "medium").lower()
-        if priority not in ["high", "medium", "low"]:
-            priority = "medium"
-
-        recommendations.append(Recommendation(
-            title=rec.get("title", "Untitled Recommendation"),
-            description=rec.get("description", ""),
-            category=category,
-            expected_impact=rec.get("expected_impact", ""),
-            data_source=rec.get("data_source", "AI Advisor"),
-            priority_level=priority
-        ))
+    recommendations = _recommendations(ai_plan)
         
     # 5. Archive old plans
     await db.career_plans.update_many(
         {"user_id": user_id, "is_active": True},
-        {"$set": {"is_active": False}}
+        {"$set": {"is_active": False, "archived_at": datetime.utcnow()}}
     )
     
     # 6. Save New Plan
@@ -98,20 +102,66 @@ async def generate_career_plan(
     )
     
     new_plan = await db.career_plans.insert_one(plan_in_db.model_dump(by_alias=True, exclude={"id"}))
+    await retention.prune_after_write(db, "career_plans", user_id)
     created_plan = await db.career_plans.find_one({"_id": new_plan.inserted_id})
+
+    if instant:
+        _plan_upgrades.schedule(user_id, lambda: _upgrade_plan(db, created_plan, profile, benchmark_data))
+        created_plan["stale"] = True
     
     return CareerPlanResponse(**created_plan)
 
+def _recommendations(ai_plan: dict) -> list:
+    recommendations = []
+    for rec in ai_plan.get("recommendations", []):
+         # Validate category and priority
+        category = rec.get("category", "strategic").lower()
+        if category not in RECOMMENDATION_CATEGORIES:
+            category = "strategic"
+            
+        priority = rec.get("priority_level", "medium").lower()
+        if priority not in PRIORITY_LEVELS:
+            priority = "medium"
+
+        recommendations.append(Recommendation(
+            title=rec.get("title", "Untitled Recommendation"),
+            description=rec.get("description", ""),
+            category=category,
+            expected_impact=rec.get("expected_impact", ""),
+            data_source=rec.get("data_source", "AI Advisor"),
+            priority_level=priority
+        ))
+    return recommendations
+
+async def _upgrade_plan(db, rules_plan: dict, profile: dict, benchmark_data: dict):
+    """
+    Replace the rule-based plan served by /generate with the advisor's, in
+    place. Skipped if the advisor fell back to the same rules, or once the
+    user has touched the plan (a status or note changed, or it was replaced).
+    """
+    ai_plan = await ai_advisor.generate_career_advice(profile, benchmark_data)
+    if ai_plan == plan_rules.build_plan(profile, benchmark_data):
+        return
+    recommendations = [rec.model_dump() for rec in _recommendations(ai_plan)]
+    # Matching the served recommendations exactly makes this a compare-and-set
+    await db.career_plans.update_one(
+        {"_id": rules_plan["_id"], "is_active": True, "recommendations": rules_plan["recommendations"]},
+        {"$set": {
+            "summary": ai_plan.get("summary", ""),
+            "long_term_goal": ai_plan.get("long_term_goal", ""),
+            "recommendations": recommendations,
+            "generated_at": datetime.utcnow(),
+        }}
+    )
+
 @router.get("", response_model=CareerPlanResponse, response_model_by_alias=False)
 async def get_current_plan(
     current_user: Annotated[UserResponse, Depends(get_current_user)],
     db = Depends(get_database)
 ):
-    plan = await db.career_plans.find_one({
-        "user_id": str(current_user.id),
-        "is_active": True
-    })
-    
+    user_id = str(current_user.id)
+    plan = await db.career_plans.find_one({"user_id": user_id, "is_active": True})
+
     if not plan:
         raise HTTPException(status_code=404, detail="No active career plan found")
         
@@ -139,6 +189,9 @@ async def get_current_plan(
         percentage = round((completed_count / total_active) * 100)
         
     plan["overall_completion_percentage"] = percentage
+    # A refresh after a profile save, or the advisor's plan replacing an instant one, is on its way;
+    # serve this one rather than wait for the advisor
+    plan["stale"] = plan_refresh_pending(user_id) or _plan_upgrades.pending(user_id)
     
     return CareerPlanResponse(**plan)
 
@@ -2,9 +2,13 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
 from datetime import datetime
 
-from ..database import get_database
+from ..config import get_settings
+from ..database import get_database, get_durable_database, get_analytics_database
 from ..models import ProfileUpdate, ProfileResponse, ProfileInDB, UserResponse
 from .auth import get_current_user
+from .benchmarks import schedule_refresh
+
+settings = get_settings()
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
@@ -22,7 +26,9 @@ async def get_profile(
 async def update_profile(
     profile_update: ProfileUpdate,
     current_user: Annotated[UserResponse, Depends(get_current_user)],
-    db = Depends(get_database)
+    db = Depends(get_database),
+    durable_db = Depends(get_durable_database),
+    analytics_db = Depends(get_analytics_database)
 ):
     user_id = str(current_user.id)
     
@@ -35,29 +41,31 @@ async def update_profile(
     )
     
     # Upsert profile (update if exists, insert if not)
-    result = await db.profiles.update_one(
+    result = await durable_db.profiles.update_one(
         {"user_id": user_id},
         {"$set": profile_in_db.model_dump(by_alias=True, exclude={"id"})},
         upsert=True
     )
     
     # Fetch the updated/created profile to return
-    updated_profile = await db.profiles.find_one({"user_id": user_id})
+    updated_profile = await durable_db.profiles.find_one({"user_id": user_id})
     
     # IMPORTANT: Invalidate old benchmark reports and career plans
     # Mark all existing benchmark reports as not current
     await db.benchmark_reports.update_many(
         {"user_id": user_id, "is_current": True},
-        {"$set": {"is_current": False}}
+        {"$set": {"is_current": False, "archived_at": datetime.utcnow()}}
     )
     
     # Mark all existing career plans as not active
     await db.career_plans.update_many(
         {"user_id": user_id, "is_active": True},
-        {"$set": {"is_active": False}}
+        {"$set": {"is_active": False, "archived_at": datetime.utcnow()}}
     )
     
-    # Note: The frontend should call /benchmarks/generate and /plan/generate
-    # to create new reports based on the updated profile
+    # Regenerate in the background so the benchmark page finds the new report;
+    # /benchmarks/latest waits for a refresh that hasn't finished yet
+    if settings.PROFILE_REFRESH_ENABLED:
+        schedule_refresh(current_user, db, analytics_db)
     
     return ProfileResponse(**updated_profile)
\ No newline at end of file
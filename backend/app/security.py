@@ -1,7 +1,6 @@
-import requests
-from jose import jwt
 from fastapi import HTTPException
 from .config import get_settings
+from . import metrics
 
 settings = get_settings()
 
@@ -11,15 +10,28 @@ _jwks_cache = {}
 
 def get_jwks(issuer_url: str = None):
     if _jwks_cache and (not issuer_url or settings.CLERK_ISSUER_URL):
+        metrics.record_cache("jwks", hit=True)
         return _jwks_cache
+    metrics.record_cache("jwks", hit=False)
     
     url_to_use = issuer_url or settings.CLERK_ISSUER_URL
+
+    # Published once by the shared dataset publisher instead of per worker
+    if settings.SHARED_DATASET_NAME and url_to_use == settings.CLERK_ISSUER_URL:
+        from . import shared_data
+
+        shared_jwks = shared_data.jwks()
+        if shared_jwks:
+            _jwks_cache.update(shared_jwks)
+            return _jwks_cache
     
     try:
         if not url_to_use:
             print("Warning: No issuer URL available for JWKS.")
             return {}
             
+        import requests # Deferred: only needed on a JWKS cache miss
+
         jwks_url = f"{url_to_use}/.well-known/jwks.json"
         response = requests.get(jwks_url)
         response.raise_for_status()
@@ -31,6 +43,8 @@ def get_jwks(issuer_url: str = None):
         return {}
 
 def verify_clerk_token(token: str):
+    from jose import jwt # Deferred to keep app import (and worker cold start) light
+
     try:
         # First decode unverified to get the issuer if not configured
         unverified_claims = jwt.get_unverified_claims(token)
@@ -0,0 +1,103 @@
+"""
+Record/replay of Gemini calls made by the AI advisor (ADVISOR_RECORD_MODE).
+
+record
+    Real calls go through as usual; each one is also appended to the JSONL
+    file at ADVISOR_RECORD_PATH with its prompt, system instruction,
+    response text, latency and token counts.
+replay
+    No network and no API key: calls are answered from the recording with
+    the recorded latency (slept on the calling thread, like a real call).
+    With ADVISOR_REPLAY_MATCH=exact a call must match a recording of the
+    same model, system instruction, prompt and generation config; with
+    "any" a miss deterministically picks another recording of the same
+    model and system instruction, so load tests with arbitrary profiles
+    still get realistic responses.
+
+scripts/advisor_recordings.py summarizes recordings and compares prompt
+sizes between two of them.
+"""
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+class RecordingMissError(Exception):
+    """No recording matches a call in replay mode."""
+
+def call_key(model: str, system_instruction: str, prompt: str, generation_config=None) -> str:
+    payload = json.dumps([model, system_instruction, prompt, generation_config], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _instruction_key(model: str, system_instruction: str) -> str:
+    return hashlib.sha256(json.dumps([model, system_instruction]).encode()).hexdigest()
+
+def load_recordings(path: str) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+class RecordedResponse:
+    """Stand-in for a GenerateContentResponse; has what ai_advisor reads from one."""
+
+    def __init__(self, record: dict):
+        self.text = record["response_text"]
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=record.get("prompt_tokens", 0),
+            candidates_token_count=record.get("completion_tokens", 0),
+        )
+
+class RecordingStore:
+    def __init__(self, path: str, match: str = "exact"):
+        self.path = path
+        self.match = match
+        self._lock = threading.Lock()
+        self._by_key = None
+        self._by_instruction = None
+
+    def _index(self):
+        if self._by_key is None:
+            records = load_recordings(self.path)
+            self._by_key = {record["key"]: record for record in records}
+            self._by_instruction = {}
+            for record in records:
+                self._by_instruction.setdefault(record["instruction_key"], []).append(record)
+        return self._by_key
+
+    def record(self, model: str, system_instruction: str, generate, prompt: str, **kwargs):
+        """Call `generate(prompt, **kwargs)` and append it to the recording."""
+        start = time.perf_counter()
+        response = generate(prompt, **kwargs)
+        latency = time.perf_counter() - start
+        usage = getattr(response, "usage_metadata", None)
+        record = {
+            "key": call_key(model, system_instruction, prompt, kwargs.get("generation_config")),
+            "instruction_key": _instruction_key(model, system_instruction),
+            "model": model,
+            "system_instruction": system_instruction,
+            "prompt": prompt,
+            "response_text": response.text,
+            "latency_seconds": round(latency, 4),
+            "prompt_tokens": getattr(usage, "prompt_token_count", 0) or 0,
+            "completion_tokens": getattr(usage, "candidates_token_count", 0) or 0,
+            "recorded_at": datetime.utcnow().isoformat(),
+        }
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        return response
+
+    def replay(self, model: str, system_instruction: str, prompt: str, **kwargs) -> RecordedResponse:
+        """Answer a call from the recording, after its recorded latency."""
+        key = call_key(model, system_instruction, prompt, kwargs.get("generation_config"))
+        with self._lock:
+            record = self._index().get(key)
+            if record is None and self.match == "any":
+                candidates = self._by_instruction.get(_instruction_key(model, system_instruction), [])
+                if candidates:
+                    record = candidates[int(key, 16) % len(candidates)]
+        if record is None:
+            raise RecordingMissError(f"No recording in {self.path} for this {model} call")
+        time.sleep(record["latency_seconds"])
+        return RecordedResponse(record)
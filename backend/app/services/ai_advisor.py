@@ -1,109 +1,256 @@
-import json
-import google.generativeai as genai
+import asyncio
+import functools
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from ..config import get_settings
+from ..models import CareerPlanBase, Recommendation, RECOMMENDATION_CATEGORIES, PRIORITY_LEVELS
+from .. import metrics
+from . import advisor_recordings, plan_json, plan_rules, prompt_builder, resilience
 
 settings = get_settings()
 
-if settings.GEMINI_API_KEY:
-    genai.configure(api_key=settings.GEMINI_API_KEY)
+# The Gemini SDK is the heaviest import in the app (~0.5s, it pulls in the
+# protobuf/gRPC stack), so it is imported and configured on first use.
+_genai = None
+
+def _get_genai():
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        if settings.GEMINI_API_ENDPOINT:
+            genai.configure(
+                api_key=settings.GEMINI_API_KEY,
+                transport="rest",
+                client_options={"api_endpoint": settings.GEMINI_API_ENDPOINT}
+            )
+        else:
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+        _genai = genai
+    return _genai
+
+async def load_sdk():
+    """Import the Gemini SDK off the event loop (no-op once loaded)."""
+    if _genai is None and settings.GEMINI_API_KEY:
+        await asyncio.to_thread(_get_genai)
+
+# Recommendation fields the model writes; the rest (id, status, dates) are ours
+LLM_RECOMMENDATION_FIELDS = ["category", "title", "description", "expected_impact", "data_source", "priority_level"]
+FIELD_ENUMS = {"category": RECOMMENDATION_CATEGORIES, "priority_level": PRIORITY_LEVELS}
+
+def _plan_schema() -> dict:
+    """Gemini response schema for a plan, derived from CareerPlanBase and Recommendation."""
+    properties = {
+        name: {"type": "STRING", "enum": FIELD_ENUMS[name]} if name in FIELD_ENUMS else {"type": "STRING"}
+        for name in Recommendation.model_fields if name in LLM_RECOMMENDATION_FIELDS
+    }
+    return {
+        "type": "OBJECT",
+        "properties": {
+            "summary": {"type": "STRING"},
+            "long_term_goal": {"type": "STRING"},
+            "recommendations": {
+                "type": "ARRAY",
+                "items": {"type": "OBJECT", "properties": properties, "required": list(properties)},
+            },
+        },
+        "required": list(CareerPlanBase.model_fields),
+    }
+
+PLAN_SCHEMA = _plan_schema()
+
+_models = {} # system instruction -> GenerativeModel
+
+def _get_model(system_instruction: str):
+    model = _models.get(system_instruction)
+    if model is None:
+        model = _models[system_instruction] = _get_genai().GenerativeModel(
+            settings.GEMINI_MODEL, system_instruction=system_instruction
+        )
+    return model
+
+def _transient_errors() -> tuple:
+    """Errors worth retrying: overload, rate limits, server errors, timeouts and dropped connections."""
+    from google.api_core import exceptions
+    import requests
+    return (
+        exceptions.ServiceUnavailable, exceptions.TooManyRequests, exceptions.InternalServerError,
+        exceptions.DeadlineExceeded, exceptions.GatewayTimeout,
+        requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError,
+    )
+
+def _breaker_errors() -> tuple:
+    """Errors that count against the circuit breaker: transient ones, plus a revoked or
+    misconfigured API key, which fails every call until someone fixes it."""
+    from google.api_core import exceptions
+    return _transient_errors() + (exceptions.PermissionDenied, exceptions.Unauthenticated)
+
+_recordings = None
+
+def _blocking_call(system_instruction: str):
+    """The blocking generate_content for a system instruction, recorded or replayed per ADVISOR_RECORD_MODE."""
+    global _recordings
+    mode = settings.ADVISOR_RECORD_MODE
+    if mode and _recordings is None:
+        _recordings = advisor_recordings.RecordingStore(settings.ADVISOR_RECORD_PATH, settings.ADVISOR_REPLAY_MATCH)
+    if mode == "replay":
+        return functools.partial(_recordings.replay, settings.GEMINI_MODEL, system_instruction)
+    generate = _get_model(system_instruction).generate_content
+    if mode == "record":
+        return functools.partial(_recordings.record, settings.GEMINI_MODEL, system_instruction, generate)
+    return generate
+
+# Gemini calls block a thread for their whole duration, so they get their own pool
+# rather than sharing the default executor (cpu_count + 4 threads) with everything else
+_executor = ThreadPoolExecutor(max_workers=settings.GEMINI_MAX_THREADS, thread_name_prefix="gemini")
+
+breaker = resilience.CircuitBreaker(
+    "gemini",
+    window=settings.GEMINI_BREAKER_WINDOW,
+    min_calls=settings.GEMINI_BREAKER_MIN_CALLS,
+    failure_rate=settings.GEMINI_BREAKER_FAILURE_RATE,
+    slow_seconds=settings.GEMINI_BREAKER_SLOW_SECONDS,
+    slow_rate=settings.GEMINI_BREAKER_SLOW_RATE,
+    open_seconds=settings.GEMINI_BREAKER_OPEN_SECONDS,
+    probes=settings.GEMINI_BREAKER_PROBES,
+)
+hedger = resilience.Hedger(
+    "gemini",
+    quantile=settings.GEMINI_HEDGE_QUANTILE,
+    budget=settings.GEMINI_HEDGE_BUDGET,
+    min_delay=settings.GEMINI_HEDGE_MIN_DELAY_SECONDS,
+)
+
+async def _generate(system_instruction: str, prompt: str):
+    """
+    generate_content on the Gemini thread pool (the SDK's async client doesn't work
+    over the REST transport), with bounded, jittered retries of transient errors.
+    Each attempt goes through the circuit breaker (raising CircuitOpenError
+    while it is open) and may be hedged.
+    """
+    generate = _blocking_call(system_instruction)
+    transient = _transient_errors()
+    breaker_errors = _breaker_errors()
+    # We do our own retries; the SDK's default policy can retry a 503 for minutes
+    request_options = {"timeout": settings.GEMINI_TIMEOUT_SECONDS, "retry": None}
+    generation_config = {"response_mime_type": "application/json", "response_schema": PLAN_SCHEMA}
+    loop = asyncio.get_running_loop()
+    call = lambda: loop.run_in_executor(_executor, functools.partial(
+        generate, prompt,
+        generation_config=generation_config, request_options=request_options
+    ))
+    for attempt in range(1, settings.GEMINI_MAX_ATTEMPTS + 1):
+        if not breaker.allow():
+            raise resilience.CircuitOpenError(f"Gemini circuit open, retry in {breaker.retry_after():.0f}s")
+        start = time.perf_counter()
+        try:
+            # Hedging doubles the load, so not while the breaker is probing a recovering upstream
+            response = await hedger.run(call, hedge=breaker.state == resilience.CLOSED)
+        except asyncio.CancelledError:
+            breaker.cancel()
+            raise
+        except Exception as e:
+            elapsed = time.perf_counter() - start
+            # Upstream trouble and auth failures count against the breaker, not e.g. a rejected request
+            breaker.record(failed=isinstance(e, breaker_errors), seconds=elapsed)
+            metrics.gemini_request_duration.observe(elapsed, outcome="error")
+            metrics.gemini_requests.inc(outcome="error")
+            if not isinstance(e, transient) or attempt == settings.GEMINI_MAX_ATTEMPTS:
+                raise
+            metrics.gemini_retries.inc(reason=type(e).__name__)
+            backoff = min(settings.GEMINI_RETRY_MAX_SECONDS, settings.GEMINI_RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+            await asyncio.sleep(random.uniform(0, backoff))
+            continue
+        elapsed = time.perf_counter() - start
+        breaker.record(failed=False, seconds=elapsed)
+        metrics.gemini_request_duration.observe(elapsed, outcome="success")
+        metrics.gemini_requests.inc(outcome="success")
+        _record_token_usage(response)
+        return response
+
+def _complete_plan(plan, fallback: dict) -> dict:
+    """
+    Validate a parsed plan, dropping unusable recommendations and filling
+    missing fields from the rule-based plan. Raises ValueError if it isn't a plan at all.
+    """
+    if not isinstance(plan, dict):
+        raise ValueError("plan is not a JSON object")
+    filled = False
+    for field in ("summary", "long_term_goal"):
+        if not isinstance(plan.get(field), str) or not plan[field].strip():
+            plan[field] = fallback[field]
+            filled = True
+
+    raw = plan.get("recommendations")
+    raw = raw if isinstance(raw, list) else []
+    recommendations = []
+    for rec in raw:
+        # A recommendation cut off before its title or description is useless; the rest have defaults
+        if not isinstance(rec, dict) or not all(isinstance(rec.get(f), str) and rec[f].strip() for f in ("title", "description")):
+            continue
+        for field, allowed in FIELD_ENUMS.items():
+            value = rec.get(field)
+            if isinstance(value, str) and value.lower() in allowed:
+                rec[field] = value.lower()
+            else:
+                rec[field] = Recommendation.model_fields[field].default
+                filled = True
+        recommendations.append({field: rec[field] for field in LLM_RECOMMENDATION_FIELDS if rec.get(field)})
+    if len(recommendations) < len(raw):
+        metrics.advisor_plan_repairs.inc(kind="dropped_recommendations")
+    if not recommendations:
+        recommendations = fallback["recommendations"]
+        filled = True
+    if filled:
+        metrics.advisor_plan_repairs.inc(kind="missing_fields")
+    plan["recommendations"] = recommendations
+    return plan
 
 async def generate_career_advice(profile: dict, benchmark_data: dict) -> dict:
     """
-    Generates AI-powered career advice based on user profile and benchmark data.
+    Generates career advice based on user profile and benchmark data: the
+    rule-based plan, or Gemini's (see ADVISOR_MODE) with the rule-based plan as fallback.
     """
-    if not settings.GEMINI_API_KEY:
+    rules_plan = plan_rules.build_plan(profile, benchmark_data)
+    if settings.ADVISOR_MODE == "rules":
+        return rules_plan
+    if not settings.GEMINI_API_KEY and settings.ADVISOR_RECORD_MODE != "replay":
         # Fallback for when API key is missing
-        return _get_fallback_plan()
-
-    # Extract user details
-    role = profile.get('current_title', 'Developer')
-    experience = profile.get('years_experience', 0)
-    skills = ', '.join(profile.get('technical_skills', []))
-    salary = profile.get('salary_package', 0)
-    country = profile.get('country', 'Unknown')
-
-    # Construct a detailed prompt
-    prompt = f"""
-    You are an expert technical career coach specializing in software development careers.
-    
-    User Profile:
-    - Role: {role}
-    - Experience: {experience} years
-    - Location: {country}
-    - Skills: {skills}
-    - Salary Input: {salary} (Note: This value might be in local currency or USD. Use the country context to infer.)
-    
-    Market Benchmark Context (Cohort: {benchmark_data.get('cohort_name', 'Global')}):
-    - Salary Quartile: {benchmark_data.get('compensation_quartile', 'N/A')} percentile (based on USD converted data)
-    - Market Comparison: {benchmark_data.get('market_salary_comparison', 'N/A')}
-    - Top Missing Skills: {', '.join(benchmark_data.get('missing_critical_skills', []))}
-    - Skill Match Score: {benchmark_data.get('skill_match_score', 'N/A')}/100
-    - Insights: {json.dumps(benchmark_data.get('insights', {}), default=str)}
-    
-    Task: Generate a personalized career development plan.
-    
-    CRITICAL: Analyze the salary. The benchmark is in USD. If the user's salary input ({salary}) seems to be in local currency (e.g., significantly higher than typical USD amounts for {country}), please calculate an approximate conversion to USD in your reasoning or simply note the discrepancy in the summary. Do not treat a local currency amount as a USD amount if it's obviously different (e.g. 3,000,000).
-    
-    The output MUST be a valid JSON object matching this structure exactly:
-    {{
-        "summary": "2-3 sentences analyzing their position relative to the market, addressing any salary currency nuances if detected.",
-        "long_term_goal": "A strategic 1-2 year goal (e.g., 'Senior Engineer', 'Tech Lead').",
-        "recommendations": [
-            {{
-                "category": "compensation" | "skills" | "strategic",
-                "title": "Actionable title",
-                "description": "Specific advice.",
-                "expected_impact": "Quantifiable outcome (e.g., +15% salary growth).",
-                "data_source": "General Industry Trends",
-                "priority_level": "high" | "medium" | "low"
-            }}
-        ]
-    }}
-    
-    Requirements:
-    - Provide exactly 5-7 high-quality recommendations. 
-    - If salary (adjusted for currency) is low (below 50th percentile), include specific compensation negotiation or job switching advice.
-    - If skill match is low, prioritize learning the missing critical skills.
-    - Ensure 'category' is one of the three allowed values.
-    - Ensure 'priority_level' is one of the three allowed values.
-    
-    Return ONLY valid JSON. Do not use Markdown code blocks.
-    """
+        metrics.advisor_fallback_plans.inc(reason="no_api_key")
+        return rules_plan
 
+    budget = settings.ADVISOR_PROMPT_TOKEN_BUDGET
+    if settings.ADVISOR_MODE == "rewrite":
+        system_instruction, prompt = prompt_builder.rewrite_prompt(profile, rules_plan, budget)
+    else:
+        system_instruction, prompt = prompt_builder.plan_prompt(profile, benchmark_data, budget)
+
+    await load_sdk()
     try:
-        model = genai.GenerativeModel(settings.GEMINI_MODEL)
-        response = model.generate_content(prompt)
-        
-        # Clean response text (remove potential markdown code blocks)
-        clean_text = response.text.replace("```json", "").replace("```", "").strip()
-        
-        plan_data = json.loads(clean_text)
-        return plan_data
-        
+        response = await _generate(system_instruction, prompt)
+    except resilience.CircuitOpenError:
+        metrics.advisor_fallback_plans.inc(reason="circuit_open")
+        return rules_plan
     except Exception as e:
         print(f"LLM Error: {e}")
-        return _get_fallback_plan()
+        metrics.advisor_fallback_plans.inc(reason="llm_error")
+        return rules_plan
 
-def _get_fallback_plan() -> dict:
-    return {
-        "summary": "AI generation is currently unavailable. Here is a template plan to get you started.",
-        "long_term_goal": "Advance in current field by acquiring high-value skills.",
-        "recommendations": [
-            {
-                "category": "strategic",
-                "title": "Update Resume & LinkedIn",
-                "description": "Ensure your CV and public profile reflect your latest skills and achievements to attract recruiters.",
-                "expected_impact": "Increase profile visibility by 40%",
-                "data_source": "LinkedIn Talent Solutions",
-                "priority_level": "high"
-            },
-            {
-                "category": "skills",
-                "title": "Assess Technical Skills",
-                "description": "Review current job postings for your target role to identify top 3 missing technical skills.",
-                "expected_impact": "Aligns capabilities with market demand",
-                "data_source": "Indeed Job Trends",
-                "priority_level": "medium"
-            }
-        ]
-    }
\ No newline at end of file
+    try:
+        # Structured output should be plain JSON, but a reply cut off at the token limit is not
+        plan_data, repaired = plan_json.parse_plan_json(response.text)
+        if repaired:
+            metrics.advisor_plan_repairs.inc(kind="truncated_json")
+        return _complete_plan(plan_data, rules_plan)
+        
+    except Exception as e:
+        print(f"LLM response parse error: {e}")
+        metrics.advisor_fallback_plans.inc(reason="invalid_response")
+        return rules_plan
+
+def _record_token_usage(response):
+    usage = getattr(response, "usage_metadata", None)
+    if not usage:
+        return
+    metrics.gemini_tokens.inc(getattr(usage, "prompt_token_count", 0) or 0, type="prompt")
+    metrics.gemini_tokens.inc(getattr(usage, "candidates_token_count", 0) or 0, type="completion")
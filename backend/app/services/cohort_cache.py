@@ -0,0 +1,81 @@
+"""
+In-process cache for cohort resolution and cohort statistics.
+
+Entries are keyed by the survey dataset version, which scripts/ingest_survey.py
+bumps in the `dataset_metadata` collection after every load. Each worker
+re-reads the version at most every DATASET_VERSION_CHECK_SECONDS, so a
+re-ingestion invalidates every worker's cache within that interval without any
+coordination. Entries are also evicted least-recently-used beyond
+COHORT_CACHE_MAX_ENTRIES and expire after COHORT_CACHE_TTL_SECONDS.
+"""
+import time
+from collections import OrderedDict
+
+from ..config import get_settings
+from .. import metrics
+from ..singleflight import SingleFlight
+
+settings = get_settings()
+
+# dataset_metadata document _id holding the market_benchmarks version
+DATASET_ID = "market_benchmarks"
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire `ttl` seconds after being stored."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict() # key -> (expires_at, value), least recently used first
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, name: str):
+        """Cached value for `key` or None; `name` labels the hit/miss metrics."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            metrics.record_cache(name, hit=True)
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]
+        metrics.record_cache(name, hit=False)
+        return None
+
+    def set(self, key, value):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+cache = TTLCache(settings.COHORT_CACHE_MAX_ENTRIES, settings.COHORT_CACHE_TTL_SECONDS)
+
+_versions = {} # db name -> (version, checked_at)
+_version_flights = SingleFlight("dataset_version")
+
+async def _read_version(db) -> int:
+    doc = await db.dataset_metadata.find_one({"_id": DATASET_ID}, {"version": 1})
+    return doc.get("version", 0) if doc else 0
+
+async def dataset_version(db) -> int:
+    """Current survey dataset version, re-read from MongoDB at most every DATASET_VERSION_CHECK_SECONDS."""
+    known = _versions.get(db.name)
+    if known and time.monotonic() - known[1] < settings.DATASET_VERSION_CHECK_SECONDS:
+        return known[0]
+
+    version = await _version_flights.do(db.name, lambda: _read_version(db))
+    if known and known[0] != version:
+        # Entries for the old version can never be hit again; free them now rather than waiting for eviction
+        cache.clear()
+    _versions[db.name] = (version, time.monotonic())
+    return version
+
+def stale_report_query(version: int) -> dict:
+    """Current benchmark reports computed from a dataset version older than `version` (or never stamped)."""
+    return {"is_current": True, "dataset_version": {"$not": {"$gte": version}}}
@@ -0,0 +1,71 @@
+"""
+Cohort definitions shared by the MongoDB and in-memory (shared dataset)
+cohort statistics paths, so both resolve exactly the same fallback tiers.
+"""
+import hashlib
+import json
+from array import array
+
+from .survey_schema import EXP_BUCKET_LABELS, EXP_BUCKETS, bucket_range_label, exp_bucket_index
+
+# A cohort needs at least this many members before we stop relaxing constraints
+MIN_COHORT_SIZE = 10
+
+# Facet name -> (market_benchmarks field, number of top entries kept)
+SKILL_FACETS = {
+    "top_languages": ("languages", 10),
+    "top_databases": ("databases", 5),
+    "top_frameworks": ("frameworks", 5),
+}
+
+def _adjacent(bucket: int) -> list:
+    return list(range(max(0, bucket - 1), min(len(EXP_BUCKETS), bucket + 2)))
+
+def cohort_tiers(country: str, dev_role: str, years_exp: float):
+    """
+    Candidate cohorts from narrowest to broadest, as (filters, cohort_name).
+    `filters` may contain "country" and "dev_role" (one normalized role), and
+    always has "exp_buckets" (consecutive indexes into EXP_BUCKETS).
+    """
+    bucket = exp_bucket_index(years_exp)
+    extended = _adjacent(bucket)
+    extended_label = bucket_range_label(extended)
+
+    return [
+        # 1. Strict match
+        ({"country": country, "dev_role": dev_role, "exp_buckets": [bucket]},
+         f"{dev_role} in {country} ({EXP_BUCKET_LABELS[bucket]} yoe)"),
+        # 2. Adjacent experience buckets
+        ({"country": country, "dev_role": dev_role, "exp_buckets": extended},
+         f"{dev_role} in {country} (Extended Exp)"),
+        # 3. Global comparison for role
+        ({"dev_role": dev_role, "exp_buckets": extended},
+         f"{dev_role} (Global, {extended_label} yoe)"),
+        # 4. General tech in country
+        ({"country": country, "exp_buckets": extended},
+         f"Developers in {country}"),
+    ]
+
+def tier_query(filters: dict) -> dict:
+    """MongoDB match query for a tier's filters: equality and $in on the cohort indexes."""
+    buckets = filters["exp_buckets"]
+    query = {}
+    if "country" in filters:
+        query["country"] = filters["country"]
+    if "dev_role" in filters:
+        query["dev_roles"] = filters["dev_role"] # Multikey: matches respondents listing the role
+    query["exp_bucket"] = buckets[0] if len(buckets) == 1 else {"$in": buckets}
+    query["salary"] = {"$gt": 0} # Ensure valid salary
+    return query
+
+def cohort_key(match_query: dict) -> str:
+    """Stable identifier of a resolved cohort (its match query), stored on benchmark reports."""
+    return json.dumps(match_query, sort_keys=True)
+
+def cohort_fingerprint(stats: dict) -> str:
+    """Hash of a cohort's statistics (salaries and top skills), to tell whether a new dataset version changed them."""
+    digest = hashlib.sha1(array("d", (doc["salary"] for doc in stats["salaries"])).tobytes())
+    # Sorted, since the pipeline breaks count ties in no particular order
+    top = [sorted((item["_id"], item["count"]) for item in stats.get(facet) or []) for facet in SKILL_FACETS]
+    digest.update(json.dumps(top).encode())
+    return digest.hexdigest()[:16]
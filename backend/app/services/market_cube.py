@@ -0,0 +1,273 @@
+"""
+Precomputed market cube over market_benchmarks, for analyst roll-ups without
+aggregating the survey in production.
+
+Ingestion (scripts/ingest_survey.py, or scripts/build_market_cube.py for an
+existing collection) writes one `market_cube` document per
+(country, dev_role, years_experience) cell holding:
+    count, salary_sum   for means
+    bins, bin_counts    a mergeable log-bucketed salary quantile sketch
+                        (relative error SKETCH_ALPHA, DDSketch-style)
+    salary_hist         salary counts over the fixed HIST_EDGES bins, for charts
+    skill_idx, skill_counts
+                        how many members use each skill, indexed into the
+                        vocabulary stored in dataset_metadata["market_cube"]
+Each cell also carries its exp_bucket, so roll-ups can group by country, role
+and experience bucket. Merging cells is just adding their counts, which
+MarketCube does with numpy over the whole cube in memory.
+
+This module has no settings dependency, so ingestion scripts can import it
+with nothing but a database handle. numpy is only imported by the functions
+that need it, so importing the cell layout (HIST_EDGES, build_cells) doesn't
+load it at app startup.
+"""
+import math
+from bisect import bisect_right
+from datetime import datetime
+
+from .survey_schema import EXP_BUCKET_LABELS, exp_bucket, parse_dev_roles
+
+CUBE_COLLECTION = "market_cube"
+META_ID = "market_cube" # dataset_metadata document holding the vocabulary and sketch parameters
+
+SKILL_FIELDS = ["languages", "databases", "platforms", "frameworks"]
+DIMENSIONS = ["country", "dev_role", "exp_bucket"]
+
+SKETCH_ALPHA = 0.01 # Quantiles are within 1% of the true value
+SKETCH_GAMMA = (1 + SKETCH_ALPHA) / (1 - SKETCH_ALPHA)
+SKETCH_BINS = math.ceil(math.log(1e9) / math.log(SKETCH_GAMMA)) + 1 # Salaries from 1 to 1e9
+
+# Salary histogram bin edges: 0, then 1,000 doubling every 4 bins to ~1M; the last bin is open-ended
+HIST_EDGES = [0] + [round(1000 * 2 ** (k / 4)) for k in range(41)]
+HIST_BINS = len(HIST_EDGES)
+
+def hist_index(value: float) -> int:
+    return bisect_right(HIST_EDGES, value) - 1
+
+def sketch_index(value: float) -> int:
+    return min(SKETCH_BINS - 1, max(0, math.ceil(math.log(max(value, 1.0)) / math.log(SKETCH_GAMMA))))
+
+def sketch_quantiles(counts, quantiles) -> list:
+    """Estimate quantiles from one dense row (numpy array) of sketch bin counts; None when it is empty."""
+    import numpy as np
+
+    total = counts.sum()
+    if total == 0:
+        return [None for _ in quantiles]
+    cumulative = np.cumsum(counts)
+    values = []
+    for q in quantiles:
+        index = int(np.searchsorted(cumulative, q * (total - 1), side="right"))
+        values.append(round(2 * SKETCH_GAMMA ** index / (SKETCH_GAMMA + 1), 2))
+    return values
+
+def build_cells(documents):
+    """Aggregate market_benchmarks documents into cube cells; returns (cells, vocabulary)."""
+    vocabulary = {} # (field, name) -> index
+    cells = {}
+    for doc in documents:
+        salary = doc.get("salary")
+        if not salary or salary <= 0:
+            continue
+        years = float(doc["years_experience"])
+        key = (doc["country"], doc["dev_role"], years)
+        cell = cells.get(key)
+        if cell is None:
+            cell = cells[key] = {"count": 0, "salary_sum": 0.0, "bins": {}, "skills": {}, "hist": [0] * HIST_BINS}
+        cell["count"] += 1
+        cell["hist"][hist_index(float(salary))] += 1
+        cell["salary_sum"] += float(salary)
+        index = sketch_index(float(salary))
+        cell["bins"][index] = cell["bins"].get(index, 0) + 1
+        for field in SKILL_FIELDS:
+            for name in doc.get(field) or []:
+                skill = vocabulary.setdefault((field, name), len(vocabulary))
+                cell["skills"][skill] = cell["skills"].get(skill, 0) + 1
+
+    documents = []
+    for (country, dev_role, years), cell in cells.items():
+        bins = sorted(cell["bins"])
+        skills = sorted(cell["skills"])
+        documents.append({
+            "country": country,
+            "dev_role": dev_role,
+            "years_experience": years,
+            "exp_bucket": exp_bucket(years),
+            "count": cell["count"],
+            "salary_sum": cell["salary_sum"],
+            "bins": bins,
+            "bin_counts": [cell["bins"][i] for i in bins],
+            "salary_hist": cell["hist"],
+            "skill_idx": skills,
+            "skill_counts": [cell["skills"][i] for i in skills],
+        })
+    return documents, [list(key) for key in vocabulary]
+
+async def write_market_cube(db, documents, batch_size: int = 5000) -> int:
+    """Rebuild the market_cube collection and its metadata from market_benchmarks documents."""
+    cells, vocabulary = build_cells(documents)
+    collection = db[CUBE_COLLECTION]
+    await collection.drop()
+    for i in range(0, len(cells), batch_size):
+        await collection.insert_many(cells[i:i + batch_size], ordered=False)
+    await db.dataset_metadata.replace_one(
+        {"_id": META_ID},
+        {
+            "vocabulary": vocabulary,
+            "sketch_alpha": SKETCH_ALPHA,
+            "hist_edges": HIST_EDGES,
+            "cells": len(cells),
+            "built_at": datetime.utcnow(),
+        },
+        upsert=True,
+    )
+    return len(cells)
+
+def _sparse_rows(rows, dtype):
+    """Per-cell sparse vectors flattened into (lengths, values)."""
+    import numpy as np
+
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+    flat = np.fromiter((v for r in rows for v in r), dtype=dtype, count=int(lengths.sum()))
+    return lengths, flat
+
+class MarketCube:
+    """The market cube held in memory as column arrays, answering roll-ups by merging cells."""
+
+    def __init__(self, cells: list, meta: dict):
+        import numpy as np
+
+        self.vocabulary = [tuple(entry) for entry in meta["vocabulary"]]
+        self.field_skills = {
+            field: np.array([i for i, (f, _) in enumerate(self.vocabulary) if f == field], dtype=np.int64)
+            for field in SKILL_FIELDS
+        }
+        self.codes = {}
+        self.labels = {}
+        for dim in ["country", "dev_role"]:
+            labels = sorted({cell[dim] for cell in cells})
+            self.labels[dim] = labels
+            lookup = {label: i for i, label in enumerate(labels)}
+            self.codes[dim] = np.array([lookup[cell[dim]] for cell in cells], dtype=np.int32)
+        # Cells keep the raw DevType; role filters match every combination listing the role
+        self.label_roles = [set(parse_dev_roles(label)) for label in self.labels["dev_role"]]
+        self.labels["exp_bucket"] = EXP_BUCKET_LABELS
+        bucket_lookup = {label: i for i, label in enumerate(EXP_BUCKET_LABELS)}
+        self.codes["exp_bucket"] = np.array([bucket_lookup[cell["exp_bucket"]] for cell in cells], dtype=np.int32)
+
+        self.count = np.array([cell["count"] for cell in cells], dtype=np.int64)
+        self.salary_sum = np.array([cell["salary_sum"] for cell in cells], dtype=np.float64)
+        self.bin_lengths, self.bin_idx = _sparse_rows([cell["bins"] for cell in cells], np.int32)
+        _, self.bin_counts = _sparse_rows([cell["bin_counts"] for cell in cells], np.int64)
+        self.salary_hist = np.array([cell["salary_hist"] for cell in cells], dtype=np.int64).reshape(len(cells), HIST_BINS)
+        self.skill_lengths, self.skill_idx = _sparse_rows([cell["skill_idx"] for cell in cells], np.int32)
+        _, self.skill_counts = _sparse_rows([cell["skill_counts"] for cell in cells], np.int64)
+
+    def __len__(self):
+        return len(self.count)
+
+    def mask(self, filters: dict) -> "np.ndarray":
+        """Cells matching {dimension: [values]} (values ORed within a dimension, ANDed across)."""
+        import numpy as np
+
+        selected = np.ones(len(self), dtype=bool)
+        for dim, values in filters.items():
+            if not values:
+                continue
+            if dim == "dev_role":
+                wanted = set(values)
+                codes = [i for i, (label, roles) in enumerate(zip(self.labels[dim], self.label_roles))
+                         if label in wanted or roles & wanted]
+            else:
+                lookup = {label: i for i, label in enumerate(self.labels[dim])}
+                codes = [lookup[v] for v in values if v in lookup]
+            selected &= np.isin(self.codes[dim], codes)
+        return selected
+
+    def cohort_mask(self, filters: dict) -> "np.ndarray":
+        """Cells of a cohort tier from services.cohorts ({"country", "dev_role", "exp_buckets"})."""
+        import numpy as np
+
+        selected = self.mask({dim: [filters[dim]] for dim in ("country", "dev_role") if dim in filters})
+        return selected & np.isin(self.codes["exp_bucket"], filters["exp_buckets"])
+
+    def distribution(self, selected: "np.ndarray", quantiles: list) -> dict:
+        """Merged salary histogram and quantiles of the selected cells."""
+        import numpy as np
+
+        groups = np.where(selected, 0, -1)
+        sketch = self._merge(groups, 1, self.bin_lengths, self.bin_idx, self.bin_counts, SKETCH_BINS)[0]
+        return {
+            "count": int(self.count[selected].sum()),
+            "counts": self.salary_hist[selected].sum(axis=0).tolist(),
+            "quantiles": sketch_quantiles(sketch, quantiles),
+        }
+
+    def _merge(self, groups: "np.ndarray", n_groups: int, lengths, idx, counts, width: int) -> "np.ndarray":
+        """Sum sparse per-cell vectors into dense per-group rows; cells with group -1 are skipped."""
+        import numpy as np
+
+        flat_groups = np.repeat(groups, lengths)
+        keep = flat_groups >= 0
+        keys = flat_groups[keep].astype(np.int64) * width + idx[keep]
+        merged = np.bincount(keys, weights=counts[keep], minlength=n_groups * width)
+        return merged.reshape(n_groups, width)
+
+    def rollup(self, filters: dict, group_by: list, quantiles: list, top_skills: int,
+               min_count: int, limit: int) -> list:
+        """
+        Merge the cells matching `filters` into groups by `group_by` dimensions
+        (one overall group when empty). Only the `limit` largest groups with at
+        least `min_count` members are returned, largest first.
+        """
+        import numpy as np
+
+        selected = self.mask(filters)
+        if group_by:
+            keys = np.stack([self.codes[dim] for dim in group_by], axis=1)[selected]
+            unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+        else:
+            unique = np.zeros((1, 0), dtype=np.int32)
+            inverse = np.zeros(int(selected.sum()), dtype=np.int64)
+        counts = np.bincount(inverse, weights=self.count[selected], minlength=len(unique))
+
+        # Keep only the groups being returned, renumbered 0..n-1, so the dense merges stay small
+        order = np.argsort(-counts, kind="stable")
+        kept = order[counts[order] >= max(min_count, 1)][:limit]
+        renumber = np.full(len(unique), -1, dtype=np.int64)
+        renumber[kept] = np.arange(len(kept))
+        groups = np.full(len(self), -1, dtype=np.int64)
+        groups[selected] = renumber[inverse]
+
+        n_groups = len(kept)
+        member = groups >= 0
+        salary_sums = np.bincount(groups[member], weights=self.salary_sum[member], minlength=n_groups)
+        sketches = self._merge(groups, n_groups, self.bin_lengths, self.bin_idx, self.bin_counts, SKETCH_BINS)
+        skills = self._merge(groups, n_groups, self.skill_lengths, self.skill_idx, self.skill_counts,
+                             len(self.vocabulary))
+
+        results = []
+        for g, original in enumerate(kept):
+            count = int(counts[original])
+            top = {}
+            for field, field_idx in self.field_skills.items():
+                field_counts = skills[g][field_idx]
+                ranked = field_idx[np.argsort(-field_counts, kind="stable")[:top_skills]]
+                top[field] = [
+                    {"name": self.vocabulary[i][1], "share": round(float(skills[g][i]) / count, 3)}
+                    for i in ranked if skills[g][i] > 0
+                ]
+            results.append({
+                "key": {dim: self.labels[dim][unique[original][d]] for d, dim in enumerate(group_by)},
+                "count": count,
+                "salary": {
+                    "mean": round(float(salary_sums[g]) / count, 2),
+                    "quantiles": dict(zip(
+                        [f"p{q * 100:g}" for q in quantiles],
+                        sketch_quantiles(sketches[g], quantiles),
+                    )),
+                },
+                "top_skills": top,
+            })
+        return results
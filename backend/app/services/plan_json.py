@@ -0,0 +1,70 @@
+"""
+Parsing of LLM career-plan replies that may not be clean JSON: wrapped in
+markdown fences, followed by stray text, or cut off mid-object (a reply that
+hit the output token limit, or a streamed reply read before it finished).
+"""
+import json
+
+def _closing(stack) -> str:
+    return "".join(reversed(stack))
+
+def repair_json(text: str) -> str:
+    """
+    Best-effort valid JSON object from the first "{" in `text`. A complete
+    object is returned as-is (anything after it is dropped). A truncated one
+    is cut back to its last complete value and its open brackets are closed;
+    a string or number still being written is dropped, never closed, so cut
+    off text can't pass for a real value. Raises ValueError when nothing
+    usable is left.
+    """
+    start = text.find("{")
+    if start < 0:
+        raise ValueError("no JSON object in response")
+    text = text[start:]
+
+    stack = [] # closing brackets of the open containers
+    cut_points = [] # (prefix length, closers) after which the prefix is a complete list of members
+    in_string = escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            cut_points.append((i + 1, _closing(stack)))
+        elif ch in "}]":
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                return text[:i + 1]
+        elif ch == ",":
+            cut_points.append((i, _closing(stack)))
+
+    # Truncated: keep everything if it stopped right after a complete value, otherwise
+    # drop the value in progress and any members that no longer parse, one cut point at a time
+    candidates = []
+    if not in_string and text.rstrip()[-1:] in ('"', "}", "]"):
+        candidates.append(text + _closing(stack))
+    candidates += [text[:end] + closers for end, closers in reversed(cut_points)]
+    for candidate in candidates:
+        try:
+            json.loads(candidate)
+            return candidate
+        except ValueError:
+            continue
+    raise ValueError("unrecoverable JSON in response")
+
+def parse_plan_json(text: str):
+    """(object, repaired) for an LLM reply; repaired is True when the raw text wasn't valid JSON."""
+    try:
+        return json.loads(text), False
+    except ValueError:
+        return json.loads(repair_json(text)), True
@@ -0,0 +1,183 @@
+"""
+Deterministic career plan built from a benchmark report with plain rules.
+
+Used as the plan itself (ADVISOR_MODE=rules), as the draft Gemini rewrites
+(ADVISOR_MODE=rewrite), as the instant first response (ADVISOR_INSTANT_PLAN)
+and as the fallback whenever Gemini is unavailable or its reply is unusable. No I/O; builds a plan in well under a millisecond.
+"""
+from ..models import PRIORITY_LEVELS
+
+MIN_RECOMMENDATIONS = 5
+MAX_RECOMMENDATIONS = 7
+
+SURVEY_SOURCE = "Stack Overflow Survey 2024"
+BENCHMARK_SOURCE = "Market Benchmarks"
+
+def _rec(category: str, priority: str, title: str, description: str, impact: str, source: str) -> dict:
+    return {
+        "category": category,
+        "title": title,
+        "description": description,
+        "expected_impact": impact,
+        "data_source": source,
+        "priority_level": priority,
+    }
+
+def _compensation(percentile, years: float, cohort_size: int) -> list:
+    if percentile is None:
+        return [_rec(
+            "compensation", "medium", "Benchmark Your Salary",
+            "Generate a market benchmark to see where your pay sits against developers with your role, country and experience.",
+            "Know your market rate before your next review", BENCHMARK_SOURCE
+        )]
+    recs = []
+    if percentile < 25:
+        recs.append(_rec(
+            "compensation", "high", "Negotiate a Market-Rate Salary",
+            f"You earn more than only {percentile}% of {cohort_size} comparable professionals. "
+            "Bring the cohort median to your manager with a summary of your recent impact and ask for an adjustment.",
+            "+15-25% salary growth", BENCHMARK_SOURCE
+        ))
+        if years >= 3:
+            recs.append(_rec(
+                "compensation", "high", "Test the External Market",
+                "Interview with two or three companies hiring for your role. Offers are the strongest evidence "
+                "of your market rate, whether you switch or use them to renegotiate.",
+                "+20-30% salary on a job switch", BENCHMARK_SOURCE
+            ))
+    elif percentile < 50:
+        recs.append(_rec(
+            "compensation", "medium", "Build the Case for a Raise",
+            f"You are in the lower half of your cohort ({percentile}th percentile). Document shipped work and "
+            "scope increases, and raise compensation at your next review using the cohort median as the target.",
+            "+5-15% salary growth", BENCHMARK_SOURCE
+        ))
+    elif percentile < 75:
+        recs.append(_rec(
+            "compensation", "low", "Track Your Market Rate",
+            f"Your pay is above the cohort median ({percentile}th percentile). Re-run your benchmark yearly "
+            "so your compensation keeps pace as your skills grow.",
+            "Keeps compensation at or above market", BENCHMARK_SOURCE
+        ))
+    else:
+        recs.append(_rec(
+            "compensation", "low", "Negotiate Scope and Equity",
+            f"You are in the top quartile of your cohort ({percentile}th percentile). Further growth usually "
+            "comes from larger scope, equity or a more senior title rather than base salary.",
+            "Long-term total compensation growth", BENCHMARK_SOURCE
+        ))
+    return recs
+
+def _skills(missing: list, technical_score, user_skills: list) -> list:
+    recs = []
+    for i, skill in enumerate(missing[:3]):
+        if i == 0 and (technical_score is None or technical_score < 50):
+            priority = "high"
+        else:
+            priority = "medium" if i < 2 else "low"
+        recs.append(_rec(
+            "skills", priority, f"Learn {skill}",
+            f"{skill} is one of the most used technologies in your cohort and missing from your profile. "
+            "Complete a course and use it in a small production-quality project.",
+            "Raises your skill match score", SURVEY_SOURCE
+        ))
+    if not missing and user_skills:
+        recs.append(_rec(
+            "skills", "medium", f"Deepen Your {user_skills[0]} Expertise",
+            "You already cover your cohort's core technologies. Go deeper in your strongest one: performance, "
+            "internals, or contributing to its ecosystem.",
+            "Differentiates you from peers with the same stack", SURVEY_SOURCE
+        ))
+    if technical_score is not None and technical_score < 40 and len(missing) >= 2:
+        recs.append(_rec(
+            "skills", "medium", "Build a Portfolio Project",
+            f"Combine {missing[0]} and {missing[1]} in one public project, so the new skills are visible to employers.",
+            "Demonstrable experience in in-demand skills", SURVEY_SOURCE
+        ))
+    return recs
+
+def _career(years: float, role: str) -> list:
+    if years < 3:
+        return [_rec(
+            "strategic", "medium", "Find a Mentor",
+            f"Pair with a senior {role} for regular code and design reviews. Early feedback compounds faster than solo learning.",
+            "Faster progression to mid-level", "General Industry Trends"
+        )]
+    if years < 8:
+        return [_rec(
+            "strategic", "medium", "Lead a Project End to End",
+            "Own the design, delivery and rollout of a feature or service. Ownership of outcomes is the main "
+            "signal for a senior promotion.",
+            "Positions you for a senior role", "General Industry Trends"
+        )]
+    return [_rec(
+        "strategic", "medium", "Grow Technical Leadership",
+        "Mentor other engineers, write design documents and drive cross-team technical decisions.",
+        "Positions you for staff or lead roles", "General Industry Trends"
+    )]
+
+def _always() -> list:
+    return [
+        _rec(
+            "strategic", "low", "Update Resume & LinkedIn",
+            "Ensure your CV and public profile reflect your latest skills and quantified achievements to attract recruiters.",
+            "Increase profile visibility by 40%", "LinkedIn Talent Solutions"
+        ),
+        _rec(
+            "strategic", "low", "Share Your Work Publicly",
+            "Write about a problem you solved or give a short internal talk. Visible expertise leads to better opportunities.",
+            "Stronger professional network", "General Industry Trends"
+        ),
+        _rec(
+            "skills", "low", "Set a Quarterly Learning Goal",
+            "Pick one technology or practice each quarter and finish a concrete project with it.",
+            "Steady growth in skill match score", SURVEY_SOURCE
+        ),
+    ]
+
+def _long_term_goal(years: float, role: str) -> str:
+    if years < 3:
+        return f"Reach a confident mid-level {role} role within 1-2 years."
+    if years < 8:
+        return f"Senior {role} within 1-2 years."
+    return "Staff Engineer or Tech Lead within 1-2 years."
+
+def build_plan(profile: dict, benchmark_data: dict) -> dict:
+    """A 5-7 recommendation plan from a profile and its benchmark report (either may be sparse)."""
+    benchmark_data = benchmark_data or {}
+    role = profile.get("current_title") or profile.get("dev_role") or "Developer"
+    years = float(profile.get("years_experience") or 0)
+    percentile = benchmark_data.get("compensation_quartile")
+    cohort_size = benchmark_data.get("comparable_profiles_count") or 0
+    missing = benchmark_data.get("missing_critical_skills") or []
+    technical_score = (benchmark_data.get("skill_relevance_scores") or {}).get("technical")
+    if technical_score is None:
+        technical_score = benchmark_data.get("skill_match_score")
+
+    candidates = (
+        _compensation(percentile, years, cohort_size)
+        + _skills(missing, technical_score, profile.get("technical_skills") or [])
+        + _career(years, role)
+    )
+    candidates.sort(key=lambda rec: PRIORITY_LEVELS.index(rec["priority_level"])) # stable, so rule order breaks ties
+    recommendations = candidates[:MAX_RECOMMENDATIONS]
+    for rec in _always():
+        if len(recommendations) >= MIN_RECOMMENDATIONS:
+            break
+        recommendations.append(rec)
+
+    if percentile is None:
+        summary = "No market benchmark is available yet, so this plan is based on your profile alone."
+    else:
+        comparison = (benchmark_data.get("market_salary_comparison") or "Competitive").lower()
+        summary = f"You earn more than {percentile}% of {cohort_size} comparable professionals ({comparison})."
+        if benchmark_data.get("skill_match_score") is not None:
+            summary += f" Your skill match score is {benchmark_data['skill_match_score']}/100."
+    if missing:
+        summary += f" Your biggest gaps are {', '.join(missing[:3])}."
+
+    return {
+        "summary": summary,
+        "long_term_goal": _long_term_goal(years, role),
+        "recommendations": recommendations,
+    }
@@ -0,0 +1,132 @@
+"""
+Prompts for the AI advisor's Gemini calls.
+
+The instructions are static, so they are built once and sent as the model's
+system instruction (ai_advisor keeps one model per instruction). The user
+prompt is just the user's facts as short `key: value` lines, which the
+instruction explains once. The values are taken from the profile and its
+benchmark report (not its insights, which only restate the numbers).
+
+Prompt size is estimated at ~4 characters per token, Google's rule of thumb
+for Gemini, so it costs no API call. When the user prompt exceeds
+ADVISOR_PROMPT_TOKEN_BUDGET, the lowest-value facts are shortened or dropped
+in TRIM_STEPS order until it fits. The core facts (role, experience,
+country, salary, percentile) are never dropped.
+"""
+import math
+
+from .. import metrics
+
+FACTS_LEGEND = """
+The user's facts are `key: value` lines (absent keys are unknown): role, years (of experience), country, \
+salary (as entered; may be local currency), skills, pct (salary percentile in their cohort; benchmarks are USD), \
+market (salary vs. market), match (skill match /100), missing (common cohort skills they lack), \
+cohort_n (cohort size), progression (career progression score /100).
+If the salary looks like local currency (e.g. 3,000,000), estimate it in USD and say so in the summary; \
+never compare it to USD benchmarks as-is.
+"""
+
+SYSTEM_INSTRUCTION = """
+You are an expert career coach for software developers. Write a personalized career plan for the user.
+""" + FACTS_LEGEND + """
+- summary: 2-3 sentences on their position relative to the market.
+- long_term_goal: a strategic 1-2 year goal (e.g. 'Senior Engineer', 'Tech Lead').
+- 5-7 recommendations, each with an actionable title, specific advice as description, \
+a quantified expected_impact (e.g. '+15% salary') and a data_source.
+If pct is below 50, include compensation negotiation or job switching advice. \
+If match is low, prioritize learning the missing skills.
+"""
+
+# ADVISOR_MODE=rewrite: Gemini only rewords the rule-based plan
+REWRITE_INSTRUCTION = """
+You are an expert career coach for software developers. After the user's facts, `draft:` is a career plan \
+computed from market data, one recommendation per line as `category|priority|data_source|title|description|expected_impact`.
+""" + FACTS_LEGEND + """
+Return the plan with summary, long_term_goal, title, description and expected_impact reworded to be specific \
+and motivating for this user. Keep the recommendations in order with the same category, priority_level \
+and data_source, and keep every number from the draft.
+"""
+
+# Applied in order until the prompt fits the budget: (fact, items to keep), None drops the fact
+TRIM_STEPS = [
+    ("skills", 10),
+    ("missing", 3),
+    ("progression", None),
+    ("cohort_n", None),
+    ("skills", 5),
+    ("market", None),
+    ("skills", None),
+    ("missing", None),
+]
+
+DRAFT_FIELDS = ["category", "priority_level", "data_source", "title", "description", "expected_impact"]
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / 4)
+
+INSTRUCTION_TOKENS = {
+    SYSTEM_INSTRUCTION: estimate_tokens(SYSTEM_INSTRUCTION),
+    REWRITE_INSTRUCTION: estimate_tokens(REWRITE_INSTRUCTION),
+}
+
+def _facts(profile: dict, benchmark_data: dict) -> dict:
+    """Fact name -> value (a list for trimmable lists); unknowns are left out."""
+    benchmark_data = benchmark_data or {}
+    facts = {
+        "role": profile.get("current_title") or profile.get("dev_role"),
+        "years": profile.get("years_experience"),
+        "country": profile.get("country"),
+        "salary": profile.get("salary_package"),
+        "skills": list(profile.get("technical_skills") or []),
+        "pct": benchmark_data.get("compensation_quartile"),
+        "market": benchmark_data.get("market_salary_comparison"),
+        "match": benchmark_data.get("skill_match_score"),
+        "missing": list(benchmark_data.get("missing_critical_skills") or []),
+        "cohort_n": benchmark_data.get("comparable_profiles_count"),
+        "progression": benchmark_data.get("career_progression_score"),
+        # The report's insights are sentences built from these same numbers, so they aren't sent
+    }
+    return {name: value for name, value in facts.items() if value not in (None, "", [])}
+
+def _encode(facts: dict) -> str:
+    return "\n".join(
+        f"{name}: {', '.join(map(str, value)) if isinstance(value, list) else value}"
+        for name, value in facts.items()
+    )
+
+def _fit(facts: dict, budget: int) -> str:
+    """Encode facts, trimming per TRIM_STEPS until they fit in `budget` tokens."""
+    text = _encode(facts)
+    for name, keep in TRIM_STEPS:
+        if estimate_tokens(text) <= budget:
+            break
+        if name not in facts:
+            continue
+        if keep is None:
+            del facts[name]
+        elif len(facts[name]) > keep:
+            facts[name] = facts[name][:keep]
+        else:
+            continue
+        metrics.advisor_prompt_trims.inc(fact=name)
+        text = _encode(facts)
+    return text
+
+def _observe(mode: str, system_instruction: str, prompt: str):
+    metrics.advisor_prompt_tokens.observe(INSTRUCTION_TOKENS[system_instruction] + estimate_tokens(prompt), mode=mode)
+
+def plan_prompt(profile: dict, benchmark_data: dict, budget: int):
+    """(system instruction, prompt) for generating a plan from scratch."""
+    prompt = _fit(_facts(profile, benchmark_data), budget)
+    _observe("llm", SYSTEM_INSTRUCTION, prompt)
+    return SYSTEM_INSTRUCTION, prompt
+
+def rewrite_prompt(profile: dict, draft: dict, budget: int):
+    """(system instruction, prompt) for rewording a rule-based draft plan; only the facts count toward the budget."""
+    facts = {name: value for name, value in _facts(profile, {}).items() if name != "skills"}
+    lines = [f"summary: {draft['summary']}", f"long_term_goal: {draft['long_term_goal']}"] + [
+        "|".join(rec[field] for field in DRAFT_FIELDS) for rec in draft["recommendations"]
+    ]
+    prompt = _fit(facts, budget) + "\ndraft:\n" + "\n".join(lines)
+    _observe("rewrite", REWRITE_INSTRUCTION, prompt)
+    return REWRITE_INSTRUCTION, prompt
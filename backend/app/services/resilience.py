@@ -0,0 +1,155 @@
+"""
+Failure handling for slow or flaky upstreams (the Gemini API).
+
+CircuitBreaker
+    Tracks the outcomes of the last `window` calls. When at least `min_calls`
+    have been seen and the share of failures, or of calls slower than
+    `slow_seconds`, reaches its threshold, the breaker opens: calls are
+    refused at once instead of waiting for an upstream that is down. After
+    `open_seconds` it goes half-open and lets up to `probes` calls through;
+    if they all succeed it closes again, any failure reopens it.
+
+Hedger
+    Runs a call and, if it hasn't finished after the recent `quantile`
+    latency, starts a second identical call and takes whichever succeeds
+    first. At most `budget` (a fraction) of recent calls are hedged, so a
+    slow upstream sees a bounded amount of extra load.
+
+State is per worker process.
+"""
+import asyncio
+import time
+from collections import deque
+
+from .. import metrics
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+class CircuitBreaker:
+    def __init__(self, name: str, window: int, min_calls: int, failure_rate: float,
+                 slow_seconds: float, slow_rate: float, open_seconds: float, probes: int):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_seconds = slow_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.probes = probes
+        self._outcomes = deque(maxlen=window) # (failed, slow)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.state = CLOSED
+        metrics.circuit_breaker_state.set(STATE_VALUES[CLOSED], name=name)
+
+    def _transition(self, state: str):
+        self.state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state != HALF_OPEN:
+            self._probes_in_flight = self._probe_successes = 0
+        if state == CLOSED:
+            self._outcomes.clear()
+        metrics.circuit_breaker_state.set(STATE_VALUES[state], name=self.name)
+        metrics.circuit_breaker_transitions.inc(name=self.name, state=state)
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now. Every allowed call must end with record() or cancel()."""
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                return False
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight >= self.probes:
+                return False
+            self._probes_in_flight += 1
+        return True
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker lets a probe through."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    def cancel(self):
+        """Release an allowed call that ended without an outcome (e.g. it was cancelled)."""
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def record(self, failed: bool, seconds: float):
+        slow = seconds >= self.slow_seconds
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if failed or slow:
+                self._transition(OPEN)
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.probes:
+                    self._transition(CLOSED)
+            return
+        if self.state == OPEN:
+            return # a call allowed before the breaker opened
+        self._outcomes.append((failed, slow))
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+        failures = sum(1 for f, _ in self._outcomes if f)
+        slow_calls = sum(1 for _, s in self._outcomes if s)
+        if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_rate:
+            self._transition(OPEN)
+
+class Hedger:
+    def __init__(self, operation: str, quantile: float, budget: float, min_delay: float,
+                 min_samples: int = 20, window: int = 200):
+        self.operation = operation
+        self.quantile = quantile
+        self.budget = budget
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window) # successful call durations
+        self._hedged = deque(maxlen=window) # whether each recent call was hedged
+
+    def _within_budget(self) -> bool:
+        return sum(self._hedged) < self.budget * max(1, len(self._hedged))
+
+    def delay(self):
+        """Seconds to wait before hedging, or None when hedging is off, unwarmed or over budget."""
+        if self.budget <= 0 or len(self._latencies) < self.min_samples or not self._within_budget():
+            return None
+        ordered = sorted(self._latencies)
+        return max(self.min_delay, ordered[min(len(ordered) - 1, int(self.quantile * len(ordered)))])
+
+    async def run(self, fn, hedge: bool = True):
+        """Await `fn()` (a coroutine function), hedged with a second call if it runs long."""
+        delay = self.delay() if hedge else None
+        start = time.perf_counter()
+        tasks = [asyncio.ensure_future(fn())]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                # Checked again: other calls may have used up the budget while this one waited
+                if not done and self._within_budget():
+                    tasks.append(asyncio.ensure_future(fn()))
+                    metrics.hedged_requests.inc(operation=self.operation, result="launched")
+            self._hedged.append(len(tasks) > 1)
+
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._latencies.append(time.perf_counter() - start)
+                        if task is not tasks[0]:
+                            metrics.hedged_requests.inc(operation=self.operation, result="won")
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            # The loser (or both, if our caller went away) is no longer wanted
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
@@ -0,0 +1,134 @@
+"""
+Retention for superseded benchmark reports and career plans.
+
+Regenerating archives the previous document (is_current / is_active = False)
+and stamps it with `archived_at`. Per user, the HISTORY_KEEP most recent
+archived documents are kept in full; older ones are reduced to a compact
+history entry holding only their key scores (HISTORY_COMPACT) or deleted.
+A TTL index on `archived_at` expires archived documents, compact or not,
+after HISTORY_TTL_DAYS days; with 0 they are kept forever.
+
+prune_after_write runs after every regeneration; scripts/compact_history.py
+applies the same policy to existing data in batches.
+"""
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING, DeleteOne, IndexModel, ReplaceOne
+from pymongo.errors import OperationFailure
+
+from ..config import get_settings
+
+settings = get_settings()
+
+INDEX_OPTIONS_CONFLICT = 85
+
+def _benchmark_summary(doc: dict) -> dict:
+    return {
+        "compensation_quartile": doc.get("compensation_quartile"),
+        "skill_match_score": doc.get("skill_match_score"),
+        "career_progression_score": doc.get("career_progression_score"),
+        "position_level_score": doc.get("position_level_score"),
+        "market_salary_comparison": doc.get("market_salary_comparison"),
+        "comparable_profiles_count": doc.get("comparable_profiles_count"),
+    }
+
+def _plan_summary(doc: dict) -> dict:
+    recs = doc.get("recommendations", [])
+    active = [r for r in recs if r.get("status") != "dismissed"]
+    completed = len([r for r in active if r.get("status") == "completed"])
+    return {
+        "benchmark_report_id": doc.get("benchmark_report_id"),
+        "total_recommendations": len(active),
+        "completed_recommendations": completed,
+        "overall_completion_percentage": round(completed / len(active) * 100) if active else 0,
+    }
+
+# collection -> (flag marking the live document, compact summary builder)
+HISTORY_COLLECTIONS = {
+    "benchmark_reports": ("is_current", _benchmark_summary),
+    "career_plans": ("is_active", _plan_summary),
+}
+
+def compact_document(collection_name: str, doc: dict) -> dict:
+    flag, summarize = HISTORY_COLLECTIONS[collection_name]
+    return {
+        "_id": doc["_id"],
+        "user_id": doc["user_id"],
+        "generated_at": doc.get("generated_at"),
+        "archived_at": doc.get("archived_at") or datetime.utcnow(),
+        flag: False,
+        "compacted": True,
+        **summarize(doc),
+    }
+
+def history_operations(collection_name: str, archived: list, keep: int = None, compact: bool = None) -> list:
+    """
+    Bulk write operations enforcing retention on one user's archived documents,
+    given newest first.
+    """
+    keep = settings.HISTORY_KEEP if keep is None else keep
+    compact = settings.HISTORY_COMPACT if compact is None else compact
+    operations = []
+    for doc in archived[keep:]:
+        if not compact:
+            operations.append(DeleteOne({"_id": doc["_id"]}))
+        elif not doc.get("compacted"):
+            operations.append(ReplaceOne({"_id": doc["_id"]}, compact_document(collection_name, doc)))
+    return operations
+
+async def expired_history(collection, collection_name: str, user_id: str, keep: int = None, compact: bool = None) -> list:
+    """
+    The user's archived documents past the `keep` most recent that retention
+    still has to act on, found by _id so the kept ones are never loaded.
+    When compacting, only not yet compacted documents count (they are all
+    newer than the compacted ones) and are returned in full.
+    """
+    flag, _ = HISTORY_COLLECTIONS[collection_name]
+    keep = settings.HISTORY_KEEP if keep is None else keep
+    compact = settings.HISTORY_COMPACT if compact is None else compact
+    query = {"user_id": user_id, flag: False}
+    if compact:
+        query["compacted"] = {"$ne": True}
+    expired = await collection.find(query, {"_id": 1}).sort("generated_at", DESCENDING).skip(keep).to_list(length=None)
+    if not expired or not compact:
+        return expired
+    return await collection.find({"_id": {"$in": [doc["_id"] for doc in expired]}}).to_list(length=None)
+
+async def prune_user_history(db, collection_name: str, user_id: str) -> int:
+    """Apply retention to one user's archived documents; returns the number rewritten or removed."""
+    collection = db[collection_name]
+    expired = await expired_history(collection, collection_name, user_id)
+    operations = history_operations(collection_name, expired, keep=0)
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+    return len(operations)
+
+async def prune_after_write(db, collection_name: str, user_id: str):
+    """prune_user_history for the request path: failures are logged, not raised."""
+    try:
+        await prune_user_history(db, collection_name, user_id)
+    except Exception as e:
+        # Housekeeping only; scripts/compact_history.py catches up on anything missed
+        print(f"History pruning failed for {collection_name}/{user_id}: {e}")
+
+async def ensure_ttl_indexes(db):
+    """
+    Create, update or drop the archived_at TTL index to match HISTORY_TTL_DAYS.
+    MongoDB rejects create_index with a changed expiry, so that case goes through collMod.
+    """
+    for collection_name in HISTORY_COLLECTIONS:
+        collection = db[collection_name]
+        if not settings.HISTORY_TTL_DAYS:
+            existing = await collection.index_information()
+            if "archived_at_1" in existing:
+                await collection.drop_index("archived_at_1")
+            continue
+
+        expire_after = settings.HISTORY_TTL_DAYS * 86400
+        try:
+            await collection.create_indexes([IndexModel([("archived_at", ASCENDING)], expireAfterSeconds=expire_after)])
+        except OperationFailure as e:
+            if e.code != INDEX_OPTIONS_CONFLICT:
+                raise
+            await db.command("collMod", collection_name,
+                             index={"keyPattern": {"archived_at": 1}, "expireAfterSeconds": expire_after})
@@ -0,0 +1,70 @@
+"""
+Distinct values of the survey's option fields (countries, roles and skills)
+with how many respondents gave each, for the profile form's pickers.
+
+Ingestion (scripts/ingest_survey.py, or scripts/build_market_cube.py for an
+existing collection) stores them in dataset_metadata["survey_options"] as
+{kind: [{"value", "count"}, ...]}, most common first; GET /meta/options
+serves them. The same document holds the most common (country, role) cohorts,
+which API workers pre-load into the cohort cache at startup (app/warmup.py)
+without aggregating the whole collection themselves.
+
+Like market_cube, this module has no settings dependency.
+"""
+from collections import Counter
+from datetime import datetime
+
+META_ID = "survey_options"
+
+HOT_COHORTS_STORED = 100 # Upper bound for WARMUP_HOT_COHORTS and verify_ingestion.py --cohorts
+
+# Option kind -> market_benchmarks field
+OPTION_FIELDS = {
+    "countries": "country",
+    "dev_roles": "dev_roles",
+    "languages": "languages",
+    "databases": "databases",
+    "platforms": "platforms",
+    "frameworks": "frameworks",
+}
+
+def _values(doc: dict, field: str) -> list:
+    value = doc.get(field)
+    if isinstance(value, list):
+        return value
+    return [value] if value else []
+
+def build_options(documents) -> dict:
+    counts = {kind: Counter() for kind in OPTION_FIELDS}
+    for doc in documents:
+        for kind, field in OPTION_FIELDS.items():
+            counts[kind].update(v for v in _values(doc, field) if v and v != "nan")
+    return {
+        kind: [{"value": value, "count": count}
+               for value, count in sorted(counter.items(), key=lambda item: (-item[1], item[0]))]
+        for kind, counter in counts.items()
+    }
+
+def build_hot_cohorts(documents, limit: int = HOT_COHORTS_STORED) -> list:
+    """The most common (country, role) pairs among salaried respondents, at their mean experience."""
+    counts, years = Counter(), Counter()
+    for doc in documents:
+        if not doc.get("country") or not doc.get("salary") or doc["salary"] <= 0:
+            continue
+        for role in doc.get("dev_roles") or []:
+            counts[doc["country"], role] += 1
+            years[doc["country"], role] += doc.get("years_experience") or 0
+    return [
+        {"country": country, "dev_role": role, "years": round(years[country, role] / count), "count": count}
+        for (country, role), count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    ]
+
+async def write_survey_options(db, documents) -> dict:
+    """Rebuild the stored options and hot cohorts from market_benchmarks documents; returns {kind: distinct values}."""
+    options = build_options(documents)
+    await db.dataset_metadata.replace_one(
+        {"_id": META_ID},
+        {"options": options, "hot_cohorts": build_hot_cohorts(documents), "built_at": datetime.utcnow()},
+        upsert=True,
+    )
+    return {kind: len(values) for kind, values in options.items()}
@@ -0,0 +1,90 @@
+"""
+Derived fields of the market_benchmarks survey schema, shared by ingestion
+(scripts/ingest_survey.py) and the API:
+
+    dev_roles   the roles listed in the raw DevType answer (kept as dev_role),
+                so a profile's single role matches every respondent listing it
+    exp_bucket  index into EXP_BUCKETS of years_experience, so cohorts match
+                experience by equality or $in instead of floating ranges
+
+and the content hash stored with the dataset version, which tells whether a
+re-ingestion actually changed the survey.
+"""
+import hashlib
+import json
+
+from pymongo import ASCENDING, IndexModel
+
+# (inclusive lower bound in years, label), ascending
+EXP_BUCKETS = [
+    (0, "0-2"),
+    (3, "3-5"),
+    (6, "6-10"),
+    (11, "11-15"),
+    (16, "16-20"),
+    (21, "21-30"),
+    (31, "31+"),
+]
+
+EXP_BUCKET_LABELS = [label for _, label in EXP_BUCKETS]
+
+# Cohort tiers (services.cohorts): country + role, then role only (global), then country only.
+# dev_roles is an array, so the first two are multikey.
+COHORT_INDEXES = [
+    IndexModel([("country", ASCENDING), ("dev_roles", ASCENDING), ("exp_bucket", ASCENDING), ("salary", ASCENDING)]),
+    IndexModel([("dev_roles", ASCENDING), ("exp_bucket", ASCENDING), ("salary", ASCENDING)]),
+    IndexModel([("country", ASCENDING), ("exp_bucket", ASCENDING), ("salary", ASCENDING)]),
+]
+
+def exp_bucket_index(years: float) -> int:
+    """Index into EXP_BUCKETS for a number of years of professional experience (stored as `exp_bucket`)."""
+    index = 0
+    for i, (lower, _) in enumerate(EXP_BUCKETS):
+        if years < lower:
+            break
+        index = i
+    return index
+
+def exp_bucket(years: float) -> str:
+    """Experience bucket label for a number of years of professional experience."""
+    return EXP_BUCKET_LABELS[exp_bucket_index(years)]
+
+def bucket_years(buckets: list):
+    """(inclusive min, exclusive max) years covered by consecutive bucket indexes; max is None for the last bucket."""
+    upper = buckets[-1] + 1
+    return EXP_BUCKETS[buckets[0]][0], EXP_BUCKETS[upper][0] if upper < len(EXP_BUCKETS) else None
+
+def bucket_range_label(buckets: list) -> str:
+    """Label for consecutive bucket indexes, e.g. [1, 2, 3] -> "3-15"."""
+    exp_min, exp_max = bucket_years(buckets)
+    return f"{exp_min}+" if exp_max is None else f"{exp_min}-{exp_max - 1}"
+
+def parse_dev_roles(dev_type) -> list:
+    """Normalized roles from the survey's DevType answer, which lists one or more roles separated by ';'."""
+    if not isinstance(dev_type, str):
+        return []
+    roles = [role.strip() for role in dev_type.split(";")]
+    return list(dict.fromkeys(role for role in roles if role and role != "nan"))
+
+# Survey answers covered by the content hash; the derived fields follow from them
+HASH_FIELDS = ["country", "dev_role", "years_experience", "salary", "languages", "databases", "platforms", "frameworks"]
+
+# Bump whenever the derived fields change (EXP_BUCKETS, parse_dev_roles, the CSV
+# mapping in ingest_survey.row_to_document): it is part of the content hash, so the
+# next ingestion reloads the same survey instead of skipping it as unchanged
+DERIVATION_VERSION = 1
+
+def content_hash(documents) -> str:
+    """
+    Order-independent hash of the market_benchmarks documents that can be in
+    a cohort (positive salary): the sum of per-document digests, so it streams
+    in constant memory. DERIVATION_VERSION is mixed into every digest.
+    """
+    total = 0
+    for doc in documents:
+        salary = doc.get("salary")
+        if not salary or salary <= 0:
+            continue
+        canonical = json.dumps([DERIVATION_VERSION] + [doc.get(field) for field in HASH_FIELDS], default=str)
+        total += int.from_bytes(hashlib.sha256(canonical.encode()).digest()[:16], "big")
+    return f"{total % 2 ** 128:032x}"
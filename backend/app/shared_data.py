@@ -0,0 +1,334 @@
+"""
+Read-only survey dataset shared across uvicorn workers via POSIX shared memory.
+
+A publisher (scripts/publish_shared_dataset.py, or scripts/serve.py before it
+starts the workers) loads market_benchmarks once, lays the columns out in a
+shared memory segment and bumps a generation counter in a small control
+segment. Workers attach zero-copy (read-only numpy views over the mapping) and
+switch to a newer generation on their next lookup, so a re-ingested survey is
+picked up by re-publishing, without restarting workers.
+
+Rows are sorted by (country, dev_role, years_experience) and the row range of
+every (country, dev_role) pair is stored with the columns (the cohort summary),
+so each cohort tier resolves to a few contiguous slices. dev_role is the raw
+DevType answer; a normalized role resolves to the ranges of every answer
+listing it, which are disjoint, so no row is counted twice.
+
+The segment records the dataset version it was read at. Enabled by
+SHARED_DATASET_NAME; when nothing is published, or what is published predates
+the current dataset version, callers fall back to MongoDB. Note that containers often cap /dev/shm (64MB on Docker by default).
+"""
+import json
+import struct
+import threading
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from .config import get_settings
+from .services.cohorts import MIN_COHORT_SIZE, SKILL_FACETS, cohort_key, cohort_tiers, tier_query
+from .services.survey_schema import bucket_years, parse_dev_roles
+
+settings = get_settings()
+
+_MAGIC = b"CIQSHM01"
+_CONTROL = struct.Struct("<8sQ") # magic, generation
+_CONTROL_SIZE = 4096
+_HEADER_LEN = struct.Struct("<Q")
+_ALIGN = 64
+
+SKILL_FIELDS = [field for field, _ in SKILL_FACETS.values()]
+
+def _control_name(prefix: str) -> str:
+    return f"{prefix}_ctl"
+
+def _dataset_name(prefix: str, generation: int) -> str:
+    return f"{prefix}_ds_{generation}"
+
+def _untrack(shm):
+    # Before Python 3.13 every attach registers the segment with this process's
+    # resource tracker, which unlinks it when the process exits - taking the
+    # dataset away from every other worker.
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+def _open_segment(name: str, create: bool = False, size: int = 0):
+    try:
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        _untrack(shm)
+        return shm
+
+def _unlink(name: str):
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Tracked on purpose: unlink() unregisters it again on Python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+    shm.close()
+    shm.unlink()
+
+class SharedSurvey:
+    """Worker-side view of one published dataset generation."""
+
+    def __init__(self, shm, generation: int):
+        self.shm = shm
+        self.generation = generation
+        (header_len,) = _HEADER_LEN.unpack_from(shm.buf, 0)
+        header = json.loads(bytes(shm.buf[_HEADER_LEN.size:_HEADER_LEN.size + header_len]))
+        self.rows = header["rows"]
+        self.countries = header["countries"]
+        self.roles = header["roles"]
+        self.skill_names = header["skills"]
+        self.jwks = header.get("jwks")
+        self.dataset_version = header.get("dataset_version") # None for segments published without one
+
+        self.arrays = {}
+        for name, (offset, dtype, length) in header["arrays"].items():
+            array = np.ndarray((length,), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            array.flags.writeable = False
+            self.arrays[name] = array
+
+        self.country_codes = {name: i for i, name in enumerate(self.countries)}
+        self.role_codes = {} # normalized role -> codes of the raw answers listing it
+        for code, raw in enumerate(self.roles):
+            for role in parse_dev_roles(raw):
+                self.role_codes.setdefault(role, []).append(code)
+
+        # Cohort summary: row range per (country, role), indexed both ways
+        self.pair_ranges = {}
+        self.ranges_by_country = {}
+        self.ranges_by_role = {}
+        for c, r, start, end in zip(
+            self.arrays["range_country"].tolist(), self.arrays["range_role"].tolist(),
+            self.arrays["range_start"].tolist(), self.arrays["range_end"].tolist()
+        ):
+            self.pair_ranges[(c, r)] = (start, end)
+            self.ranges_by_country.setdefault(c, []).append((start, end))
+            self.ranges_by_role.setdefault(r, []).append((start, end))
+
+    def close(self):
+        self.arrays = {}
+        try:
+            self.shm.close()
+        except BufferError:
+            # A view is still referenced somewhere; the mapping is released with it
+            pass
+
+    def _slices(self, filters: dict):
+        country = self.country_codes.get(filters["country"], -1) if "country" in filters else None
+        roles = self.role_codes.get(filters["dev_role"], []) if "dev_role" in filters else None
+
+        if country is not None and roles is not None:
+            ranges = [self.pair_ranges[(country, r)] for r in roles if (country, r) in self.pair_ranges]
+        elif roles is not None:
+            ranges = [span for r in roles for span in self.ranges_by_role.get(r, [])]
+        else:
+            ranges = self.ranges_by_country.get(country, [])
+
+        # Experience is sorted inside each (country, role) range, so consecutive buckets are one slice
+        years = self.arrays["years"]
+        exp_min, exp_max = bucket_years(filters["exp_buckets"])
+        slices = []
+        for start, end in ranges:
+            lo = start + int(np.searchsorted(years[start:end], exp_min, side="left"))
+            hi = end if exp_max is None else start + int(np.searchsorted(years[start:end], exp_max, side="left"))
+            if hi > lo:
+                slices.append((lo, hi))
+        return slices
+
+    def resolve(self, country: str, dev_role: str, years_exp: float):
+        """Same tiers as benchmarks.resolve_cohort. Returns (slices, count, cohort_name, cohort_key)."""
+        for filters, cohort_name in cohort_tiers(country, dev_role, years_exp):
+            slices = self._slices(filters)
+            count = sum(hi - lo for lo, hi in slices)
+            if count >= MIN_COHORT_SIZE:
+                break
+        return slices, count, cohort_name, cohort_key(tier_query(filters))
+
+    def cohort_stats(self, slices) -> dict:
+        """Stats shaped like the $facet output of benchmarks.fetch_cohort_stats."""
+        salary = self.arrays["salary"]
+        salaries = np.sort(np.concatenate([salary[lo:hi] for lo, hi in slices]))
+        stats = {"salaries": [{"salary": s} for s in salaries.tolist()]}
+
+        for facet, (field, limit) in SKILL_FACETS.items():
+            offsets = self.arrays[f"{field}_offsets"]
+            codes = self.arrays[f"{field}_codes"]
+            names = self.skill_names[field]
+            picked = np.concatenate([codes[offsets[lo]:offsets[hi]] for lo, hi in slices])
+            counts = np.bincount(picked, minlength=len(names))
+            top = np.argsort(-counts, kind="stable")[:limit]
+            stats[facet] = [{"_id": names[i], "count": int(counts[i])} for i in top if counts[i] > 0]
+        return stats
+
+    def get_cohort_stats(self, country: str, dev_role: str, years_exp: float):
+        slices, count, cohort_name, key = self.resolve(country, dev_role, years_exp)
+        if count == 0:
+            return None, None, None
+        return self.cohort_stats(slices), cohort_name, key
+
+_lock = threading.Lock()
+_control = None
+_current = None
+
+def current():
+    """The attached dataset for the latest published generation, or None."""
+    global _control, _current
+    if not settings.SHARED_DATASET_NAME:
+        return None
+
+    with _lock:
+        if _control is None:
+            try:
+                _control = _open_segment(_control_name(settings.SHARED_DATASET_NAME))
+            except FileNotFoundError:
+                return None
+
+        magic, generation = _CONTROL.unpack_from(_control.buf, 0)
+        if magic != _MAGIC or generation == 0:
+            return None
+        if _current is not None and _current.generation == generation:
+            return _current
+
+        try:
+            shm = _open_segment(_dataset_name(settings.SHARED_DATASET_NAME, generation))
+        except FileNotFoundError:
+            # Superseded between reading the counter and attaching; keep what we have
+            return _current
+
+        previous, _current = _current, SharedSurvey(shm, generation)
+        if previous is not None:
+            previous.close()
+        print(f"Attached shared survey dataset generation {generation} ({_current.rows} rows)")
+        return _current
+
+def jwks():
+    survey = current()
+    return survey.jwks if survey else None
+
+# Publisher side
+
+def build_columns(documents):
+    """
+    Turn market_benchmarks documents into the sorted column arrays and
+    string tables stored in the segment. Rows without a positive salary are
+    dropped, since every cohort tier requires one.
+    """
+    countries, roles = {}, {}
+    skill_tables = {field: {} for field in SKILL_FIELDS}
+    country_col, role_col, years_col, salary_col = [], [], [], []
+    skill_rows = {field: [] for field in SKILL_FIELDS}
+
+    for doc in documents:
+        salary = doc.get("salary")
+        if not salary or salary <= 0:
+            continue
+        country_col.append(countries.setdefault(doc["country"], len(countries)))
+        role_col.append(roles.setdefault(doc["dev_role"], len(roles)))
+        years_col.append(float(doc["years_experience"]))
+        salary_col.append(float(salary))
+        for field in SKILL_FIELDS:
+            table = skill_tables[field]
+            skill_rows[field].append([table.setdefault(s, len(table)) for s in doc.get(field) or []])
+
+    country_arr = np.array(country_col, dtype=np.int32)
+    role_arr = np.array(role_col, dtype=np.int32)
+    years_arr = np.array(years_col, dtype=np.float64)
+    order = np.lexsort((years_arr, role_arr, country_arr))
+
+    arrays = {
+        "country": country_arr[order],
+        "role": role_arr[order],
+        "years": years_arr[order],
+        "salary": np.array(salary_col, dtype=np.float64)[order],
+    }
+    for field in SKILL_FIELDS:
+        rows = [skill_rows[field][i] for i in order.tolist()]
+        lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+        arrays[f"{field}_offsets"] = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        arrays[f"{field}_codes"] = np.fromiter(
+            (code for r in rows for code in r), dtype=np.int32, count=int(lengths.sum())
+        )
+
+    keys = arrays["country"].astype(np.int64) * max(len(roles), 1) + arrays["role"]
+    _, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+    arrays["range_country"] = arrays["country"][starts]
+    arrays["range_role"] = arrays["role"][starts]
+    arrays["range_start"] = starts.astype(np.int64)
+    arrays["range_end"] = (starts + counts).astype(np.int64)
+
+    tables = {
+        "countries": list(countries),
+        "roles": list(roles),
+        "skills": {field: list(table) for field, table in skill_tables.items()},
+    }
+    return arrays, tables
+
+def publish(documents, prefix: str = None, jwks: dict = None, dataset_version: int = None) -> int:
+    """
+    Publish a new dataset generation and retire the previous one. Returns the
+    generation. `dataset_version` is the version the documents were read at;
+    workers only use the segment while it is still the current one.
+    """
+    prefix = prefix or settings.SHARED_DATASET_NAME
+    arrays, tables = build_columns(documents)
+
+    header = {
+        "rows": int(len(arrays["salary"])), **tables, "jwks": jwks, "dataset_version": dataset_version, "arrays": {},
+    }
+    # Two passes: offsets depend on the header size, which includes the offsets
+    header_bytes = b""
+    for _ in range(2):
+        offset = _HEADER_LEN.size + len(header_bytes) + 1024
+        offset += -offset % _ALIGN
+        for name, array in arrays.items():
+            header["arrays"][name] = [offset, array.dtype.str, int(array.shape[0])]
+            offset += array.nbytes + (-array.nbytes % _ALIGN)
+        header_bytes = json.dumps(header).encode()
+    total_size = offset
+
+    try:
+        control = _open_segment(_control_name(prefix))
+    except FileNotFoundError:
+        control = _open_segment(_control_name(prefix), create=True, size=_CONTROL_SIZE)
+        _CONTROL.pack_into(control.buf, 0, _MAGIC, 0)
+    _, previous_generation = _CONTROL.unpack_from(control.buf, 0)
+    generation = previous_generation + 1
+
+    shm = _open_segment(_dataset_name(prefix, generation), create=True, size=total_size)
+    _HEADER_LEN.pack_into(shm.buf, 0, len(header_bytes))
+    shm.buf[_HEADER_LEN.size:_HEADER_LEN.size + len(header_bytes)] = header_bytes
+    for name, array in arrays.items():
+        offset, _, length = header["arrays"][name]
+        np.ndarray((length,), dtype=array.dtype, buffer=shm.buf, offset=offset)[:] = array
+    shm.close()
+
+    _CONTROL.pack_into(control.buf, 0, _MAGIC, generation)
+    control.close()
+
+    if previous_generation:
+        # Workers still mapped to it keep their view until they switch over
+        try:
+            _unlink(_dataset_name(prefix, previous_generation))
+        except FileNotFoundError:
+            pass
+    return generation
+
+def unpublish(prefix: str = None):
+    """Remove the control segment and the current dataset from /dev/shm."""
+    prefix = prefix or settings.SHARED_DATASET_NAME
+    try:
+        control = _open_segment(_control_name(prefix))
+    except FileNotFoundError:
+        return
+    _, generation = _CONTROL.unpack_from(control.buf, 0)
+    control.close()
+    for name in (_dataset_name(prefix, generation), _control_name(prefix)):
+        try:
+            _unlink(name)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,34 @@
+"""
+Single-flight call coalescing.
+
+Concurrent calls with the same key share one in-flight computation: the
+first caller starts it and later callers await the same result (or error)
+instead of repeating the work. Once it finishes the key is released, so the
+next call computes afresh; nothing is cached.
+
+Coalescing is per worker process.
+"""
+import asyncio
+
+from . import metrics
+
+class SingleFlight:
+    def __init__(self, operation: str):
+        self.operation = operation
+        self._calls = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key, fn):
+        """Run `fn()` (a coroutine function) for `key`, or join the call already running for it."""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+            metrics.singleflight_calls.inc(operation=self.operation, result="leader")
+        else:
+            metrics.singleflight_calls.inc(operation=self.operation, result="shared")
+        # Shielded so a caller that disconnects doesn't cancel the work for the others
+        return await asyncio.shield(task)
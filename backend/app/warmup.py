@@ -0,0 +1,135 @@
+"""
+Startup warm-up and readiness state.
+
+Run from the lifespan hook as a background task so the worker answers
+/healthz (liveness) immediately, while /readyz (readiness) only reports
+ready once every step has completed:
+
+    jwks        prefetch the Clerk JWKS into the verification cache
+    mongo       open the connection pool and ping the server
+    indexes     ensure the indexes the request paths rely on, and the
+                history TTL indexes
+    cohorts     load the cohort statistics for the most common (country, role)
+                pairs, stored at ingestion, into the cohort cache
+    market_cube load the precomputed market cube behind /market/explore
+    gemini_sdk  import and configure the Gemini SDK
+
+MongoDB steps are retried until they succeed; JWKS, cohort and SDK failures
+are logged and don't block readiness, since requests can still recover from
+them on their own.
+"""
+import asyncio
+import time
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from .config import get_settings
+from .database import db
+from . import security
+from .services import ai_advisor, retention, survey_options, survey_schema
+
+settings = get_settings()
+
+# collection -> indexes matching the queries issued per request
+INDEXES = {
+    "users": [IndexModel([("clerk_id", ASCENDING)])],
+    "profiles": [IndexModel([("user_id", ASCENDING)])],
+    "benchmark_reports": [
+        # generated_at orders a user's archive for retention (app/services/retention.py)
+        IndexModel([("user_id", ASCENDING), ("is_current", ASCENDING), ("generated_at", DESCENDING)]),
+        # Stale report counts after a re-ingestion (admin /stale-reports, recompute_benchmarks.py --stale-only)
+        IndexModel([("is_current", ASCENDING), ("dataset_version", ASCENDING)]),
+    ],
+    "career_plans": [IndexModel([("user_id", ASCENDING), ("is_active", ASCENDING), ("generated_at", DESCENDING)])],
+    "market_benchmarks": survey_schema.COHORT_INDEXES,
+}
+
+state = {
+    "ready": False,
+    "started_at": None,
+    "completed_at": None,
+    "steps": {},
+}
+
+def _step_done(name: str, start: float, error: Exception = None):
+    state["steps"][name] = {
+        "ok": error is None,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        **({"error": str(error)} if error else {}),
+    }
+    if error:
+        print(f"Warm-up step '{name}' failed: {error}")
+
+async def ensure_indexes(database):
+    for collection, indexes in INDEXES.items():
+        await database[collection].create_indexes(indexes)
+    await retention.ensure_ttl_indexes(database)
+
+async def hot_cohorts(database, limit: int):
+    """
+    The most common (country, role) pairs, at their mean experience, as
+    computed at ingestion (services.survey_options). Empty for data ingested
+    before they were stored, until scripts/build_market_cube.py is run.
+    """
+    meta = await database.dataset_metadata.find_one({"_id": survey_options.META_ID}, {"hot_cohorts": 1})
+    cohorts = (meta or {}).get("hot_cohorts") or []
+    return [(c["country"], c["dev_role"], c["years"]) for c in cohorts[:limit]]
+
+async def _prefetch_jwks():
+    # get_jwks logs and returns {} on failure rather than raising
+    if not await asyncio.to_thread(security.get_jwks, settings.CLERK_ISSUER_URL):
+        raise RuntimeError("JWKS fetch returned no keys")
+
+async def _preload_cohorts():
+    # Imported here: the router pulls in models and auth, which this module doesn't otherwise need
+    from .routers.benchmarks import get_cohort_stats
+
+    analytics_db = db.get_analytics_db()
+    cohorts = await hot_cohorts(analytics_db, settings.WARMUP_HOT_COHORTS)
+    if not cohorts:
+        raise RuntimeError("No hot cohorts stored; run scripts/build_market_cube.py")
+    for country, dev_role, years in cohorts:
+        await get_cohort_stats(analytics_db, country, dev_role, years)
+
+async def _load_market_cube():
+    from .routers.market import get_market_cube
+
+    await get_market_cube(db.get_analytics_db())
+
+async def _until_ok(name: str, fn):
+    """Retry a required step until it succeeds."""
+    while True:
+        start = time.perf_counter()
+        try:
+            await fn()
+            _step_done(name, start)
+            return
+        except Exception as e:
+            _step_done(name, start, e)
+            await asyncio.sleep(settings.WARMUP_RETRY_SECONDS)
+
+async def _best_effort(name: str, fn):
+    start = time.perf_counter()
+    try:
+        await fn()
+        _step_done(name, start)
+    except Exception as e:
+        _step_done(name, start, e)
+
+async def warm_up():
+    state["started_at"] = time.time()
+    background = [asyncio.create_task(_best_effort("gemini_sdk", ai_advisor.load_sdk))]
+    if settings.CLERK_ISSUER_URL:
+        # Without a configured issuer the JWKS URL comes from each token
+        background.append(asyncio.create_task(_best_effort("jwks", _prefetch_jwks)))
+
+    await _until_ok("mongo", lambda: db.client.admin.command("ping"))
+    await _until_ok("indexes", lambda: ensure_indexes(db.get_db()))
+    if settings.WARMUP_HOT_COHORTS:
+        await _best_effort("cohorts", _preload_cohorts)
+    await _best_effort("market_cube", _load_market_cube)
+
+    await asyncio.gather(*background)
+    state["completed_at"] = time.time()
+    state["ready"] = True
+    print(f"Warm-up complete in {state['completed_at'] - state['started_at']:.2f}s")
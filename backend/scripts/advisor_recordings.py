@@ -0,0 +1,103 @@
+"""
+Summarize AI advisor recordings (ADVISOR_RECORD_MODE=record) and track
+prompt size across them.
+
+    summary   calls, latency and token percentiles per system instruction
+    compare   mean prompt size (tokens and characters, system instruction
+              included) of a recording against a baseline recording; exits
+              non-zero if it grew by more than --tolerance
+
+Usage:
+    python scripts/advisor_recordings.py summary advisor_recordings.jsonl
+    python scripts/advisor_recordings.py compare baseline.jsonl advisor_recordings.jsonl --tolerance 0.1
+
+To replay a recording offline (no network or API key), run the app or tests with
+    ADVISOR_RECORD_MODE=replay ADVISOR_RECORD_PATH=advisor_recordings.jsonl
+or pass --gemini-replay to scripts/load_test.py.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.services.advisor_recordings import load_recordings
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _prompt_chars(record: dict) -> int:
+    return len(record["system_instruction"] or "") + len(record["prompt"])
+
+
+def _by_instruction(records: list) -> dict:
+    groups = {}
+    for record in records:
+        groups.setdefault(record["instruction_key"][:12], []).append(record)
+    return groups
+
+
+def summarize(records: list) -> dict:
+    summary = {}
+    for instruction, group in _by_instruction(records).items():
+        latencies = [r["latency_seconds"] for r in group]
+        summary[instruction] = {
+            "model": group[0]["model"],
+            "calls": len(group),
+            "latency_p50_s": round(statistics.median(latencies), 3),
+            "latency_p95_s": round(_percentile(latencies, 0.95), 3),
+            "prompt_tokens_mean": round(statistics.fmean(r["prompt_tokens"] for r in group), 1),
+            "completion_tokens_mean": round(statistics.fmean(r["completion_tokens"] for r in group), 1),
+            "prompt_chars_mean": round(statistics.fmean(_prompt_chars(r) for r in group), 1),
+        }
+    return summary
+
+
+def compare(baseline: list, current: list, tolerance: float) -> dict:
+    def means(records):
+        return {
+            "prompt_tokens": statistics.fmean(r["prompt_tokens"] for r in records),
+            "prompt_chars": statistics.fmean(_prompt_chars(r) for r in records),
+        }
+
+    before, after = means(baseline), means(current)
+    report = {"baseline_calls": len(baseline), "current_calls": len(current), "metrics": {}, "regressions": []}
+    for name in before:
+        change = (after[name] - before[name]) / before[name] if before[name] else 0.0
+        report["metrics"][name] = {"baseline": round(before[name], 1), "current": round(after[name], 1),
+                                   "change": round(change, 4)}
+        if change > tolerance:
+            report["regressions"].append(name)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    summary_parser = commands.add_parser("summary")
+    summary_parser.add_argument("path")
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed prompt growth (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    if args.command == "summary":
+        print(json.dumps(summarize(load_recordings(args.path)), indent=2))
+        return
+
+    report = compare(load_recordings(args.baseline), load_recordings(args.current), args.tolerance)
+    print(json.dumps(report, indent=2))
+    if report["regressions"]:
+        print(f"Prompt size grew beyond {args.tolerance:.0%}: {', '.join(report['regressions'])}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Microbenchmarks for the cohort statistics and scoring code in
+app/routers/benchmarks.py at increasing survey sizes.
+
+Pure-Python stages run on cohorts built from synthetic survey data, with no
+database needed:
+    salary_percentile   salary extraction + percentile for the cohort
+    skill_aggregation   merging the per-category top lists
+    match_scoring       scoring 1,000 users against the cohort's skills
+
+With --mongodb-uri, each scale is also loaded into its own database
+(careeriq_bench_<rows>, reused when it already has the right row count) and
+the Mongo-backed stages are timed for representative profiles:
+    cohort_resolution   resolve_cohort fallback cascade (count queries)
+    cohort_pipeline     fetch_cohort_stats $facet aggregation
+    get_cohort_stats    both, end to end, with the cohort cache cleared
+    get_cohort_stats_cached
+                        end to end, served from the cohort cache
+
+Results are printed as JSON. Medians are compared with the baseline in
+scripts/baselines/bench_cohort.json (committed for the offline stages at
+65000 and 500000 rows; re-save it on the machine that runs the comparison)
+and the script exits non-zero when any stage is slower than
+baseline * (1 + tolerance) and by more than --min-delta-ms, or when there is
+no baseline and --save-baseline wasn't passed.
+
+Usage:
+    python scripts/bench_cohort.py --scales 65000,500000
+    python scripts/bench_cohort.py --scales 65000,500000 --save-baseline
+    python scripts/bench_cohort.py --scales 65000,500000,2000000,10000000 \\
+        --mongodb-uri mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+import synthetic_survey
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "scripts", "baselines", "bench_cohort.json")
+
+# (label, country, dev_role, years_experience) - each exercises a different fallback tier
+PROFILES = [
+    ("common_cohort", "United States of America", "Developer, full-stack", 8),
+    ("small_country_rare_role", "Austria", "Academic researcher", 22),
+    ("unknown_role", "Germany", "Blockchain developer", 5),
+]
+
+SKILL_FACETS = {
+    "top_languages": ("LanguageHaveWorkedWith", 10),
+    "top_databases": ("DatabaseHaveWorkedWith", 5),
+    "top_frameworks": ("WebframeHaveWorkedWith", 5),
+}
+
+
+def _setup_app_import(mongodb_uri: str):
+    # Settings needs these to import app modules; the values don't matter offline.
+    os.environ.setdefault("MONGODB_URI", mongodb_uri or "mongodb://localhost:27017")
+    os.environ.setdefault("SECRET_KEY", "bench")
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+
+async def bench(fn, rounds: int, warmup: int = 1) -> dict:
+    """pytest-benchmark style timing of a sync or async callable."""
+    timings = []
+    for i in range(warmup + rounds):
+        start = time.perf_counter()
+        result = fn()
+        if asyncio.iscoroutine(result):
+            await result
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            timings.append(elapsed * 1000)
+    return {
+        "rounds": rounds,
+        "min_ms": round(min(timings), 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "max_ms": round(max(timings), 4),
+        "stddev_ms": round(statistics.stdev(timings), 4) if len(timings) > 1 else 0.0,
+    }
+
+
+def build_cohort_stats(rows: int, seed: int, country: str, dev_role: str = None, years: float = None):
+    """
+    Stream synthetic chunks and build a stats dict shaped like the $facet
+    output of fetch_cohort_stats for the given cohort filter.
+    """
+    country_code = [c[0] for c in synthetic_survey.COUNTRIES].index(country)
+    role_code = [r[0] for r in synthetic_survey.DEV_ROLES].index(dev_role) if dev_role else None
+    salaries = []
+    counts = {col: np.zeros(len(synthetic_survey.SKILL_COLUMNS[col]), dtype=np.int64)
+              for col, _ in SKILL_FACETS.values()}
+
+    for chunk in synthetic_survey.generate_chunks(rows, seed):
+        mask = (chunk["country"] == country_code) & (chunk["salary"] > 0)
+        if role_code is not None:
+            mask &= chunk["role"] == role_code
+        if years is not None:
+            mask &= np.abs(chunk["years"] - years) <= 2
+        salaries.append(chunk["salary"][mask])
+        for col in counts:
+            counts[col] += chunk["skills"][col][mask].sum(axis=0)
+
+    sorted_salaries = np.sort(np.concatenate(salaries))
+    stats = {"salaries": [{"salary": float(s)} for s in sorted_salaries]}
+    for facet, (col, limit) in SKILL_FACETS.items():
+        names = [s[0] for s in synthetic_survey.SKILL_COLUMNS[col]]
+        top = np.argsort(-counts[col])[:limit]
+        stats[facet] = [{"_id": names[i], "count": int(counts[col][i])} for i in top]
+    return stats
+
+
+async def bench_pure_stages(rows: int, args) -> list:
+    from app.routers.benchmarks import (
+        calculate_salary_percentile, aggregate_market_skills, score_skill_match
+    )
+
+    results = []
+    cohorts = {
+        "strict": build_cohort_stats(rows, args.seed, "United States of America", "Developer, full-stack", 8),
+        "country": build_cohort_stats(rows, args.seed, "United States of America"),
+    }
+    rng = random.Random(args.seed)
+    all_skills = [s[0].lower() for items in synthetic_survey.SKILL_COLUMNS.values() for s in items]
+    users = [set(rng.sample(all_skills, rng.randint(3, 15))) for _ in range(1000)]
+
+    for label, stats in cohorts.items():
+        size = len(stats["salaries"])
+        user_salary = stats["salaries"][size // 2]["salary"] if size else 0
+
+        def percentile_stage():
+            salaries = [doc["salary"] for doc in stats["salaries"]]
+            return calculate_salary_percentile(salaries, user_salary)
+
+        market_skills = aggregate_market_skills(stats)
+
+        def scoring_stage():
+            for user_skills in users:
+                score_skill_match(user_skills, market_skills)
+
+        for stage, fn in [
+            ("salary_percentile", percentile_stage),
+            ("skill_aggregation", lambda: aggregate_market_skills(stats)),
+            ("match_scoring", scoring_stage),
+        ]:
+            timing = await bench(fn, args.rounds)
+            results.append({"stage": f"{stage}[{label}]", "rows": rows, "cohort_size": size, **timing})
+    return results
+
+
+async def seed_scale(db, rows: int, seed: int):
+    import ingest_survey
+
+    collection = db.market_benchmarks
+    if await collection.estimated_document_count() == rows:
+        return
+    print(f"Seeding {rows} synthetic rows into {db.name}...", file=sys.stderr)
+    await collection.drop()
+    batch = []
+    for row in synthetic_survey.iter_survey_rows(rows, seed):
+        batch.append(ingest_survey.row_to_document(row))
+        if len(batch) == 10_000:
+            await collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+
+
+async def bench_mongo_stages(client, rows: int, args) -> list:
+    from app.routers.benchmarks import get_cohort_stats, resolve_cohort, fetch_cohort_stats
+    from app.services import cohort_cache
+
+    db = client[f"careeriq_bench_{rows}"]
+    await seed_scale(db, rows, args.seed)
+    collection = db.market_benchmarks
+    mongo_rounds = max(1, args.rounds // 5)
+
+    results = []
+    for label, country, role, years in PROFILES:
+        match_query, count, cohort_name = await resolve_cohort(collection, country, role, years)
+        common = {"rows": rows, "cohort_size": count, "cohort": cohort_name}
+
+        timing = await bench(lambda: resolve_cohort(collection, country, role, years), mongo_rounds)
+        results.append({"stage": f"cohort_resolution[{label}]", **common, **timing})
+        if count:
+            timing = await bench(lambda: fetch_cohort_stats(collection, match_query), mongo_rounds)
+            results.append({"stage": f"cohort_pipeline[{label}]", **common, **timing})
+
+        def uncached():
+            cohort_cache.cache.clear()
+            return get_cohort_stats(db, country, role, years)
+
+        timing = await bench(uncached, mongo_rounds)
+        results.append({"stage": f"get_cohort_stats[{label}]", **common, **timing})
+        timing = await bench(lambda: get_cohort_stats(db, country, role, years), args.rounds)
+        results.append({"stage": f"get_cohort_stats_cached[{label}]", **common, **timing})
+    return results
+
+
+def compare_with_baseline(results: list, baseline: dict, tolerance: float, min_delta_ms: float) -> list:
+    regressions = []
+    for r in results:
+        key = f"{r['stage']}@{r['rows']}"
+        reference = baseline.get(key)
+        # The absolute floor keeps timer noise on sub-millisecond stages from failing the run
+        if reference and r["median_ms"] > reference * (1 + tolerance) and r["median_ms"] - reference > min_delta_ms:
+            regressions.append({
+                "key": key,
+                "baseline_ms": reference,
+                "median_ms": r["median_ms"],
+                "ratio": round(r["median_ms"] / reference, 2),
+            })
+    return regressions
+
+
+async def run(args) -> dict:
+    scales = [int(s) for s in args.scales.split(",")]
+    results = []
+    for rows in scales:
+        print(f"Benchmarking pure stages at {rows} rows...", file=sys.stderr)
+        results += await bench_pure_stages(rows, args)
+
+    if args.mongodb_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client = AsyncIOMotorClient(args.mongodb_uri)
+        try:
+            for rows in scales:
+                print(f"Benchmarking Mongo stages at {rows} rows...", file=sys.stderr)
+                results += await bench_mongo_stages(client, rows, args)
+        finally:
+            client.close()
+    return {"scales": scales, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="65000,500000,2000000,10000000")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mongodb-uri", help="Also time the Mongo-backed stages against this server")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these medians as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs. baseline (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="Slowdowns smaller than this many milliseconds never count as regressions")
+    parser.add_argument("--output", help="Also write the JSON report to this path")
+    args = parser.parse_args()
+
+    if not args.save_baseline and not os.path.exists(args.baseline):
+        parser.error(f"no baseline at {args.baseline}; run with --save-baseline to create one")
+
+    _setup_app_import(args.mongodb_uri)
+    report = asyncio.run(run(args))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({f"{r['stage']}@{r['rows']}": r["median_ms"] for r in report["results"]}, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+        report["regressions"] = []
+    else:
+        with open(args.baseline) as f:
+            report["regressions"] = compare_with_baseline(
+                report["results"], json.load(f), args.tolerance, args.min_delta_ms
+            )
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    if report["regressions"]:
+        print(f"{len(report['regressions'])} stage(s) regressed beyond {args.tolerance:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
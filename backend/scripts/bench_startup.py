@@ -0,0 +1,130 @@
+"""
+Cold-start budget check for the backend.
+
+Measures, in fresh interpreters:
+    import      cumulative `python -X importtime -c "import app.main"` time,
+                plus the heaviest modules pulled in
+    first_response
+                time from spawning uvicorn to the first 200 from GET /
+
+Each measurement is repeated and the median is compared to its budget; the
+script prints a JSON report and exits non-zero when a budget is exceeded.
+No database is needed: Motor connects lazily, and the root route doesn't
+touch MongoDB.
+
+Usage:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --import-budget-ms 800 --first-response-budget-ms 2500 --runs 5
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _env() -> dict:
+    # Settings requires these; nothing is contacted during startup
+    env = dict(os.environ)
+    env.setdefault("MONGODB_URI", "mongodb://127.0.0.1:1")
+    env.setdefault("SECRET_KEY", "startup-bench")
+    return env
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def measure_import(top: int):
+    """Returns (cumulative ms for app.main, [(module, cumulative ms), ...] heaviest first)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, check=True,
+    )
+    modules = []
+    total_us = None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time: <self us> | <cumulative us> | <module, indented by depth>"
+        _, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        modules.append((name, int(cumulative_us) / 1000))
+        if name == "app.main":
+            total_us = int(cumulative_us)
+    # Only top-level packages, so nested modules don't crowd the list
+    roots = sorted(
+        ((name, ms) for name, ms in modules if "." not in name or name.startswith("app.")),
+        key=lambda item: item[1], reverse=True,
+    )
+    return total_us / 1000, [{"module": name, "cumulative_ms": round(ms, 1)} for name, ms in roots[:top]]
+
+def measure_first_response(timeout: float) -> float:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError(f"No response from {url} within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--import-budget-ms", type=float, default=1000)
+    parser.add_argument("--first-response-budget-ms", type=float, default=3000)
+    parser.add_argument("--top", type=int, default=10, help="Heaviest imports to list")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--output", help="Also write the JSON report to this path")
+    args = parser.parse_args()
+
+    import_runs, heaviest = [], []
+    for _ in range(args.runs):
+        total, heaviest = measure_import(args.top)
+        import_runs.append(total)
+    first_response_runs = [measure_first_response(args.timeout) for _ in range(args.runs)]
+
+    report = {
+        "import": {
+            "median_ms": round(statistics.median(import_runs), 1),
+            "runs_ms": [round(v, 1) for v in import_runs],
+            "budget_ms": args.import_budget_ms,
+            "heaviest": heaviest,
+        },
+        "first_response": {
+            "median_ms": round(statistics.median(first_response_runs), 1),
+            "runs_ms": [round(v, 1) for v in first_response_runs],
+            "budget_ms": args.first_response_budget_ms,
+        },
+    }
+    failures = [name for name, section in report.items() if section["median_ms"] > section["budget_ms"]]
+    report["over_budget"] = failures
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    if failures:
+        print(f"Cold start over budget: {', '.join(failures)}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
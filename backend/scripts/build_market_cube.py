@@ -0,0 +1,71 @@
+"""
+Rebuild the market cube (app/services/market_cube.py) and the survey options
+(app/services/survey_options.py) from the market_benchmarks collection already
+in MongoDB, without re-ingesting the survey CSV.
+scripts/ingest_survey.py does this as part of every ingestion.
+
+Documents ingested before dev_roles and exp_bucket existed get them
+backfilled first (see app/services/survey_schema.py), along with the cohort
+indexes. Always bumps the dataset version afterwards: workers reload the
+cube and options only when it changes, so keeping it would leave any worker
+that cached "not built" answering 503 until restarted.
+
+Usage:
+    python scripts/build_market_cube.py
+"""
+import asyncio
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+import ingest_survey
+from ingest_survey import COLLECTION_NAME, DB_NAME, MONGODB_URI, market_cube, survey_options, survey_schema
+
+PROJECTION = {"_id": 0, "country": 1, "dev_role": 1, "dev_roles": 1, "years_experience": 1, "salary": 1,
+              **{field: 1 for field in market_cube.SKILL_FIELDS}}
+
+async def backfill_derived_fields(collection, batch_size: int = 5000) -> int:
+    """Set dev_roles and exp_bucket on documents missing either; returns how many were updated."""
+    missing = {"$or": [{"dev_roles": {"$exists": False}}, {"exp_bucket": {"$exists": False}}]}
+    updated = 0
+    batch = []
+    async for doc in collection.find(missing, {"dev_role": 1, "years_experience": 1}, batch_size=batch_size):
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {
+            "dev_roles": survey_schema.parse_dev_roles(doc.get("dev_role")),
+            "exp_bucket": survey_schema.exp_bucket_index(float(doc.get("years_experience") or 0)),
+        }}))
+        if len(batch) == batch_size:
+            updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+            batch = []
+    if batch:
+        updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+    return updated
+
+async def build(mongodb_uri: str = MONGODB_URI, db_name: str = DB_NAME):
+    if not mongodb_uri:
+        print("Error: MONGODB_URI not found in .env")
+        return
+
+    client = AsyncIOMotorClient(mongodb_uri)
+    db = client[db_name]
+    try:
+        start = time.perf_counter()
+        backfilled = await backfill_derived_fields(db[COLLECTION_NAME])
+        if backfilled:
+            print(f"Backfilled dev_roles and exp_bucket on {backfilled} documents")
+        await db[COLLECTION_NAME].create_indexes(survey_schema.COHORT_INDEXES)
+        documents = await db[COLLECTION_NAME].find({"salary": {"$gt": 0}}, PROJECTION).to_list(length=None)
+        cells = await market_cube.write_market_cube(db, documents)
+        option_counts = await survey_options.write_survey_options(db, documents)
+        # The cube and options were rewritten, so workers must reload them even if the content is the same
+        version = await ingest_survey.bump_dataset_version(
+            db, len(documents), survey_schema.content_hash(documents), force=True
+        )
+        print(f"Built market cube with {cells} cells and survey options {option_counts} from {len(documents)} rows "
+              f"in {time.perf_counter() - start:.1f}s; dataset version is now {version}")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(build())
@@ -0,0 +1,141 @@
+"""
+Chaos test for the AI advisor's circuit breaker, retries and hedging.
+
+Runs generate_career_advice in-process against the GeminiStub from
+loadtest_stubs.py (no MongoDB needed) through four phases:
+
+    healthy     normal latency, no failures
+    outage      every call fails with 503: the breaker should open and
+                plans should come from the rules engine in milliseconds
+    recovery    the stub is healthy again: after --open-seconds the breaker
+                probes half-open and closes
+    long_tail   a share of calls is delayed by --tail-ms: with
+                --hedge-budget > 0, hedged calls cut the tail
+
+and prints, per phase, latency percentiles, upstream calls, fallbacks by
+reason, hedges and the breaker state as JSON.
+
+Usage:
+    python scripts/chaos_advisor.py
+    python scripts/chaos_advisor.py --requests 200 --concurrency 8 --hedge-budget 0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+from loadtest_stubs import GeminiStub
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILE = {"current_title": "Backend Developer", "years_experience": 5, "country": "Germany",
+           "technical_skills": ["Python", "SQL"], "salary_package": 60000}
+BENCHMARK = {"compensation_quartile": 30, "comparable_profiles_count": 400, "skill_match_score": 55,
+             "market_salary_comparison": "Competitive", "missing_critical_skills": ["Go", "Docker"]}
+
+FALLBACK_REASONS = ["no_api_key", "circuit_open", "llm_error", "invalid_response"]
+
+
+def _setup_app_import(stub: GeminiStub, args):
+    # Settings needs these to import app modules; the values don't matter offline.
+    os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+    os.environ.setdefault("SECRET_KEY", "chaos")
+    os.environ.update({
+        "GEMINI_API_KEY": "chaos",
+        "GEMINI_API_ENDPOINT": stub.url,
+        "ADVISOR_MODE": "llm",
+        "GEMINI_TIMEOUT_SECONDS": str(args.timeout),
+        "GEMINI_RETRY_BASE_SECONDS": "0.1",
+        "GEMINI_BREAKER_OPEN_SECONDS": str(args.open_seconds),
+        "GEMINI_BREAKER_SLOW_SECONDS": str(args.timeout / 2),
+        "GEMINI_HEDGE_BUDGET": str(args.hedge_budget),
+        "GEMINI_HEDGE_MIN_DELAY_SECONDS": "0.05",
+    })
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_phase(name: str, stub: GeminiStub, args) -> dict:
+    from app import metrics
+    from app.services import ai_advisor
+
+    before_calls = stub.calls
+    before_fallbacks = {r: metrics.advisor_fallback_plans.value(reason=r) for r in FALLBACK_REASONS}
+    before_hedges = {r: metrics.hedged_requests.value(operation="gemini", result=r) for r in ("launched", "won")}
+    slots = asyncio.Semaphore(args.concurrency)
+    timings = []
+
+    async def one():
+        async with slots:
+            start = time.perf_counter()
+            plan = await ai_advisor.generate_career_advice(PROFILE, BENCHMARK)
+            timings.append((time.perf_counter() - start) * 1000)
+            assert 1 <= len(plan["recommendations"]) <= 7
+
+    await asyncio.gather(*(one() for _ in range(args.requests)))
+    return {
+        "phase": name,
+        "requests": args.requests,
+        "upstream_calls": stub.calls - before_calls,
+        "p50_ms": round(statistics.median(timings), 1),
+        "p95_ms": round(_percentile(timings, 0.95), 1),
+        "p99_ms": round(_percentile(timings, 0.99), 1),
+        "fallbacks": {
+            r: int(metrics.advisor_fallback_plans.value(reason=r) - before_fallbacks[r])
+            for r in FALLBACK_REASONS if metrics.advisor_fallback_plans.value(reason=r) > before_fallbacks[r]
+        },
+        "hedges": {
+            r: int(metrics.hedged_requests.value(operation="gemini", result=r) - before_hedges[r])
+            for r in before_hedges
+        },
+        "breaker_state": ai_advisor.breaker.state,
+    }
+
+
+async def run(stub: GeminiStub, args) -> list:
+    results = []
+    stub.latency_ms, stub.jitter_ms, stub.failure_rate = args.latency_ms, args.latency_ms / 4, 0.0
+    results.append(await run_phase("healthy", stub, args))
+
+    stub.failure_rate = 1.0
+    results.append(await run_phase("outage", stub, args))
+
+    stub.failure_rate = 0.0
+    await asyncio.sleep(args.open_seconds)
+    results.append(await run_phase("recovery", stub, args))
+
+    stub.tail_rate, stub.tail_ms = args.tail_rate, args.tail_ms
+    results.append(await run_phase("long_tail", stub, args))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100, help="Plans per phase")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--tail-rate", type=float, default=0.05, help="Share of long-tail calls in the last phase")
+    parser.add_argument("--tail-ms", type=float, default=3000)
+    parser.add_argument("--timeout", type=float, default=10.0, help="Gemini per-attempt timeout")
+    parser.add_argument("--open-seconds", type=float, default=2.0, help="Breaker open interval")
+    parser.add_argument("--hedge-budget", type=float, default=0.1, help="Share of calls that may be hedged; 0 disables")
+    args = parser.parse_args()
+
+    stub = GeminiStub().start()
+    _setup_app_import(stub, args)
+    try:
+        print(json.dumps(asyncio.run(run(stub, args)), indent=2))
+    finally:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Apply the history retention policy (app/services/retention.py) to existing
+benchmark_reports and career_plans.
+
+For each collection:
+    1. stamp archived documents that predate retention with archived_at
+       (set to now, so a newly enabled TTL doesn't expire them all at once)
+    2. for every user with more than HISTORY_KEEP archived documents, compact
+       or delete the older ones, in bulk writes of --batch-size users
+    3. create or update the archived_at TTL index for HISTORY_TTL_DAYS
+
+Safe to re-run; already compacted documents are left alone.
+
+Usage:
+    python scripts/compact_history.py --dry-run
+    HISTORY_KEEP=3 HISTORY_TTL_DAYS=365 python scripts/compact_history.py
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR) # Settings reads .env from the working directory
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import DeleteOne
+
+from app.config import get_settings
+from app.services import retention
+
+async def users_over_limit(collection, flag: str, keep: int):
+    pipeline = [
+        {"$match": {flag: False}},
+        {"$group": {"_id": "$user_id", "archived": {"$sum": 1}}},
+        {"$match": {"archived": {"$gt": keep}}},
+    ]
+    async for group in collection.aggregate(pipeline, allowDiskUse=True):
+        yield group["_id"]
+
+async def compact_collection(db, collection_name: str, batch_size: int, dry_run: bool) -> dict:
+    flag, _ = retention.HISTORY_COLLECTIONS[collection_name]
+    settings = get_settings()
+    collection = db[collection_name]
+    summary = {"stamped": 0, "users": 0, "compacted": 0, "deleted": 0}
+
+    legacy = {flag: False, "archived_at": {"$exists": False}}
+    if dry_run:
+        summary["stamped"] = await collection.count_documents(legacy)
+    else:
+        result = await collection.update_many(legacy, {"$set": {"archived_at": datetime.utcnow()}})
+        summary["stamped"] = result.modified_count
+
+    async def flush(operations):
+        for op in operations:
+            summary["deleted" if isinstance(op, DeleteOne) else "compacted"] += 1
+        if operations and not dry_run:
+            await collection.bulk_write(operations, ordered=False)
+
+    operations, users_in_batch = [], 0
+    async for user_id in users_over_limit(collection, flag, settings.HISTORY_KEEP):
+        expired = await retention.expired_history(collection, collection_name, user_id)
+        operations += retention.history_operations(collection_name, expired, keep=0)
+        summary["users"] += 1
+        users_in_batch += 1
+        if users_in_batch >= batch_size:
+            await flush(operations)
+            operations, users_in_batch = [], 0
+    await flush(operations)
+    return summary
+
+async def run(args):
+    settings = get_settings()
+    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    db = client[settings.DB_NAME]
+    try:
+        for collection_name in retention.HISTORY_COLLECTIONS:
+            start = time.perf_counter()
+            summary = await compact_collection(db, collection_name, args.batch_size, args.dry_run)
+            print(f"{collection_name}: {summary} in {time.perf_counter() - start:.1f}s"
+                  + (" (dry run)" if args.dry_run else ""))
+        if not args.dry_run:
+            await retention.ensure_ttl_indexes(db)
+            ttl = f"{settings.HISTORY_TTL_DAYS} days" if settings.HISTORY_TTL_DAYS else "disabled"
+            print(f"archived_at TTL: {ttl}")
+    finally:
+        client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500, help="Users per bulk write")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
+import argparse
 import asyncio
 import os
 import sys
 import pandas as pd
+from datetime import datetime
+from pymongo import ReturnDocument
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 
@@ -14,6 +17,11 @@ MONGODB_URI = os.getenv("MONGODB_URI")
 DB_NAME = os.getenv("DB_NAME", "careeriq")
 COLLECTION_NAME = "market_benchmarks"
 
+# app.services.market_cube, survey_options and survey_schema need no settings, so this works with just MONGODB_URI
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+from app.services import market_cube, survey_options, survey_schema
+
 # Adjust CSV path relative to this script or current working directory
 # We assume the script is run from backend/ or we can find it relative to the script file
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -36,25 +44,74 @@ def parse_semicolon_list(val):
         return []
     return [x.strip() for x in str(val).split(';')]
 
-async def ingest_data():
-    if not MONGODB_URI:
+def row_to_document(row) -> dict:
+    """Map one survey row (pandas Series or dict keyed by CSV column) to a market_benchmarks document."""
+    return {
+        "country": str(row['Country']),
+        "years_experience": float(row['WorkExp']),
+        "dev_role": str(row['DevType']),
+        "dev_roles": survey_schema.parse_dev_roles(str(row['DevType'])),
+        "exp_bucket": survey_schema.exp_bucket_index(float(row['WorkExp'])),
+        "salary": float(row['ConvertedCompYearly']),
+        "languages": parse_semicolon_list(row.get('LanguageHaveWorkedWith')),
+        "databases": parse_semicolon_list(row.get('DatabaseHaveWorkedWith')),
+        "platforms": parse_semicolon_list(row.get('PlatformHaveWorkedWith')),
+        "frameworks": parse_semicolon_list(row.get('WebframeHaveWorkedWith')),
+        "source_year": 2024
+    }
+
+async def stored_content_hash(db):
+    """Content hash recorded by the last ingestion, or None."""
+    metadata = await db.dataset_metadata.find_one({"_id": COLLECTION_NAME}, {"content_hash": 1})
+    return metadata.get("content_hash") if metadata else None
+
+async def bump_dataset_version(db, row_count: int, content_hash: str, force: bool = False) -> int:
+    """
+    Bump the dataset version so API workers drop cohort caches and reload the
+    market cube, and so reports computed from the previous version count as
+    stale. Unless `force`, an in-place rebuild with the same content keeps its
+    version; anything that rewrote market_benchmarks must force the bump, since
+    caches and reports filled while it was being rewritten carry the old one.
+    """
+    collection = db.dataset_metadata
+    metadata = await collection.find_one({"_id": COLLECTION_NAME})
+    if metadata and metadata.get("content_hash") == content_hash and not force:
+        await collection.update_one(
+            {"_id": COLLECTION_NAME}, {"$set": {"row_count": row_count, "ingested_at": datetime.utcnow()}}
+        )
+        print("Survey content unchanged; keeping the dataset version.")
+        return metadata["version"]
+
+    metadata = await collection.find_one_and_update(
+        {"_id": COLLECTION_NAME},
+        {"$inc": {"version": 1}, "$set": {
+            "row_count": row_count, "content_hash": content_hash, "ingested_at": datetime.utcnow(),
+        }},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return metadata["version"]
+
+async def ingest_data(csv_path: str = CSV_PATH, mongodb_uri: str = MONGODB_URI, db_name: str = DB_NAME,
+                      force: bool = False):
+    if not mongodb_uri:
         print("Error: MONGODB_URI not found in .env")
         return
 
     print("Starting data ingestion...")
-    print(f"Connecting to MongoDB: {DB_NAME}...")
+    print(f"Connecting to MongoDB: {db_name}...")
     
-    client = AsyncIOMotorClient(MONGODB_URI)
-    db = client[DB_NAME]
+    client = AsyncIOMotorClient(mongodb_uri)
+    db = client[db_name]
     collection = db[COLLECTION_NAME]
     
     # Check if CSV exists
-    if not os.path.exists(CSV_PATH):
-        print(f"Error: {CSV_PATH} not found.")
+    if not os.path.exists(csv_path):
+        print(f"Error: {csv_path} not found.")
         return
 
     # 1. Read CSV
-    print(f"Reading {CSV_PATH}...")
+    print(f"Reading {csv_path}...")
     
     # We found that 'YearsCodePro' is not in the columns, based on the schema and error 'YearsCode' might be the one or similar.
     # Looking at the CSV header: "YearsCode" exists. "YearsCodePro" might be missing or named differently in this year's survey?
@@ -73,11 +130,11 @@ async def ingest_data():
     ]
     
     try:
-        df = pd.read_csv(CSV_PATH, usecols=usecols)
+        df = pd.read_csv(csv_path, usecols=usecols)
         print("Columns found successfully.")
     except ValueError as e:
         print(f"Warning: Columns mismatch ({e}). Reading all columns to inspect...")
-        df = pd.read_csv(CSV_PATH)
+        df = pd.read_csv(csv_path)
         print(f"Available columns: {df.columns.tolist()}")
         # If read all, we still need to process. We'll attempt to use available columns.
         if 'WorkExp' not in df.columns and 'YearsCodePro' in df.columns:
@@ -103,29 +160,23 @@ async def ingest_data():
     documents = []
     
     for _, row in df.iterrows():
-        years = float(row['WorkExp'])
-            
-        doc = {
-            "country": str(row['Country']),
-            "years_experience": years,
-            "dev_role": str(row['DevType']),
-            "salary": float(row['ConvertedCompYearly']),
-            "languages": parse_semicolon_list(row.get('LanguageHaveWorkedWith')),
-            "databases": parse_semicolon_list(row.get('DatabaseHaveWorkedWith')),
-            "platforms": parse_semicolon_list(row.get('PlatformHaveWorkedWith')),
-            "frameworks": parse_semicolon_list(row.get('WebframeHaveWorkedWith')),
-            "source_year": 2024
-        }
-        documents.append(doc)
+        documents.append(row_to_document(row))
 
     print(f"Prepared {len(documents)} documents for insertion.")
 
-    if documents:
+    # Compared before touching MongoDB: the same survey again needs no reload at all
+    # (--force reloads anyway, e.g. after changing how the cube or options are built)
+    content_hash = survey_schema.content_hash(documents)
+    if documents and not force and content_hash == await stored_content_hash(db):
+        print("Survey content unchanged since the last ingestion; nothing to do.")
+    elif documents:
         # 3. Insert into MongoDB
         print(f"Inserting into collection '{COLLECTION_NAME}'...")
         # Clear existing data or just append? 
         # Usually for a fresh ingestion script we might want to drop old data or update. 
         # For this task, let's drop to ensure clean state if run multiple times.
+        # Forget the old hash first so a run that fails partway is never taken for a complete one
+        await db.dataset_metadata.update_one({"_id": COLLECTION_NAME}, {"$unset": {"content_hash": ""}})
         await collection.drop()
         print("Dropped existing collection.")
         
@@ -141,10 +192,29 @@ async def ingest_data():
         # Verify count
         count = await collection.count_documents({})
         print(f"Total documents in '{COLLECTION_NAME}': {count}")
+
+        # Dropping the collection dropped its indexes; cohort queries need them before the next API restart
+        await collection.create_indexes(survey_schema.COHORT_INDEXES)
+        print("Created cohort indexes.")
+
+        # Precompute the market cube for /market/explore
+        cells = await market_cube.write_market_cube(db, documents)
+        print(f"Built market cube with {cells} cells.")
+
+        # Distinct countries, roles and skills for the profile form (GET /meta/options)
+        option_counts = await survey_options.write_survey_options(db, documents)
+        print(f"Stored survey options: {option_counts}")
+
+        version = await bump_dataset_version(db, count, content_hash, force=True)
+        print(f"Dataset version is now {version}")
     else:
         print("No valid documents to insert.")
 
     client.close()
 
 if __name__ == "__main__":
-    asyncio.run(ingest_data())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load the survey CSV into market_benchmarks.")
+    parser.add_argument("--force", action="store_true",
+                        help="Reload even if the survey content is unchanged since the last ingestion")
+    args = parser.parse_args()
+    asyncio.run(ingest_data(force=args.force))
\ No newline at end of file
@@ -0,0 +1,262 @@
+"""
+End-to-end load test against a local backend.
+
+Starts the JWKS/token and Gemini stand-ins from loadtest_stubs.py, optionally
+loads a synthetic survey into a local MongoDB, boots the app with uvicorn
+pointed at those stand-ins, then drives virtual users through:
+
+    auth sync -> profile upsert -> benchmark generation -> plan generation
+    -> dashboard/benchmark/plan reads
+
+and prints p50/p95/p99 latency and requests/second per operation as JSON
+(also written to --output), so results can be tracked across releases.
+
+Admission control is off by default: every virtual user would otherwise hit
+the per-user plan and benchmark rate limits within a cycle or two, and the
+run would time 429s instead of the work. --admission keeps it on to measure
+shedding under load.
+
+Usage:
+    python scripts/load_test.py --mongodb-uri mongodb://localhost:27017 \\
+        --survey-rows 65000 --users 200 --concurrency 50 --output load.json
+
+Requires httpx (see requirements-dev.txt).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+import synthetic_survey
+from loadtest_stubs import GeminiStub, JWKSServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    lo = int(rank)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (rank - lo)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.statuses = {}
+
+    def record(self, op: str, seconds: float, status: int):
+        self.latencies.setdefault(op, []).append(seconds)
+        self.statuses.setdefault(op, {}).setdefault(str(status), 0)
+        self.statuses[op][str(status)] += 1
+        if status >= 400:
+            self.errors[op] = self.errors.get(op, 0) + 1
+
+    def summary(self, wall_seconds: float) -> dict:
+        ops = {}
+        for op, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            ops[op] = {
+                "count": len(values),
+                "errors": self.errors.get(op, 0),
+                "statuses": self.statuses[op],
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2),
+                "rps": round(len(values) / wall_seconds, 2) if wall_seconds else 0,
+            }
+        all_values = sorted(v for values in self.latencies.values() for v in values)
+        total = {
+            "count": len(all_values),
+            "errors": sum(self.errors.values()),
+            "p50_ms": round(percentile(all_values, 50) * 1000, 2),
+            "p95_ms": round(percentile(all_values, 95) * 1000, 2),
+            "p99_ms": round(percentile(all_values, 99) * 1000, 2),
+            "rps": round(len(all_values) / wall_seconds, 2) if wall_seconds else 0,
+        }
+        return {"operations": ops, "total": total}
+
+
+def random_profile(rng: random.Random) -> dict:
+    def pick(items, k):
+        return rng.sample([i[0] for i in items], k=min(k, len(items)))
+
+    years = rng.randint(0, 25)
+    languages = pick(synthetic_survey.LANGUAGES, rng.randint(2, 6))
+    frameworks = pick(synthetic_survey.FRAMEWORKS, rng.randint(1, 3))
+    databases = pick(synthetic_survey.DATABASES, rng.randint(1, 3))
+    return {
+        "graduation_year": 2024 - years - rng.randint(0, 3),
+        "field_of_study": "Computer Science",
+        "current_company": "Load Test Inc",
+        "current_title": "Software Engineer",
+        "technical_skills": languages + frameworks + databases,
+        "soft_skills": ["Communication"],
+        "salary_package": int(rng.lognormvariate(11, 0.6)),
+        "country": rng.choices([c[0] for c in synthetic_survey.COUNTRIES],
+                               weights=[c[1] for c in synthetic_survey.COUNTRIES])[0],
+        "years_experience": years,
+        "dev_role": rng.choices([r[0] for r in synthetic_survey.DEV_ROLES],
+                                weights=[r[1] for r in synthetic_survey.DEV_ROLES])[0],
+        "languages": languages,
+        "databases": databases,
+        "platforms": pick(synthetic_survey.PLATFORMS, 1),
+        "frameworks": frameworks,
+    }
+
+
+async def timed(client, recorder: Recorder, op: str, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        status = response.status_code
+    except httpx.HTTPError:
+        response, status = None, 599
+    recorder.record(op, time.perf_counter() - start, status)
+    return response
+
+
+async def virtual_user(index: int, client, minter, recorder: Recorder, args):
+    rng = random.Random(args.seed * 100_003 + index)
+    subject = f"loadtest_user_{index}"
+    headers = {"Authorization": f"Bearer {minter.mint(subject)}"}
+    api = "/api/v1"
+
+    await timed(client, recorder, "auth_sync", "POST", f"{api}/auth/sync", headers=headers,
+                json={"email": f"{subject}@loadtest.careeriq.dev", "name": subject})
+    for _ in range(args.iterations):
+        await timed(client, recorder, "profile_upsert", "PUT", f"{api}/profile", headers=headers,
+                    json=random_profile(rng))
+        await timed(client, recorder, "benchmark_generate", "POST", f"{api}/benchmarks/generate", headers=headers)
+        if rng.random() < args.plan_ratio:
+            await timed(client, recorder, "plan_generate", "POST", f"{api}/plan/generate", headers=headers)
+        for _ in range(args.reads):
+            await timed(client, recorder, "dashboard_summary", "GET", f"{api}/dashboard/summary", headers=headers)
+            await timed(client, recorder, "benchmark_latest", "GET", f"{api}/benchmarks/latest", headers=headers)
+            await timed(client, recorder, "plan_read", "GET", f"{api}/plan", headers=headers)
+
+
+async def drive(base_url: str, minter, args) -> dict:
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        async def run_user(i):
+            async with semaphore:
+                await virtual_user(i, client, minter, recorder, args)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run_user(i) for i in range(args.users)))
+        wall = time.perf_counter() - start
+
+    result = recorder.summary(wall)
+    result["wall_seconds"] = round(wall, 3)
+    return result
+
+
+def start_app(port: int, env: dict, workers: int):
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+           "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    return subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env)
+
+
+def wait_until_up(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/readyz", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"App did not become ready at {base_url} within {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongodb-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db-name", default="careeriq_loadtest")
+    parser.add_argument("--survey-rows", type=int, default=65000, help="0 to reuse the existing market_benchmarks")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--iterations", type=int, default=1, help="Profile/benchmark cycles per user")
+    parser.add_argument("--reads", type=int, default=5, help="Read rounds per cycle")
+    parser.add_argument("--plan-ratio", type=float, default=1.0, help="Fraction of cycles that generate a plan")
+    parser.add_argument("--gemini-latency-ms", type=float, default=1500)
+    parser.add_argument("--gemini-jitter-ms", type=float, default=500)
+    parser.add_argument("--gemini-failure-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-replay", metavar="PATH",
+                        help="Serve plans from an advisor recording (see advisor_recordings.py) instead of the stub")
+    parser.add_argument("--admission", action="store_true",
+                        help="Keep admission control (rate limits, concurrency caps) enabled in the app")
+    parser.add_argument("--app-workers", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report to this path")
+    args = parser.parse_args()
+
+    jwks = JWKSServer().start()
+    gemini = GeminiStub(args.gemini_latency_ms, args.gemini_jitter_ms, args.gemini_failure_rate).start()
+
+    if args.survey_rows:
+        asyncio.run(synthetic_survey.ingest_synthetic(args.survey_rows, args.seed, args.mongodb_uri, args.db_name))
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(
+        os.environ,
+        MONGODB_URI=args.mongodb_uri,
+        DB_NAME=args.db_name,
+        SECRET_KEY=os.environ.get("SECRET_KEY", "loadtest-secret"),
+        CLERK_ISSUER_URL=jwks.url,
+        GEMINI_API_KEY="loadtest",
+        GEMINI_API_ENDPOINT=gemini.url,
+        ADMISSION_ENABLED="true" if args.admission else "false",
+    )
+    if args.gemini_replay:
+        env.update(ADVISOR_RECORD_MODE="replay", ADVISOR_RECORD_PATH=os.path.abspath(args.gemini_replay),
+                   ADVISOR_REPLAY_MATCH="any")
+    app_proc = start_app(port, env, args.app_workers)
+    try:
+        wait_until_up(base_url)
+        result = asyncio.run(drive(base_url, jwks.minter, args))
+    finally:
+        app_proc.terminate()
+        app_proc.wait(timeout=15)
+        jwks.stop()
+        gemini.stop()
+
+    report = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "gemini_stub_calls": gemini.calls,
+        **result,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
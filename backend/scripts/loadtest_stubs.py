@@ -0,0 +1,218 @@
+"""
+Local stand-ins for the external services the backend talks to:
+
+- JWKSServer + TokenMinter: an RS256 key pair served at
+  /.well-known/jwks.json and a minter for Clerk-shaped tokens that
+  security.verify_clerk_token accepts (run the app with CLERK_ISSUER_URL
+  pointing at the server).
+- GeminiStub: answers generateContent REST calls with a valid career-plan
+  JSON after a configurable latency, optionally failing a fraction of calls
+  and delaying another fraction by a long-tail latency (run the app with
+  GEMINI_API_ENDPOINT pointing at it). Its settings can be changed while it
+  runs, e.g. to simulate an outage.
+
+Run standalone:
+    python scripts/loadtest_stubs.py --gemini-latency-ms 1500
+"""
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwt
+
+
+def _b64url_uint(value: int) -> str:
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+class _StubServer:
+    """Runs a ThreadingHTTPServer on a daemon thread."""
+
+    def __init__(self, handler_cls, host: str = "127.0.0.1", port: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), handler_cls)
+        self.httpd.stub = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class TokenMinter:
+    def __init__(self, issuer: str = ""):
+        self.issuer = issuer
+        self.kid = f"loadtest-{uuid.uuid4().hex[:8]}"
+        self._key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._pem = self._key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+
+    def jwks(self) -> dict:
+        numbers = self._key.public_key().public_numbers()
+        return {"keys": [{
+            "kty": "RSA",
+            "kid": self.kid,
+            "use": "sig",
+            "alg": "RS256",
+            "n": _b64url_uint(numbers.n),
+            "e": _b64url_uint(numbers.e),
+        }]}
+
+    def mint(self, subject: str, email: str = None, ttl_seconds: int = 3600) -> str:
+        now = int(time.time())
+        claims = {
+            "sub": subject,
+            "iss": self.issuer,
+            "iat": now,
+            "nbf": now,
+            "exp": now + ttl_seconds,
+            "email": email or f"{subject}@loadtest.careeriq.dev",
+        }
+        return jwt.encode(claims, self._pem, algorithm="RS256", headers={"kid": self.kid})
+
+
+class _JWKSHandler(_QuietHandler):
+    def do_GET(self):
+        if self.path == "/.well-known/jwks.json":
+            self._send_json(200, self.server.stub.minter.jwks())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+
+class JWKSServer(_StubServer):
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__(_JWKSHandler, host, port)
+        self.minter = TokenMinter(issuer=self.url)
+
+
+STUB_PLAN = {
+    "summary": "Synthetic plan from the load-test Gemini stub.",
+    "long_term_goal": "Senior Engineer within 18 months.",
+    "recommendations": [
+        {
+            "category": category,
+            "title": f"Stub recommendation {i + 1}",
+            "description": "Generated by scripts/loadtest_stubs.py.",
+            "expected_impact": "None - load test data",
+            "data_source": "Load test stub",
+            "priority_level": priority,
+        }
+        for i, (category, priority) in enumerate([
+            ("compensation", "high"), ("skills", "high"), ("skills", "medium"),
+            ("strategic", "medium"), ("strategic", "low"),
+        ])
+    ],
+}
+
+
+class _GeminiHandler(_QuietHandler):
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        stub.calls += 1
+
+        if ":generateContent" not in self.path:
+            self._send_json(404, {"error": {"code": 404, "message": "not found"}})
+            return
+
+        time.sleep(stub.sample_latency())
+        if stub.failure_rate and random.random() < stub.failure_rate:
+            self._send_json(503, {"error": {"code": 503, "message": "stub injected failure", "status": "UNAVAILABLE"}})
+            return
+
+        text = json.dumps(STUB_PLAN)
+        prompt_tokens = max(1, len(body) // 4)
+        self._send_json(200, {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": len(text) // 4,
+                "totalTokenCount": prompt_tokens + len(text) // 4,
+            },
+        })
+
+
+class GeminiStub(_StubServer):
+    def __init__(self, latency_ms: float = 800, jitter_ms: float = 200, failure_rate: float = 0.0,
+                 tail_rate: float = 0.0, tail_ms: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        super().__init__(_GeminiHandler, host, port)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.tail_rate = tail_rate # Share of calls delayed by an extra tail_ms
+        self.tail_ms = tail_ms
+        self.calls = 0
+
+    def sample_latency(self) -> float:
+        latency = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if self.tail_rate and random.random() < self.tail_rate:
+            latency += self.tail_ms
+        return max(0.0, latency) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jwks-port", type=int, default=8765)
+    parser.add_argument("--gemini-port", type=int, default=8766)
+    parser.add_argument("--gemini-latency-ms", type=float, default=800)
+    parser.add_argument("--gemini-jitter-ms", type=float, default=200)
+    parser.add_argument("--gemini-failure-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-tail-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-tail-ms", type=float, default=0.0)
+    parser.add_argument("--mint", metavar="SUBJECT", help="Print a token for SUBJECT and keep serving")
+    args = parser.parse_args()
+
+    jwks = JWKSServer(port=args.jwks_port).start()
+    gemini = GeminiStub(args.gemini_latency_ms, args.gemini_jitter_ms, args.gemini_failure_rate,
+                        args.gemini_tail_rate, args.gemini_tail_ms, port=args.gemini_port).start()
+    print(f"CLERK_ISSUER_URL={jwks.url}")
+    print(f"GEMINI_API_ENDPOINT={gemini.url}")
+    if args.mint:
+        print(f"Token for {args.mint}: {jwks.minter.mint(args.mint)}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        jwks.stop()
+        gemini.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Publish market_benchmarks (and the Clerk JWKS) into shared memory for the
+uvicorn workers on this host; see app/shared_data.py.
+
+Run it on each app host after scripts/ingest_survey.py to roll workers onto
+the new survey without restarting them, or use scripts/serve.py, which
+publishes before starting the workers.
+
+Usage:
+    SHARED_DATASET_NAME=careeriq python scripts/publish_shared_dataset.py
+    SHARED_DATASET_NAME=careeriq python scripts/publish_shared_dataset.py --unpublish
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR) # Settings reads .env from the working directory
+
+import requests
+from pymongo import MongoClient
+
+from app import shared_data
+from app.config import get_settings
+from app.services import cohort_cache
+
+PROJECTION = {"_id": 0, "country": 1, "dev_role": 1, "years_experience": 1, "salary": 1,
+              **{field: 1 for field in shared_data.SKILL_FIELDS}}
+
+def load_documents(settings):
+    """(dataset version, documents). The version is read first, so a re-ingestion mid-read leaves it behind."""
+    client = MongoClient(settings.MONGODB_URI)
+    try:
+        db = client[settings.DB_NAME]
+        metadata = db.dataset_metadata.find_one({"_id": cohort_cache.DATASET_ID}, {"version": 1})
+        version = metadata.get("version", 0) if metadata else 0
+        cursor = db.market_benchmarks.find({"salary": {"$gt": 0}}, PROJECTION, batch_size=10000)
+        return version, list(cursor)
+    finally:
+        client.close()
+
+def fetch_jwks(settings):
+    # Fetched directly: app.security.get_jwks would hand back the currently published copy
+    try:
+        response = requests.get(f"{settings.CLERK_ISSUER_URL}/.well-known/jwks.json", timeout=10)
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        print(f"Warning: could not fetch JWKS, workers will fetch their own: {e}")
+        return None
+
+def publish_from_mongo() -> int:
+    settings = get_settings()
+    if not settings.SHARED_DATASET_NAME:
+        raise SystemExit("SHARED_DATASET_NAME is not set")
+
+    start = time.perf_counter()
+    version, documents = load_documents(settings)
+    jwks = fetch_jwks(settings) if settings.CLERK_ISSUER_URL else None
+    generation = shared_data.publish(documents, settings.SHARED_DATASET_NAME, jwks=jwks, dataset_version=version)
+    print(f"Published {len(documents)} rows of dataset version {version} as generation {generation} "
+          f"of '{settings.SHARED_DATASET_NAME}' in {time.perf_counter() - start:.1f}s")
+    return generation
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--unpublish", action="store_true", help="Remove the shared segments instead")
+    args = parser.parse_args()
+
+    if args.unpublish:
+        shared_data.unpublish(get_settings().SHARED_DATASET_NAME)
+        print("Removed shared dataset segments.")
+    else:
+        publish_from_mongo()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Recompute every user's current benchmark report, e.g. after re-ingesting the survey.
+
+Instead of one generate_benchmark call per user, this:
+    1. streams all profiles and resolves each distinct (country, role,
+       experience) to its cohort once
+    2. groups the profiles by resolved cohort and runs each cohort's
+       statistics aggregation once
+    3. scores the members of each cohort in batches on a process pool
+       (percentiles via one vectorized searchsorted per batch)
+    4. archives the previous reports and inserts the new ones in unordered
+       bulk writes
+
+Reports are built by the same build_benchmark_report as the API and stamped
+with the current dataset version. Run scripts/compact_history.py afterwards
+to apply history retention.
+
+With --stale-only, only users whose current report predates the dataset
+version are processed, and those whose cohort statistics are unchanged just
+get their report restamped, so the work scales with what the re-ingestion
+actually changed. GET /api/v1/admin/stale-reports shows how many there are.
+
+Usage:
+    python scripts/recompute_benchmarks.py
+    python scripts/recompute_benchmarks.py --stale-only
+    python scripts/recompute_benchmarks.py --workers 8 --batch-size 2000 --dry-run
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR) # Settings reads .env from the working directory
+
+import numpy as np
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import InsertOne, UpdateMany
+
+from app.config import get_settings
+from app.database import READ_PREFERENCES
+from app.routers.benchmarks import (
+    resolve_cohort, fetch_cohort_stats, build_benchmark_report, aggregate_market_skills, profile_cohort_inputs
+)
+from app.services import cohort_cache
+from app.services.cohorts import cohort_fingerprint, cohort_key
+from app.services.survey_schema import exp_bucket_index
+
+PROFILE_PROJECTION = {
+    "_id": 0, "user_id": 1, "dev_role": 1, "current_title": 1, "country": 1,
+    "years_experience": 1, "salary_package": 1, "technical_skills": 1,
+}
+
+def score_cohort(cohort_name: str, stats: dict, members: list, stamp: dict) -> list:
+    """Process pool task: build report documents for one batch of a cohort's members."""
+    salaries = np.array([doc["salary"] for doc in stats["salaries"]], dtype=float)
+    user_salaries = np.array([m.get("salary_package", 0) or 0 for m in members], dtype=float)
+    # Same as calculate_salary_percentile (bisect_left), for the whole batch at once
+    below = np.searchsorted(salaries, user_salaries, side="left")
+    percentiles = (below / len(salaries) * 100).astype(int) if len(salaries) else np.zeros(len(members), dtype=int)
+    market_tech_skills = aggregate_market_skills(stats)
+
+    return [
+        build_benchmark_report(
+            member["user_id"], member, stats, cohort_name,
+            percentile=int(percentile), market_tech_skills=market_tech_skills, cohort_size=len(salaries), **stamp
+        ).model_dump(by_alias=True, exclude={"id"})
+        for member, percentile in zip(members, percentiles)
+    ]
+
+async def stale_profiles(db, version: int, batch_size: int = 5000):
+    """
+    Profiles of users whose current report predates `version`, each with that
+    report's cohort key and fingerprint under "_previous".
+    """
+    reports = db.benchmark_reports.find(
+        cohort_cache.stale_report_query(version),
+        {"_id": 0, "user_id": 1, "cohort_key": 1, "cohort_fingerprint": 1},
+        batch_size=batch_size,
+    )
+    pending = {}
+
+    async def flush():
+        async for profile in db.profiles.find({"user_id": {"$in": list(pending)}}, PROFILE_PROJECTION):
+            previous = pending[profile["user_id"]]
+            profile["_previous"] = (previous.get("cohort_key"), previous.get("cohort_fingerprint"))
+            yield profile
+        pending.clear()
+
+    async for report in reports:
+        pending[report["user_id"]] = report
+        if len(pending) == batch_size:
+            async for profile in flush():
+                yield profile
+    if pending:
+        async for profile in flush():
+            yield profile
+
+async def group_profiles(profiles, analytics_db):
+    """Group streamed profiles into {query_key: {"query", "cohort_name", "members"}}; returns (groups, skipped)."""
+    collection = analytics_db.market_benchmarks
+    resolved = {} # (country, role, experience bucket) -> (match_query, count, cohort_name)
+    groups = {}
+    skipped = 0
+    async for profile in profiles:
+        user_role, user_country, user_exp = profile_cohort_inputs(profile)
+        inputs = (user_country, user_role, exp_bucket_index(user_exp)) # Tiers only depend on the bucket
+        if inputs not in resolved:
+            resolved[inputs] = await resolve_cohort(collection, user_country, user_role, user_exp)
+        match_query, count, cohort_name = resolved[inputs]
+        if count == 0:
+            skipped += 1
+            continue
+        key = cohort_key(match_query)
+        group = groups.setdefault(key, {"query": match_query, "cohort_name": cohort_name, "members": []})
+        group["members"].append(profile)
+    return groups, skipped
+
+def report_operations(reports: list) -> list:
+    """Archive-then-insert per user, safe to run unordered: the archive never matches the new report."""
+    now = datetime.utcnow()
+    operations = []
+    for report in reports:
+        report["_id"] = ObjectId()
+        operations.append(UpdateMany(
+            {"user_id": report["user_id"], "is_current": True, "_id": {"$ne": report["_id"]}},
+            {"$set": {"is_current": False, "archived_at": now}}
+        ))
+        operations.append(InsertOne(report))
+    return operations
+
+async def run(args) -> dict:
+    settings = get_settings()
+    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    db = client[settings.DB_NAME]
+    analytics_db = client.get_database(
+        settings.DB_NAME, read_preference=READ_PREFERENCES[settings.MONGO_ANALYTICS_READ_PREFERENCE]
+    )
+    summary = {"profiles": 0, "cohorts": 0, "skipped_no_data": 0, "reports_written": 0, "reports_restamped": 0}
+    start = time.perf_counter()
+    try:
+        version = await cohort_cache.dataset_version(analytics_db)
+        summary["dataset_version"] = version
+        if args.stale_only:
+            profiles = stale_profiles(db, version)
+        else:
+            profiles = db.profiles.find({}, PROFILE_PROJECTION, batch_size=5000)
+        groups, summary["skipped_no_data"] = await group_profiles(profiles, analytics_db)
+        summary["cohorts"] = len(groups)
+        summary["profiles"] = sum(len(g["members"]) for g in groups.values()) + summary["skipped_no_data"]
+        print(f"Grouped {summary['profiles']} profiles into {len(groups)} cohorts "
+              f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+        loop = asyncio.get_running_loop()
+        fetch_slots = asyncio.Semaphore(args.concurrency)
+        write_lock = asyncio.Lock()
+
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            async def process(key, group):
+                async with fetch_slots:
+                    stats = await fetch_cohort_stats(analytics_db.market_benchmarks, group["query"])
+                stamp = {"dataset_version": version, "cohort": key, "fingerprint": cohort_fingerprint(stats)}
+
+                # Same cohort, same statistics: the existing report still holds
+                unchanged = [m["user_id"] for m in group["members"] if m.get("_previous") == (key, stamp["fingerprint"])]
+                members = [m for m in group["members"] if m.get("_previous") != (key, stamp["fingerprint"])]
+                for i in range(0, len(unchanged), args.write_batch):
+                    async with write_lock:
+                        if not args.dry_run:
+                            await db.benchmark_reports.update_many(
+                                {"user_id": {"$in": unchanged[i:i + args.write_batch]}, "is_current": True},
+                                {"$set": {"dataset_version": version}},
+                            )
+                        summary["reports_restamped"] += len(unchanged[i:i + args.write_batch])
+
+                batches = [members[i:i + args.batch_size] for i in range(0, len(members), args.batch_size)]
+                for reports in await asyncio.gather(*(
+                    loop.run_in_executor(pool, score_cohort, group["cohort_name"], stats, batch, stamp)
+                    for batch in batches
+                )):
+                    operations = report_operations(reports)
+                    async with write_lock:
+                        if not args.dry_run:
+                            for i in range(0, len(operations), args.write_batch):
+                                await db.benchmark_reports.bulk_write(operations[i:i + args.write_batch], ordered=False)
+                        summary["reports_written"] += len(reports)
+
+            await asyncio.gather(*(process(key, group) for key, group in groups.items()))
+    finally:
+        client.close()
+
+    summary["elapsed_seconds"] = round(time.perf_counter() - start, 2)
+    summary["dry_run"] = args.dry_run
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Scoring processes")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Profiles per scoring task")
+    parser.add_argument("--write-batch", type=int, default=2000, help="Operations per bulk write")
+    parser.add_argument("--concurrency", type=int, default=4, help="Cohort aggregations in flight")
+    parser.add_argument("--stale-only", action="store_true",
+                        help="Only users whose current report predates the dataset version")
+    parser.add_argument("--dry-run", action="store_true", help="Score everything but write nothing")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+if __name__ == "__main__":
+    main()
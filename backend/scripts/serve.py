@@ -0,0 +1,33 @@
+"""
+Production entry point for multi-worker deployments: publishes the shared
+survey dataset once in the parent process, then starts uvicorn workers that
+attach to it instead of each loading their own copy.
+
+Usage:
+    SHARED_DATASET_NAME=careeriq python scripts/serve.py --workers 4 --port $PORT
+"""
+import argparse
+
+import uvicorn
+
+from publish_shared_dataset import publish_from_mongo
+from app.config import get_settings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    if get_settings().SHARED_DATASET_NAME:
+        try:
+            publish_from_mongo()
+        except Exception as e:
+            # Workers fall back to MongoDB when nothing is published
+            print(f"Failed to publish shared dataset: {e}")
+
+    uvicorn.run("app.main:app", host=args.host, port=args.port, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Synthetic Stack Overflow-style survey generator.
+
+Produces rows with the same columns as survey_results_public.csv at any row
+count, so load tests and benchmarks can run without the real survey file.
+Generation is vectorized in chunks, so millions of rows stay cheap.
+
+Usage:
+    python scripts/synthetic_survey.py --rows 65000 --csv synthetic.csv
+    python scripts/synthetic_survey.py --rows 65000 --ingest   # into MONGODB_URI/DB_NAME
+"""
+import argparse
+import asyncio
+import csv
+import os
+import tempfile
+
+import numpy as np
+
+# (name, sampling weight, salary multiplier vs. the global base)
+COUNTRIES = [
+    ("United States of America", 0.22, 2.6),
+    ("Germany", 0.09, 1.5),
+    ("India", 0.09, 0.35),
+    ("United Kingdom of Great Britain and Northern Ireland", 0.07, 1.6),
+    ("Canada", 0.05, 1.6),
+    ("France", 0.05, 1.2),
+    ("Brazil", 0.05, 0.5),
+    ("Poland", 0.04, 0.9),
+    ("Netherlands", 0.04, 1.5),
+    ("Australia", 0.03, 1.7),
+    ("Spain", 0.03, 0.95),
+    ("Italy", 0.03, 0.9),
+    ("Sweden", 0.03, 1.3),
+    ("Pakistan", 0.02, 0.25),
+    ("Nigeria", 0.02, 0.3),
+    ("Japan", 0.02, 1.1),
+    ("Switzerland", 0.02, 2.4),
+    ("Ukraine", 0.02, 0.8),
+    ("Israel", 0.02, 2.0),
+    ("Mexico", 0.02, 0.6),
+    ("Turkey", 0.02, 0.5),
+    ("Czech Republic", 0.01, 0.9),
+    ("Austria", 0.01, 1.3),
+    ("Argentina", 0.01, 0.5),
+    ("South Africa", 0.01, 0.7),
+]
+
+DEV_ROLES = [
+    ("Developer, full-stack", 0.30),
+    ("Developer, back-end", 0.17),
+    ("Developer, front-end", 0.06),
+    ("Developer, desktop or enterprise applications", 0.04),
+    ("Developer, mobile", 0.04),
+    ("Developer, embedded applications or devices", 0.03),
+    ("Engineering manager", 0.04),
+    ("DevOps engineer or professional", 0.03),
+    ("Data engineer", 0.03),
+    ("Data scientist", 0.03),
+    ("AI/ML engineer", 0.03),
+    ("Cloud infrastructure engineer", 0.02),
+    ("Architect, software or solutions", 0.03),
+    ("Developer, QA or test", 0.02),
+    ("Academic researcher", 0.02),
+    ("Research & Development role", 0.02),
+    ("Senior executive (C-suite, VP, etc.)", 0.02),
+    ("Data or business analyst", 0.02),
+    ("Student", 0.03),
+]
+
+# (name, probability that a respondent has worked with it)
+LANGUAGES = [
+    ("JavaScript", 0.62), ("HTML/CSS", 0.53), ("Python", 0.51), ("SQL", 0.51),
+    ("TypeScript", 0.39), ("Bash/Shell (all shells)", 0.33), ("Java", 0.30),
+    ("C#", 0.27), ("C++", 0.23), ("C", 0.20), ("PHP", 0.18), ("PowerShell", 0.14),
+    ("Go", 0.13), ("Rust", 0.12), ("Kotlin", 0.09), ("Lua", 0.06), ("Dart", 0.06),
+    ("Ruby", 0.05), ("Swift", 0.05), ("R", 0.04),
+]
+DATABASES = [
+    ("PostgreSQL", 0.49), ("MySQL", 0.40), ("SQLite", 0.33), ("Microsoft SQL Server", 0.25),
+    ("MongoDB", 0.24), ("Redis", 0.20), ("MariaDB", 0.17), ("Elasticsearch", 0.12),
+    ("Oracle", 0.10), ("Dynamodb", 0.08),
+]
+PLATFORMS = [
+    ("Amazon Web Services (AWS)", 0.48), ("Microsoft Azure", 0.28),
+    ("Google Cloud", 0.25), ("Cloudflare", 0.15), ("Firebase", 0.14),
+    ("Vercel", 0.12), ("Digital Ocean", 0.12), ("Heroku", 0.09),
+]
+FRAMEWORKS = [
+    ("Node.js", 0.40), ("React", 0.40), ("jQuery", 0.22), ("Next.js", 0.18),
+    ("Express", 0.17), ("Angular", 0.17), ("ASP.NET CORE", 0.17), ("Vue.js", 0.16),
+    ("Spring Boot", 0.13), ("Flask", 0.13), ("Django", 0.12), ("FastAPI", 0.09),
+]
+
+SKILL_COLUMNS = {
+    "LanguageHaveWorkedWith": LANGUAGES,
+    "DatabaseHaveWorkedWith": DATABASES,
+    "PlatformHaveWorkedWith": PLATFORMS,
+    "WebframeHaveWorkedWith": FRAMEWORKS,
+}
+
+CSV_COLUMNS = ["DevType", "WorkExp", "Country", "ConvertedCompYearly", *SKILL_COLUMNS]
+
+SALARY_BASE = 38000
+
+
+def _weights(items, index=1):
+    w = np.array([item[index] for item in items], dtype=float)
+    return w / w.sum()
+
+
+def generate_chunks(rows: int, seed: int = 0, chunk_size: int = 100_000):
+    """
+    Yield columnar chunks: integer codes for country/role (indexes into
+    COUNTRIES/DEV_ROLES), float arrays for experience/salary, and one boolean
+    membership matrix per skill column.
+    """
+    rng = np.random.default_rng(seed)
+    country_p = _weights(COUNTRIES)
+    country_mult = np.array([c[2] for c in COUNTRIES])
+    role_p = _weights(DEV_ROLES)
+    skill_p = {col: np.array([s[1] for s in items]) for col, items in SKILL_COLUMNS.items()}
+
+    for start in range(0, rows, chunk_size):
+        n = min(chunk_size, rows - start)
+        country = rng.choice(len(COUNTRIES), size=n, p=country_p)
+        role = rng.choice(len(DEV_ROLES), size=n, p=role_p)
+        years = np.minimum(np.round(rng.gamma(1.8, 6.0, size=n)), 50.0)
+        salary = np.round(
+            SALARY_BASE * country_mult[country] * (1 + 0.06 * years) * rng.lognormal(0.0, 0.5, size=n)
+        )
+        skills = {col: rng.random((n, len(p))) < p for col, p in skill_p.items()}
+        yield {"country": country, "role": role, "years": years, "salary": salary, "skills": skills}
+
+
+def iter_survey_rows(rows: int, seed: int = 0):
+    """Yield dicts keyed by the survey CSV column names."""
+    for chunk in generate_chunks(rows, seed):
+        skill_names = {col: [s[0] for s in items] for col, items in SKILL_COLUMNS.items()}
+        for i in range(len(chunk["country"])):
+            row = {
+                "DevType": DEV_ROLES[chunk["role"][i]][0],
+                "WorkExp": float(chunk["years"][i]),
+                "Country": COUNTRIES[chunk["country"][i]][0],
+                "ConvertedCompYearly": float(chunk["salary"][i]),
+            }
+            for col, names in skill_names.items():
+                row[col] = ";".join(name for name, has in zip(names, chunk["skills"][col][i]) if has) or None
+            yield row
+
+
+def write_csv(path: str, rows: int, seed: int = 0):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for row in iter_survey_rows(rows, seed):
+            writer.writerow(row)
+    print(f"Wrote {rows} synthetic survey rows to {path}")
+
+
+async def ingest_synthetic(rows: int, seed: int = 0, mongodb_uri: str = None, db_name: str = None):
+    """Generate a synthetic survey and load it through the real ingestion path."""
+    import ingest_survey
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic_survey.csv")
+        write_csv(path, rows, seed)
+        await ingest_survey.ingest_data(
+            csv_path=path,
+            mongodb_uri=mongodb_uri or ingest_survey.MONGODB_URI,
+            db_name=db_name or ingest_survey.DB_NAME,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=65000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", help="Write the survey to this CSV path")
+    parser.add_argument("--ingest", action="store_true", help="Ingest into MongoDB via ingest_survey")
+    parser.add_argument("--mongodb-uri")
+    parser.add_argument("--db-name")
+    args = parser.parse_args()
+
+    if args.csv:
+        write_csv(args.csv, args.rows, args.seed)
+    if args.ingest:
+        asyncio.run(ingest_synthetic(args.rows, args.seed, args.mongodb_uri, args.db_name))
+    if not args.csv and not args.ingest:
+        parser.error("pass --csv PATH and/or --ingest")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,34 @@
+"""
+Verification suite for an ingested survey and the indexes the request paths
+rely on. Each check prints its findings, and the script exits non-zero if any
+of them failed:
+
+    documents   market_benchmarks is non-empty and a sample has the required fields
+    schema      field types and null rates across the full collection, read
+                with a streaming cursor so memory stays flat at any size
+    plans       explain("executionStats") for each hot query shape (cohort
+                tiers, profiles.user_id, users.clerk_id, current benchmark
+                report, active career plan); fails on a COLLSCAN or when more
+                than --max-examined-ratio documents are examined per document
+                returned
+    pipeline    median time of the cohort $facet pipeline on the most common
+                cohorts; fails above --max-pipeline-ms
+
+plans and pipeline sample their cohorts from the hot cohorts stored at
+ingestion (dataset_metadata["survey_options"]) and fail when there are none.
+
+Run it after scripts/ingest_survey.py (which creates the cohort indexes) and
+once the API has started (startup creates the others):
+    python scripts/verify_ingestion.py
+    python scripts/verify_ingestion.py --checks plans,pipeline --cohorts 10
+"""
+import argparse
 import asyncio
+import math
 import os
+import statistics
+import sys
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 
@@ -11,36 +40,222 @@ MONGODB_URI = os.getenv("MONGODB_URI")
 DB_NAME = os.getenv("DB_NAME", "careeriq")
 COLLECTION_NAME = "market_benchmarks"
 
-async def verify_data():
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHECKS = ["documents", "schema", "plans", "pipeline"]
+
+# market_benchmarks field -> (accepted types, highest acceptable share of null/missing/empty values)
+FIELD_RULES = {
+    "country": ((str,), 0.0),
+    "dev_role": ((str,), 0.0),
+    "dev_roles": ((list,), 0.0),
+    "exp_bucket": ((int,), 0.0),
+    "years_experience": ((int, float), 0.0),
+    "salary": ((int, float), 0.0),
+    "languages": ((list,), 0.2),
+    "databases": ((list,), 0.5),
+    "platforms": ((list,), 0.5),
+    "frameworks": ((list,), 0.5),
+    "source_year": ((int,), 0.0),
+}
+
+# Value used for the per-user shapes when the collection has no documents to sample
+PLACEHOLDER_ID = "verify-ingestion"
+
+def _setup_app_import():
+    # Settings needs SECRET_KEY to import app modules; these checks don't use it.
+    os.environ.setdefault("SECRET_KEY", "verify")
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+def _is_null(value) -> bool:
+    if value is None or value == [] or value == "" or value == "nan":
+        return True
+    return isinstance(value, float) and math.isnan(value)
+
+async def check_documents(db) -> list:
+    collection = db[COLLECTION_NAME]
+    count = await collection.estimated_document_count()
+    print(f"Total documents found: {count}")
+    if count == 0:
+        return ["No documents found"]
+
+    doc = await collection.find_one()
+    missing = [f for f in FIELD_RULES if f not in doc]
+    if missing:
+        return [f"Missing fields in sample: {missing}"]
+    print("Sample document structure looks correct.")
+    return []
+
+async def check_schema(db, batch_size: int) -> list:
+    """Stream every document once, counting nulls and type mismatches per field."""
+    nulls = {field: 0 for field in FIELD_RULES}
+    wrong_types = {field: 0 for field in FIELD_RULES}
+    examples = {}
+    total = 0
+
+    projection = {field: 1 for field in FIELD_RULES}
+    async for doc in db[COLLECTION_NAME].find({}, projection, batch_size=batch_size):
+        total += 1
+        for field, (types, _) in FIELD_RULES.items():
+            value = doc.get(field)
+            if _is_null(value):
+                nulls[field] += 1
+            elif isinstance(value, bool) or not isinstance(value, types):
+                wrong_types[field] += 1
+                examples.setdefault(field, (doc["_id"], type(value).__name__))
+
+    print(f"Scanned {total} documents")
+    if total == 0:
+        return ["No documents to validate"]
+
+    failures = []
+    for field, (types, max_null_rate) in FIELD_RULES.items():
+        null_rate = nulls[field] / total
+        print(f"  {field:<17} null {null_rate:7.2%}  wrong type {wrong_types[field]}")
+        if null_rate > max_null_rate:
+            failures.append(f"{field}: null rate {null_rate:.2%} above {max_null_rate:.0%}")
+        if wrong_types[field]:
+            doc_id, type_name = examples[field]
+            expected = "/".join(t.__name__ for t in types)
+            failures.append(f"{field}: {wrong_types[field]} values not {expected} (e.g. {type_name} in {doc_id})")
+    return failures
+
+def _plan_stages(plan):
+    """Every stage name in an explain plan tree (classic or slot-based engine)."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+async def explain_find(db, collection: str, query: dict) -> dict:
+    explain = await db.command(
+        {"explain": {"find": collection, "filter": query}, "verbosity": "executionStats"}
+    )
+    stages = list(_plan_stages(explain["queryPlanner"]["winningPlan"]))
+    stats = explain["executionStats"]
+    return {
+        "stages": stages,
+        "docs_examined": stats["totalDocsExamined"],
+        "keys_examined": stats["totalKeysExamined"],
+        "returned": stats["nReturned"],
+        "ms": stats["executionTimeMillis"],
+    }
+
+async def query_shapes(db, cohorts: list) -> list:
+    """(label, collection, filter) for each query issued per request, with values sampled from the data."""
+    from app.services.cohorts import cohort_tiers, tier_query
+
+    user = await db.users.find_one({}, {"clerk_id": 1}) or {}
+    profile = await db.profiles.find_one({}, {"user_id": 1}) or {}
+    clerk_id = user.get("clerk_id", PLACEHOLDER_ID)
+    user_id = profile.get("user_id", PLACEHOLDER_ID)
+
+    shapes = [
+        ("users.clerk_id", "users", {"clerk_id": clerk_id}),
+        ("profiles.user_id", "profiles", {"user_id": user_id}),
+        ("benchmark_reports.is_current", "benchmark_reports", {"user_id": user_id, "is_current": True}),
+        ("career_plans.is_active", "career_plans", {"user_id": user_id, "is_active": True}),
+    ]
+    for country, dev_role, years in cohorts[:1]:
+        for tier, (filters, _) in enumerate(cohort_tiers(country, dev_role, years), start=1):
+            shapes.append((f"cohort_tier_{tier}", COLLECTION_NAME, tier_query(filters)))
+    return shapes
+
+NO_COHORTS = "no hot cohorts stored; run scripts/build_market_cube.py"
+
+async def check_plans(db, cohorts: list, max_ratio: float) -> list:
+    failures = [] if cohorts else [NO_COHORTS]
+    for label, collection, query in await query_shapes(db, cohorts):
+        result = await explain_find(db, collection, query)
+        ratio = result["docs_examined"] / max(result["returned"], 1)
+        print(f"  {label:<29} {' > '.join(result['stages']):<32} examined {result['docs_examined']:>7}"
+              f"  returned {result['returned']:>7}  ratio {ratio:6.2f}  {result['ms']} ms")
+        if "COLLSCAN" in result["stages"]:
+            failures.append(f"{label}: collection scan on {collection}")
+        elif ratio > max_ratio:
+            failures.append(f"{label}: {ratio:.2f} documents examined per document returned (max {max_ratio})")
+    return failures
+
+async def check_pipeline(db, cohorts: list, rounds: int, max_ms: float) -> list:
+    from app.routers.benchmarks import resolve_cohort, fetch_cohort_stats
+
+    collection = db[COLLECTION_NAME]
+    failures = [] if cohorts else [NO_COHORTS]
+    for country, dev_role, years in cohorts:
+        match_query, count, cohort_name = await resolve_cohort(collection, country, dev_role, years)
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await fetch_cohort_stats(collection, match_query)
+            timings.append((time.perf_counter() - start) * 1000)
+        median = statistics.median(timings)
+        print(f"  {cohort_name:<60} n={count:<7} median {median:8.1f} ms  max {max(timings):8.1f} ms")
+        if median > max_ms:
+            failures.append(f"{cohort_name}: pipeline median {median:.1f} ms above {max_ms} ms")
+    return failures
+
+async def verify_data(args) -> dict:
     if not MONGODB_URI:
         print("Error: MONGODB_URI not found in .env")
-        return
+        return {"connection": ["MONGODB_URI not set"]}
+
+    _setup_app_import()
+    from app.warmup import hot_cohorts
 
     print(f"Connecting to MongoDB: {DB_NAME}...")
     client = AsyncIOMotorClient(MONGODB_URI)
     db = client[DB_NAME]
-    collection = db[COLLECTION_NAME]
-    
-    count = await collection.count_documents({})
-    print(f"Total documents found: {count}")
-    
-    if count > 0:
-        print("\n--- Sample Document ---")
-        doc = await collection.find_one()
-        import pprint
-        pprint.pprint(doc)
-        
-        print("\n--- Verification ---")
-        required_fields = ["country", "years_experience", "dev_role", "salary", "languages"]
-        missing = [f for f in required_fields if f not in doc]
-        if missing:
-            print(f"FAILED: Missing fields in sample: {missing}")
-        else:
-            print("SUCCESS: Sample document structure looks correct.")
-    else:
-        print("FAILED: No documents found.")
-
-    client.close()
+    results = {}
+    try:
+        # Only the cohort checks need them
+        cohorts = []
+        if {"plans", "pipeline"} & set(args.checks):
+            cohorts = await hot_cohorts(db, args.cohorts)
+        for check in args.checks:
+            print(f"\n--- {check} ---")
+            if check == "documents":
+                results[check] = await check_documents(db)
+            elif check == "schema":
+                results[check] = await check_schema(db, args.batch_size)
+            elif check == "plans":
+                results[check] = await check_plans(db, cohorts, args.max_examined_ratio)
+            elif check == "pipeline":
+                results[check] = await check_pipeline(db, cohorts, args.rounds, args.max_pipeline_ms)
+    finally:
+        client.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", default=",".join(CHECKS), help=f"Comma-separated subset of {CHECKS}")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Cursor batch size for the schema scan")
+    parser.add_argument("--max-examined-ratio", type=float, default=2.0,
+                        help="Highest acceptable documents examined per document returned")
+    parser.add_argument("--cohorts", type=int, default=5, help="Number of most common cohorts to time")
+    parser.add_argument("--rounds", type=int, default=5, help="Pipeline runs per cohort")
+    parser.add_argument("--max-pipeline-ms", type=float, default=500.0, help="Highest acceptable median pipeline time")
+    args = parser.parse_args()
+    args.checks = [c.strip() for c in args.checks.split(",") if c.strip()]
+    unknown = set(args.checks) - set(CHECKS)
+    if unknown:
+        parser.error(f"unknown checks: {sorted(unknown)}")
+
+    results = asyncio.run(verify_data(args))
+
+    print("\n--- Verification ---")
+    failed = False
+    for check, failures in results.items():
+        print(f"{'FAILED' if failures else 'SUCCESS'}: {check}")
+        for failure in failures:
+            print(f"  - {failure}")
+        failed = failed or bool(failures)
+    if failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
-    asyncio.run(verify_data())
\ No newline at end of file
+    main()
@@ -0,0 +1,29 @@
+import asyncio
+import os
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("SECRET_KEY", "test")
+
+import httpx
+
+from app import metrics
+from app.main import app
+
+async def _request(method: str, path: str):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, path)
+
+def test_route_template_label():
+    # Unauthenticated, so the request never reaches the database, but it is still routed
+    response = asyncio.run(_request("PATCH", "/api/v1/plan/recommendations/abc123"))
+    assert response.status_code in (401, 403)
+
+    exposition = metrics.render()
+    assert 'route="/plan/recommendations/{rec_id}"' in exposition
+    assert "abc123" not in exposition
+
+def test_unmatched_route_label():
+    response = asyncio.run(_request("GET", "/no-such-path"))
+    assert response.status_code == 404
+    assert 'method="GET",route="unmatched",status="404"' in metrics.render()
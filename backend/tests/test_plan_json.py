@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from app.services.plan_json import parse_plan_json, repair_json
+
+PLAN = {
+    "summary": "Solid backend profile.",
+    "long_term_goal": "Staff engineer",
+    "recommendations": [
+        {"title": "Learn Kubernetes", "description": "Complete a course on Kubernetes."},
+        {"title": "Ask for a raise", "description": "You are below the cohort median."},
+    ],
+}
+
+def test_clean_json_is_not_repaired():
+    assert parse_plan_json(json.dumps(PLAN)) == (PLAN, False)
+
+def test_fences_and_trailing_text_are_dropped():
+    plan, repaired = parse_plan_json("```json\n" + json.dumps(PLAN) + "\n```\nHope this helps!")
+    assert repaired
+    assert plan == PLAN
+
+def test_string_cut_off_is_dropped_not_closed():
+    text = json.dumps(PLAN)
+    cut = text[:text.index("below the cohort")] # Inside the second description
+    plan, repaired = parse_plan_json(cut)
+    assert repaired
+    assert plan["recommendations"][0] == PLAN["recommendations"][0]
+    # The second recommendation keeps only its complete title
+    assert plan["recommendations"][1] == {"title": "Ask for a raise"}
+    assert "You are" not in json.dumps(plan)
+
+def test_value_cut_off_in_summary_is_dropped():
+    plan, _ = parse_plan_json('{"long_term_goal": "Staff engineer", "summary": "Solid back')
+    assert plan == {"long_term_goal": "Staff engineer"}
+
+def test_number_cut_off_is_dropped():
+    plan, _ = parse_plan_json('{"summary": "ok", "score": 12')
+    assert plan == {"summary": "ok"}
+
+def test_cut_after_complete_value_keeps_it():
+    plan, _ = parse_plan_json('{"summary": "ok", "recommendations": [{"title": "A", "description": "B"}')
+    assert plan == {"summary": "ok", "recommendations": [{"title": "A", "description": "B"}]}
+
+def test_cut_inside_key_drops_the_member():
+    plan, _ = parse_plan_json('{"summary": "ok", "long_te')
+    assert plan == {"summary": "ok"}
+
+def test_escaped_quote_inside_string():
+    text = '{"summary": "say \\"hi\\"", "long_term_goal": "Lea'
+    assert json.loads(repair_json(text)) == {"summary": 'say "hi"'}
+
+def test_no_object_raises():
+    with pytest.raises(ValueError):
+        repair_json("Sorry, I can't help with that.")
@@ -0,0 +1,182 @@
+import asyncio
+import os
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("SECRET_KEY", "test")
+
+import pytest
+
+from app.services import resilience
+from app.services.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, Hedger
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    return clock
+
+def make_breaker(**overrides):
+    options = dict(window=10, min_calls=4, failure_rate=0.5, slow_seconds=5.0,
+                   slow_rate=0.5, open_seconds=30.0, probes=2)
+    options.update(overrides)
+    return CircuitBreaker("test", **options)
+
+def record(breaker, failed=False, seconds=0.1):
+    assert breaker.allow()
+    breaker.record(failed=failed, seconds=seconds)
+
+def test_stays_closed_below_min_calls(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        record(breaker, failed=True)
+    assert breaker.state == CLOSED
+
+def test_opens_on_failure_rate(clock):
+    breaker = make_breaker()
+    record(breaker)
+    record(breaker)
+    record(breaker, failed=True)
+    assert breaker.state == CLOSED
+    record(breaker, failed=True)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.retry_after() == 30.0
+
+def test_opens_on_slow_rate(clock):
+    breaker = make_breaker()
+    for _ in range(2):
+        record(breaker)
+    for _ in range(2):
+        record(breaker, seconds=6.0)
+    assert breaker.state == OPEN
+
+def test_half_open_probes_close_it(clock):
+    breaker = make_breaker(min_calls=1)
+    record(breaker, failed=True)
+    assert breaker.state == OPEN
+
+    clock.now += 30.0
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow() # both probes in flight
+    breaker.record(failed=False, seconds=0.1)
+    assert breaker.state == HALF_OPEN
+    breaker.record(failed=False, seconds=0.1)
+    assert breaker.state == CLOSED
+    # The window starts afresh after closing
+    record(breaker)
+    assert breaker.state == CLOSED
+
+def test_half_open_failure_reopens(clock):
+    breaker = make_breaker(min_calls=1)
+    record(breaker, failed=True)
+    clock.now += 30.0
+    assert breaker.allow()
+    breaker.record(failed=True, seconds=0.1)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    clock.now += 29.0
+    assert not breaker.allow()
+
+def test_half_open_slow_probe_reopens(clock):
+    breaker = make_breaker(min_calls=1)
+    record(breaker, failed=True)
+    clock.now += 30.0
+    assert breaker.allow()
+    breaker.record(failed=False, seconds=6.0)
+    assert breaker.state == OPEN
+
+def test_cancel_releases_probe(clock):
+    breaker = make_breaker(min_calls=1, probes=1)
+    record(breaker, failed=True)
+    clock.now += 30.0
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.cancel()
+    assert breaker.allow()
+
+def test_late_record_while_open_is_ignored(clock):
+    breaker = make_breaker(min_calls=1)
+    assert breaker.allow() # allowed before the breaker opened
+    record(breaker, failed=True)
+    breaker.record(failed=False, seconds=0.1)
+    assert breaker.state == OPEN
+
+def test_auth_errors_count_against_breaker():
+    from google.api_core import exceptions
+    from app.services import ai_advisor
+
+    errors = ai_advisor._breaker_errors()
+    assert isinstance(exceptions.PermissionDenied("key revoked"), errors)
+    assert isinstance(exceptions.Unauthenticated("bad key"), errors)
+    assert isinstance(exceptions.ServiceUnavailable("overloaded"), errors)
+    assert not isinstance(exceptions.InvalidArgument("bad request"), errors)
+
+def make_hedger(**overrides):
+    options = dict(quantile=0.9, budget=0.5, min_delay=0.01, min_samples=2)
+    options.update(overrides)
+    return Hedger("test", **options)
+
+def test_hedger_waits_for_warmup():
+    hedger = make_hedger()
+    assert hedger.delay() is None
+    hedger._latencies.extend([0.02, 0.03])
+    assert hedger.delay() == 0.03
+
+def test_hedger_backup_wins_when_first_call_hangs():
+    hedger = make_hedger()
+    hedger._latencies.extend([0.01, 0.01])
+    calls = []
+
+    async def fn():
+        calls.append(len(calls))
+        await asyncio.sleep(10 if len(calls) == 1 else 0)
+        return len(calls)
+
+    assert asyncio.run(hedger.run(fn)) == 2
+    assert len(calls) == 2
+    assert list(hedger._hedged) == [True]
+
+def test_hedger_respects_budget():
+    hedger = make_hedger(budget=0.5)
+    hedger._latencies.extend([0.01, 0.01])
+    hedger._hedged.extend([True, False]) # already at 50%
+    assert hedger.delay() is None
+
+    async def fn():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    assert asyncio.run(hedger.run(fn)) == "ok"
+    assert list(hedger._hedged)[-1] is False
+
+def test_hedger_no_hedge_when_disabled():
+    hedger = make_hedger()
+    hedger._latencies.extend([0.01, 0.01])
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    assert asyncio.run(hedger.run(fn, hedge=False)) == "ok"
+    assert len(calls) == 1
+
+def test_hedger_raises_when_all_attempts_fail():
+    hedger = make_hedger()
+
+    async def fn():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(hedger.run(fn))
+    assert not hedger._latencies
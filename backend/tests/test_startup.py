@@ -0,0 +1,14 @@
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_app_import_defers_numpy():
+    # A fresh interpreter: numpy must wait for the market cube or the shared dataset
+    env = {**os.environ, "MONGODB_URI": "mongodb://localhost:27017", "SECRET_KEY": "test", "SHARED_DATASET_NAME": ""}
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print('numpy' in sys.modules)"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,25 @@
+from app.services.survey_options import build_hot_cohorts, build_options
+
+DOCS = [
+    {"country": "Germany", "dev_roles": ["Developer, back-end"], "years_experience": 4, "salary": 70000},
+    {"country": "Germany", "dev_roles": ["Developer, back-end", "DevOps specialist"], "years_experience": 8,
+     "salary": 90000},
+    {"country": "France", "dev_roles": ["Developer, back-end"], "years_experience": 3, "salary": 50000},
+    # Not in any cohort: no salary, or no country
+    {"country": "France", "dev_roles": ["Developer, back-end"], "years_experience": 30, "salary": 0},
+    {"country": None, "dev_roles": ["Developer, back-end"], "years_experience": 30, "salary": 1},
+]
+
+def test_hot_cohorts_most_common_first():
+    assert build_hot_cohorts(DOCS) == [
+        {"country": "Germany", "dev_role": "Developer, back-end", "years": 6, "count": 2},
+        {"country": "France", "dev_role": "Developer, back-end", "years": 3, "count": 1},
+        {"country": "Germany", "dev_role": "DevOps specialist", "years": 8, "count": 1},
+    ]
+
+def test_hot_cohorts_limit():
+    assert [c["dev_role"] for c in build_hot_cohorts(DOCS, limit=1)] == ["Developer, back-end"]
+
+def test_options_count_every_listed_role():
+    roles = build_options(DOCS)["dev_roles"]
+    assert roles[0] == {"value": "Developer, back-end", "count": 5}
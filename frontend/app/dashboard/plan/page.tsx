@@ -53,6 +53,20 @@ export default function CareerPlanPage() {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [user?.id]);
 
+  // A stale plan is about to be replaced (the advisor's plan after an instant one, or a
+  // refresh after a profile save), so poll until the replacement is in
+  useEffect(() => {
+    if (!user || !plan?.stale) return;
+    const timer = setTimeout(async () => {
+      const token = await getToken();
+      if (!token) return;
+      const latest = await careerPlanService.getPlan(token);
+      if (latest) setPlan(latest);
+    }, 3000);
+    return () => clearTimeout(timer);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [user?.id, plan]);
+
   const handleGeneratePlan = async () => {
     if (!user) return;
     
@@ -7,15 +7,11 @@ import {
   profileService, 
   Profile, 
   INDUSTRIES, 
-  DEV_ROLES,
-  LANGUAGES,
-  DATABASES,
-  PLATFORMS,
-  FRAMEWORKS,
-  COUNTRIES,
   SUGGESTED_SOFT_SKILLS, 
   CareerProgression 
 } from '@/lib/profile';
+import { SEARCH_OPTION_LIMIT, SKILL_OPTION_LIMIT } from '@/lib/options';
+import { useSurveyOptions } from '@/hooks/use-survey-options';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
@@ -76,6 +72,14 @@ export default function ProfileSetup() {
   const [roleSearch, setRoleSearch] = useState('');
   const [countrySearch, setCountrySearch] = useState('');
 
+  // Survey-derived option lists
+  const countryOptions = useSurveyOptions('countries', countrySearch, SEARCH_OPTION_LIMIT, [country]);
+  const roleOptions = useSurveyOptions('dev_roles', roleSearch, SEARCH_OPTION_LIMIT, [devRole]);
+  const languageOptions = useSurveyOptions('languages', '', SKILL_OPTION_LIMIT, languages);
+  const frameworkOptions = useSurveyOptions('frameworks', '', SKILL_OPTION_LIMIT, frameworks);
+  const databaseOptions = useSurveyOptions('databases', '', SKILL_OPTION_LIMIT, databases);
+  const platformOptions = useSurveyOptions('platforms', '', SKILL_OPTION_LIMIT, platforms);
+
   useEffect(() => {
     const fetchProfile = async () => {
       if (user) {
@@ -325,7 +329,7 @@ export default function ProfileSetup() {
                       />
                    </div>
                    <ScrollArea className="h-[200px]">
-                    {COUNTRIES.filter(c => c.toLowerCase().includes(countrySearch.toLowerCase())).map((c) => (
+                    {countryOptions.map((c) => (
                       <SelectItem key={c} value={c}>{c}</SelectItem>
                     ))}
                   </ScrollArea>
@@ -395,7 +399,7 @@ export default function ProfileSetup() {
                       />
                    </div>
                    <ScrollArea className="h-[200px]">
-                    {DEV_ROLES.filter(r => r.toLowerCase().includes(roleSearch.toLowerCase())).map((r) => (
+                    {roleOptions.map((r) => (
                       <SelectItem key={r} value={r}>{r}</SelectItem>
                     ))}
                   </ScrollArea>
@@ -413,7 +417,7 @@ export default function ProfileSetup() {
               <Label className="text-base font-semibold">Languages</Label>
               <ScrollArea className="h-[240px] border rounded-md p-4 bg-background">
                 <div className="flex flex-wrap gap-2">
-                  {LANGUAGES.map((lang) => (
+                  {languageOptions.map((lang) => (
                     <Badge
                       key={lang}
                       variant={languages.includes(lang) ? 'default' : 'outline'}
@@ -434,7 +438,7 @@ export default function ProfileSetup() {
               <Label className="text-base font-semibold">Frameworks</Label>
               <ScrollArea className="h-[240px] border rounded-md p-4 bg-background">
                 <div className="flex flex-wrap gap-2">
-                  {FRAMEWORKS.map((fw) => (
+                  {frameworkOptions.map((fw) => (
                     <Badge
                       key={fw}
                       variant={frameworks.includes(fw) ? 'default' : 'outline'}
@@ -460,7 +464,7 @@ export default function ProfileSetup() {
               <Label className="text-base font-semibold">Databases</Label>
               <ScrollArea className="h-[240px] border rounded-md p-4 bg-background">
                 <div className="flex flex-wrap gap-2">
-                  {DATABASES.map((db) => (
+                  {databaseOptions.map((db) => (
                     <Badge
                       key={db}
                       variant={databases.includes(db) ? 'default' : 'outline'}
@@ -481,7 +485,7 @@ export default function ProfileSetup() {
               <Label className="text-base font-semibold">Platforms & Tools</Label>
               <ScrollArea className="h-[240px] border rounded-md p-4 bg-background">
                 <div className="flex flex-wrap gap-2">
-                  {PLATFORMS.map((pl) => (
+                  {platformOptions.map((pl) => (
                     <Badge
                       key={pl}
                       variant={platforms.includes(pl) ? 'default' : 'outline'}
@@ -0,0 +1,31 @@
+"use client";
+
+import { useEffect, useState } from "react";
+import { optionsService, OptionKind } from "@/lib/options";
+
+const SEARCH_DEBOUNCE_MS = 250;
+
+// One survey option list, filtered server-side by what the user has typed
+// (debounced; results are cached per kind, prefix and limit). Values in
+// `selected` stay listed even when the search or the limit leaves them out.
+export function useSurveyOptions(kind: OptionKind, search: string, limit: number, selected: string[] = []) {
+  const [values, setValues] = useState<string[]>([]);
+
+  useEffect(() => {
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      optionsService.searchOptions(kind, search, limit)
+        .then((result) => {
+          if (!cancelled) setValues(result);
+        })
+        .catch((err) => console.error(`Error fetching ${kind} options:`, err));
+    }, search ? SEARCH_DEBOUNCE_MS : 0);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [kind, search, limit]);
+
+  const missing = selected.filter((value) => value && !values.includes(value));
+  return missing.length ? [...missing, ...values] : values;
+}
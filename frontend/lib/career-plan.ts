@@ -27,6 +27,7 @@ export interface CareerPlan {
   last_modified_date: string; // backend: generated_at (simplification)
   recommendations: Recommendation[];
   overall_completion_percentage: number;
+  stale: boolean; // A regenerated plan is on its way (after a profile save, or the advisor's after an instant plan)
 }
 
 // Helper to map backend response to frontend interface
@@ -62,6 +63,7 @@ const mapBackendPlanToFrontend = (backendPlan: any): CareerPlan => {
     generation_date: backendPlan.generated_at,
     last_modified_date: backendPlan.generated_at,
     overall_completion_percentage: backendPlan.overall_completion_percentage || 0,
+    stale: backendPlan.stale || false,
     recommendations: mappedRecs,
   };
 };
@@ -0,0 +1,67 @@
+const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://127.0.0.1:8000';
+
+// Option lists derived from the market survey, served by GET /api/v1/meta/options
+export type OptionKind = 'countries' | 'dev_roles' | 'languages' | 'databases' | 'platforms' | 'frameworks';
+
+export type SurveyOptions = Record<OptionKind, string[]>;
+
+export const EMPTY_OPTIONS: SurveyOptions = {
+  countries: [],
+  dev_roles: [],
+  languages: [],
+  databases: [],
+  platforms: [],
+  frameworks: [],
+};
+
+// Options shown per list before the user narrows it down by typing
+export const SEARCH_OPTION_LIMIT = 50;
+export const SKILL_OPTION_LIMIT = 100;
+
+interface OptionQuery {
+  kinds?: OptionKind[];
+  prefix?: string;
+  limit?: number;
+}
+
+const searchCache = new Map<string, Promise<string[]>>();
+
+// Values are ordered most common first. The response is ETag'd, so the
+// browser cache revalidates it cheaply on later visits.
+async function fetchOptions(query: OptionQuery = {}): Promise<SurveyOptions> {
+  const params = new URLSearchParams();
+  query.kinds?.forEach((kind) => params.append('kind', kind));
+  if (query.prefix) params.set('prefix', query.prefix);
+  if (query.limit) params.set('limit', String(query.limit));
+
+  const response = await fetch(`${API_URL}/api/v1/meta/options?${params.toString()}`);
+  if (!response.ok) {
+    throw new Error('Failed to fetch options');
+  }
+
+  const data = await response.json();
+  const options = { ...EMPTY_OPTIONS };
+  for (const [kind, values] of Object.entries(data.options)) {
+    options[kind as OptionKind] = (values as { value: string }[]).map((option) => option.value);
+  }
+  return options;
+}
+
+export const optionsService = {
+  getOptions: fetchOptions,
+
+  // A single list filtered and capped server-side, cached per (kind, prefix, limit) for the session
+  searchOptions: (kind: OptionKind, prefix: string, limit: number): Promise<string[]> => {
+    const normalized = prefix.trim().toLowerCase();
+    const key = `${kind}|${normalized}|${limit}`;
+    let cached = searchCache.get(key);
+    if (!cached) {
+      cached = fetchOptions({ kinds: [kind], prefix: normalized, limit })
+        .then((options) => options[kind]);
+      // Failures aren't cached, so the next keystroke retries
+      cached.catch(() => searchCache.delete(key));
+      searchCache.set(key, cached);
+    }
+    return cached;
+  },
+};